@@ -8,7 +8,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.config import settings
 from app.models.base import Base
-from app.models import Shop, Review, ShopAIAnalytics
+from app.models import Shop, Review, ShopAIAnalytics, AreaRanking, ShopChange, EmbeddingCache
 
 config = context.config
 
@@ -0,0 +1,24 @@
+"""Add index for keyset pagination on shops
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_shops_created_at_id", "shops", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_shops_created_at_id", table_name="shops")
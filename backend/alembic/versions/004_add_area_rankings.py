@@ -0,0 +1,39 @@
+"""Add area_rankings table for materialized area rankings
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "area_rankings",
+        sa.Column("area_key", sa.String(50), primary_key=True),
+        sa.Column("sort_by", sa.String(20), primary_key=True),
+        sa.Column("rank", sa.Integer, primary_key=True),
+        sa.Column(
+            "shop_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("shops.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("avg_score", sa.Float),
+        sa.Column("refreshed_at", sa.DateTime, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("area_rankings")
@@ -0,0 +1,91 @@
+"""Add shop_changes change log for delta sync
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "shop_changes",
+        sa.Column("id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("shop_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("operation", sa.String(10), nullable=False),
+        sa.Column("txid", sa.BigInteger, nullable=False, server_default=sa.text("txid_current()")),
+        sa.Column("changed_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_index("idx_shop_changes_txid", "shop_changes", ["txid"])
+    op.create_index("idx_shop_changes_shop_id_txid", "shop_changes", ["shop_id", "txid"])
+
+    # 店舗の作成・更新・削除を記録
+    op.execute(
+        """
+        CREATE FUNCTION record_shop_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO shop_changes (shop_id, operation) VALUES (OLD.id, 'delete');
+                RETURN OLD;
+            END IF;
+            INSERT INTO shop_changes (shop_id, operation) VALUES (NEW.id, 'upsert');
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_shops_insert_delete
+        AFTER INSERT OR DELETE ON shops
+        FOR EACH ROW EXECUTE FUNCTION record_shop_change()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_shops_update
+        AFTER UPDATE ON shops
+        FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+        EXECUTE FUNCTION record_shop_change()
+        """
+    )
+
+    # 解析結果の変更は店舗の更新として記録
+    op.execute(
+        """
+        CREATE FUNCTION record_shop_analytics_change() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO shop_changes (shop_id, operation)
+            VALUES (COALESCE(NEW.shop_id, OLD.shop_id), 'upsert');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_shop_ai_analytics_change
+        AFTER INSERT OR UPDATE OR DELETE ON shop_ai_analytics
+        FOR EACH ROW EXECUTE FUNCTION record_shop_analytics_change()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_shop_ai_analytics_change ON shop_ai_analytics")
+    op.execute("DROP TRIGGER IF EXISTS trg_shops_update ON shops")
+    op.execute("DROP TRIGGER IF EXISTS trg_shops_insert_delete ON shops")
+    op.execute("DROP FUNCTION IF EXISTS record_shop_analytics_change()")
+    op.execute("DROP FUNCTION IF EXISTS record_shop_change()")
+    op.drop_table("shop_changes")
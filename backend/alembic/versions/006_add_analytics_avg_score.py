@@ -0,0 +1,44 @@
+"""Add stored avg_score column and indexes on shop_ai_analytics
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "shop_ai_analytics",
+        sa.Column(
+            "avg_score",
+            sa.Float,
+            sa.Computed(
+                "(score_operation + score_accuracy + score_hygiene + score_sincerity + score_safety)"
+                "::double precision / 5",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        "idx_shop_ai_analytics_risk_level_avg_score",
+        "shop_ai_analytics",
+        ["risk_level", "avg_score"],
+    )
+    op.create_index("idx_shop_ai_analytics_sakura_risk", "shop_ai_analytics", ["sakura_risk"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_shop_ai_analytics_sakura_risk", table_name="shop_ai_analytics")
+    op.drop_index("idx_shop_ai_analytics_risk_level_avg_score", table_name="shop_ai_analytics")
+    op.drop_column("shop_ai_analytics", "avg_score")
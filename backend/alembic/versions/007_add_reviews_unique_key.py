@@ -0,0 +1,52 @@
+"""Add unique (shop_id, author_name, time) key on reviews
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 既存の重複を削除（埋め込み・翻訳のある行、古い行を優先して残す）
+    op.execute(
+        """
+        DELETE FROM reviews
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT
+                    id,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY shop_id, author_name, time
+                        ORDER BY
+                            embedding IS NULL,
+                            text_ja IS NULL,
+                            created_at NULLS LAST,
+                            id
+                    ) AS rn
+                FROM reviews
+            ) ranked
+            WHERE rn > 1
+        )
+        """
+    )
+    op.create_index(
+        "uq_reviews_shop_author_time",
+        "reviews",
+        ["shop_id", "author_name", "time"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_reviews_shop_author_time", table_name="reviews")
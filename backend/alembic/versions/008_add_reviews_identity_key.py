@@ -0,0 +1,127 @@
+"""Add cross-source identity_key on reviews
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+"""
+import hashlib
+import unicodedata
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_CHUNK_SIZE = 5000
+
+# これより大きい値はミリ秒とみなす
+MILLISECONDS_THRESHOLD = 100_000_000_000
+
+
+# 同一性キーの計算（このリビジョン時点の app.utils.review_identity を固定したコピー。
+# アプリケーション側の正規化を変更してもこのマイグレーションの結果は変わらない）
+def _normalize_text(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", value).lower().split())
+
+
+def _normalize_review_day(time: Optional[int]) -> str:
+    if time is None:
+        return ""
+    seconds = time / 1000 if time > MILLISECONDS_THRESHOLD else time
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _identity_key(author_name: Optional[str], time: Optional[int], text: Optional[str]) -> str:
+    text_hash = hashlib.sha256(_normalize_text(text).encode("utf-8")).hexdigest()
+    source = "\x1f".join((_normalize_text(author_name), _normalize_review_day(time), text_hash))
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column("reviews", sa.Column("identity_key", sa.String(64)))
+
+    # 既存レビューの同一性キーを計算（idのキーセットで一定件数ずつ読み込む）
+    bind = op.get_bind()
+    last_id = "00000000-0000-0000-0000-000000000000"
+    while True:
+        chunk = bind.execute(
+            sa.text(
+                """
+                SELECT id, author_name, time, text FROM reviews
+                WHERE id > CAST(:last_id AS uuid)
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BACKFILL_CHUNK_SIZE},
+        ).fetchall()
+        if not chunk:
+            break
+
+        bind.execute(
+            sa.text(
+                """
+                UPDATE reviews SET identity_key = v.identity_key
+                FROM unnest(CAST(:ids AS uuid[]), CAST(:keys AS text[])) AS v(id, identity_key)
+                WHERE reviews.id = v.id
+                """
+            ),
+            {
+                "ids": [str(row.id) for row in chunk],
+                "keys": [_identity_key(row.author_name, row.time, row.text) for row in chunk],
+            },
+        )
+        last_id = str(chunk[-1].id)
+
+    # 取得元の違いで重複していたレビューを削除（埋め込み・翻訳のある行、古い行を優先して残す）
+    op.execute(
+        """
+        DELETE FROM reviews
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT
+                    id,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY shop_id, identity_key
+                        ORDER BY
+                            embedding IS NULL,
+                            text_ja IS NULL,
+                            created_at NULLS LAST,
+                            id
+                    ) AS rn
+                FROM reviews
+            ) ranked
+            WHERE rn > 1
+        )
+        """
+    )
+
+    op.alter_column("reviews", "identity_key", nullable=False)
+    op.create_index(
+        "uq_reviews_shop_identity_key",
+        "reviews",
+        ["shop_id", "identity_key"],
+        unique=True,
+    )
+    op.drop_index("uq_reviews_shop_author_time", table_name="reviews")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "uq_reviews_shop_author_time",
+        "reviews",
+        ["shop_id", "author_name", "time"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.drop_index("uq_reviews_shop_identity_key", table_name="reviews")
+    op.drop_column("reviews", "identity_key")
@@ -0,0 +1,35 @@
+"""Add embedding_cache table
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_cache",
+        sa.Column("model", sa.String(100), primary_key=True),
+        sa.Column("task_type", sa.String(30), primary_key=True),
+        sa.Column("text_hash", sa.String(64), primary_key=True),
+        sa.Column("embedding", Vector(768), nullable=False),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("last_used_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_index("idx_embedding_cache_last_used_at", "embedding_cache", ["last_used_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("embedding_cache")
@@ -0,0 +1,26 @@
+"""Clear zero-vector review embeddings written for failed batches
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 埋め込みの生成に失敗したバッチに書き込まれたゼロベクトルをNULLに戻し、再生成の対象にする
+    op.execute("UPDATE reviews SET embedding = NULL WHERE vector_norm(embedding) = 0")
+
+
+def downgrade() -> None:
+    # ゼロベクトルは復元しない
+    pass
@@ -0,0 +1,26 @@
+"""Add index for avg_score keyset pagination on shop_ai_analytics
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_shop_ai_analytics_avg_score_shop_id", "shop_ai_analytics", ["avg_score", "shop_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_shop_ai_analytics_avg_score_shop_id", table_name="shop_ai_analytics")
@@ -0,0 +1,90 @@
+"""Add match_key on reviews for syncing edited and translated reviews
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+"""
+import hashlib
+import unicodedata
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_CHUNK_SIZE = 5000
+
+# これより大きい値はミリ秒とみなす
+MILLISECONDS_THRESHOLD = 100_000_000_000
+
+
+# 突き合わせキーの計算（このリビジョン時点の app.utils.review_identity を固定したコピー。
+# アプリケーション側の正規化を変更してもこのマイグレーションの結果は変わらない）
+def _normalize_text(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", value).lower().split())
+
+
+def _normalize_review_day(time: Optional[int]) -> str:
+    if time is None:
+        return ""
+    seconds = time / 1000 if time > MILLISECONDS_THRESHOLD else time
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _match_key(author_name: Optional[str], time: Optional[int]) -> str:
+    source = "\x1f".join((_normalize_text(author_name), _normalize_review_day(time)))
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column("reviews", sa.Column("match_key", sa.String(64)))
+
+    # 既存レビューの突き合わせキーを計算（idのキーセットで一定件数ずつ読み込む）
+    bind = op.get_bind()
+    last_id = "00000000-0000-0000-0000-000000000000"
+    while True:
+        chunk = bind.execute(
+            sa.text(
+                """
+                SELECT id, author_name, time FROM reviews
+                WHERE id > CAST(:last_id AS uuid)
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BACKFILL_CHUNK_SIZE},
+        ).fetchall()
+        if not chunk:
+            break
+
+        bind.execute(
+            sa.text(
+                """
+                UPDATE reviews SET match_key = v.match_key
+                FROM unnest(CAST(:ids AS uuid[]), CAST(:keys AS text[])) AS v(id, match_key)
+                WHERE reviews.id = v.id
+                """
+            ),
+            {
+                "ids": [str(row.id) for row in chunk],
+                "keys": [_match_key(row.author_name, row.time) for row in chunk],
+            },
+        )
+        last_id = str(chunk[-1].id)
+
+    op.alter_column("reviews", "match_key", nullable=False)
+    op.create_index("idx_reviews_shop_match_key", "reviews", ["shop_id", "match_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_reviews_shop_match_key", table_name="reviews")
+    op.drop_column("reviews", "match_key")
@@ -8,7 +8,8 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai.llm_client import GeminiClient, get_gemini_client
 from app.ai.prompts import (
@@ -24,6 +25,8 @@ from app.ai.scoring import (
 from app.models.analytics import ShopAIAnalytics
 from app.models.review import Review
 from app.models.shop import Shop
+from app.services.shop_events import notify_shop_changed
+from app.services.shop_service import ShopService
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +39,9 @@ ANALYSIS_VERSION = "1.0.0"
 
 
 class ReviewAnalyzer:
-    """レビュー解析エンジン"""
+    """レビュー解析エンジン（AsyncSessionでイベントループをブロックせずに問い合わせる）"""
 
-    def __init__(self, db: Session, llm_client: Optional[GeminiClient] = None):
+    def __init__(self, db: AsyncSession, llm_client: Optional[GeminiClient] = None):
         self.db = db
         self.llm_client = llm_client or get_gemini_client()
 
@@ -58,15 +61,15 @@ class ReviewAnalyzer:
             解析結果（ShopAIAnalytics）またはNone
         """
         # 店舗情報を取得
-        shop = self.db.query(Shop).filter(Shop.id == shop_id).first()
+        shop = await self.db.get(Shop, shop_id)
         if not shop:
             logger.error(f"Shop not found: {shop_id}")
             return None
 
         # 既存の解析結果をチェック
         existing_analytics = (
-            self.db.query(ShopAIAnalytics).filter(ShopAIAnalytics.shop_id == shop_id).first()
-        )
+            await self.db.scalars(select(ShopAIAnalytics).where(ShopAIAnalytics.shop_id == shop_id))
+        ).first()
 
         if existing_analytics and not force:
             logger.info(f"Analytics already exists for shop {shop_id}")
@@ -74,12 +77,13 @@ class ReviewAnalyzer:
 
         # レビューを取得
         reviews = (
-            self.db.query(Review)
-            .filter(Review.shop_id == shop_id)
-            .order_by(Review.time.desc())
-            .limit(50)  # 最新50件まで
-            .all()
-        )
+            await self.db.scalars(
+                select(Review)
+                .where(Review.shop_id == shop_id)
+                .order_by(Review.time.desc())
+                .limit(50)  # 最新50件まで
+            )
+        ).all()
 
         reviews_data = [
             {
@@ -95,7 +99,7 @@ class ReviewAnalyzer:
         result = await self._run_analysis(shop, reviews_data)
 
         # 結果をDBに保存
-        analytics = self._save_analytics(shop_id, result, len(reviews_data), existing_analytics)
+        analytics = await self._save_analytics(shop, result, len(reviews_data), existing_analytics)
 
         return analytics
 
@@ -161,9 +165,9 @@ class ReviewAnalyzer:
             logger.error(f"Analysis failed for shop {shop.id}: {e}")
             return create_default_analysis(f"解析中にエラーが発生しました: {str(e)[:100]}")
 
-    def _save_analytics(
+    async def _save_analytics(
         self,
-        shop_id: UUID,
+        shop: Shop,
         result: AnalysisResult,
         review_count: int,
         existing: Optional[ShopAIAnalytics] = None,
@@ -172,7 +176,7 @@ class ReviewAnalyzer:
         解析結果をDBに保存
 
         Args:
-            shop_id: 店舗ID
+            shop: 店舗
             result: 解析結果
             review_count: 解析したレビュー数
             existing: 既存の解析結果（更新時）
@@ -183,7 +187,7 @@ class ReviewAnalyzer:
         if existing:
             analytics = existing
         else:
-            analytics = ShopAIAnalytics(shop_id=shop_id)
+            analytics = ShopAIAnalytics(shop_id=shop.id)
             self.db.add(analytics)
 
         # 値を設定
@@ -202,8 +206,11 @@ class ReviewAnalyzer:
         analytics.analysis_version = ANALYSIS_VERSION
         analytics.last_analyzed_at = datetime.utcnow()
 
-        self.db.commit()
-        self.db.refresh(analytics)
+        await self.db.commit()
+        await self.db.refresh(analytics)
+
+        # リスクレベルの変更をタイル等のキャッシュに反映
+        await self.db.run_sync(notify_shop_changed, shop.id, *ShopService.get_coordinates(shop))
 
         return analytics
 
@@ -249,7 +256,7 @@ class ReviewAnalyzer:
 
         return results
 
-    def get_unanalyzed_shops(self, limit: int = 50) -> list[Shop]:
+    async def get_unanalyzed_shops(self, limit: int = 50) -> list[Shop]:
         """
         未解析の店舗を取得
 
@@ -260,14 +267,15 @@ class ReviewAnalyzer:
             未解析の店舗リスト
         """
         return (
-            self.db.query(Shop)
-            .outerjoin(ShopAIAnalytics)
-            .filter(ShopAIAnalytics.shop_id.is_(None))
-            .limit(limit)
-            .all()
-        )
-
-    def get_outdated_shops(
+            await self.db.scalars(
+                select(Shop)
+                .outerjoin(ShopAIAnalytics)
+                .where(ShopAIAnalytics.shop_id.is_(None))
+                .limit(limit)
+            )
+        ).all()
+
+    async def get_outdated_shops(
         self,
         days_threshold: int = 30,
         limit: int = 50,
@@ -287,9 +295,10 @@ class ReviewAnalyzer:
         threshold_date = datetime.utcnow() - timedelta(days=days_threshold)
 
         return (
-            self.db.query(Shop)
-            .join(ShopAIAnalytics)
-            .filter(ShopAIAnalytics.last_analyzed_at < threshold_date)
-            .limit(limit)
-            .all()
-        )
+            await self.db.scalars(
+                select(Shop)
+                .join(ShopAIAnalytics)
+                .where(ShopAIAnalytics.last_analyzed_at < threshold_date)
+                .limit(limit)
+            )
+        ).all()
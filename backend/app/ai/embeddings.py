@@ -5,6 +5,8 @@
 
 import asyncio
 import logging
+import threading
+import time
 from dataclasses import dataclass
 from typing import Optional
 from uuid import UUID
@@ -12,12 +14,39 @@ from uuid import UUID
 import google.generativeai as genai
 from sqlalchemy import text
 from sqlalchemy.orm import Session
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
 
 from app.config import settings
+from app.db.session import SessionLocal
 from app.models.review import Review
+from app.services.embedding_cache_service import (
+    EmbeddingCacheService,
+    hash_embedding_text,
+    normalize_embedding_text,
+)
+from app.utils.cache import TTLCache
+from app.utils.rate_limit import AsyncRateLimiter
 
 logger = logging.getLogger(__name__)
 
+DOCUMENT_TASK_TYPE = "retrieval_document"
+QUERY_TASK_TYPE = "retrieval_query"
+
+# 埋め込みの保存1ステートメントあたりの行数
+SAVE_CHUNK_SIZE = 1000
+
+# ID配列と埋め込み配列をunnestで結合し、1ステートメントでまとめて更新
+BULK_UPDATE_EMBEDDINGS_SQL = """
+    UPDATE reviews SET embedding = v.embedding::vector
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:embeddings AS text[])) AS v(id, embedding)
+    WHERE reviews.id = v.id
+"""
+
+
+def to_vector_literal(values: list[float]) -> str:
+    """埋め込みをpgvectorの文字列形式に変換"""
+    return "[" + ",".join(str(value) for value in values) + "]"
+
 
 class EmbeddingService:
     """ベクトル埋め込みサービス"""
@@ -28,6 +57,19 @@ class EmbeddingService:
         self.model = "models/text-embedding-004"
         self.dimension = 768  # text-embedding-004の次元数
 
+        # 検索クエリの埋め込みキャッシュ（キーは正規化したクエリ）
+        self._query_cache = TTLCache(
+            maxsize=settings.query_embedding_cache_maxsize,
+            ttl_seconds=settings.query_embedding_cache_ttl_seconds,
+        )
+        # 共有キャッシュのヒット数（executorのスレッドから更新されるためロックで保護）
+        self._shared_query_lock = threading.Lock()
+        self._shared_query_hits = 0
+        self._shared_query_misses = 0
+
+        # 一括生成のリクエスト間隔の制限（プロセス内で共有）
+        self._rate_limiter = AsyncRateLimiter(settings.embedding_requests_per_minute)
+
     def generate_embedding_sync(self, text: str) -> list[float]:
         """
         テキストのベクトル埋め込みを生成（同期版）
@@ -54,66 +96,221 @@ class EmbeddingService:
         """
         検索クエリのベクトル埋め込みを生成（同期版）
         """
-        try:
-            result = genai.embed_content(
-                model=self.model,
-                content=query,
-                task_type="retrieval_query",
-            )
-            return result["embedding"]
-        except Exception as e:
-            logger.error(f"Query embedding generation failed: {e}")
-            raise
+        normalized_query = normalize_embedding_text(query)
+        cached = self._query_cache.get(normalized_query)
+        if cached is not None:
+            return cached
+        return self._generate_query_embedding_uncached(normalized_query)
 
     async def generate_query_embedding(self, query: str) -> list[float]:
         """
         検索クエリのベクトル埋め込みを生成
+
+        プロセス内キャッシュにヒットした場合はスレッドに切り替えずに返す
         """
+        normalized_query = normalize_embedding_text(query)
+        cached = self._query_cache.get(normalized_query)
+        if cached is not None:
+            return cached
+
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.generate_query_embedding_sync, query)
+        return await loop.run_in_executor(
+            None, self._generate_query_embedding_uncached, normalized_query
+        )
 
-    def batch_generate_embeddings_sync(
-        self,
-        texts: list[str],
-        batch_size: int = 100,
-    ) -> list[list[float]]:
+    def _generate_query_embedding_uncached(self, normalized_query: str) -> list[float]:
         """
-        複数テキストのベクトル埋め込みを一括生成（同期版）
+        共有キャッシュ（embedding_cacheテーブル）を確認し、なければ生成してキャッシュに保存
+
+        キャッシュの読み込みと保存はそれぞれ短いセッションで行い、Geminiの呼び出し中は接続を保持しない
         """
-        embeddings = []
+        text_hash = hash_embedding_text(normalized_query)
+        embedding = self._load_cached_query(text_hash)
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
+        if embedding is None:
             try:
                 result = genai.embed_content(
                     model=self.model,
-                    content=batch,
-                    task_type="retrieval_document",
+                    content=normalized_query,
+                    task_type=QUERY_TASK_TYPE,
                 )
-                # 単一テキストの場合はリストでラップ
-                if isinstance(result["embedding"][0], float):
-                    embeddings.append(result["embedding"])
-                else:
-                    embeddings.extend(result["embedding"])
+                embedding = result["embedding"]
             except Exception as e:
-                logger.error(f"Batch embedding failed for batch {i}: {e}")
-                # 失敗したバッチは空ベクトルで埋める
-                embeddings.extend([[0.0] * self.dimension] * len(batch))
+                logger.error(f"Query embedding generation failed: {e}")
+                raise
 
-        return embeddings
+            self._store_cached_query(text_hash, embedding)
+
+        self._query_cache.set(normalized_query, embedding)
+        return embedding
+
+    def _load_cached_query(self, text_hash: str) -> Optional[list[float]]:
+        """共有キャッシュから検索クエリの埋め込みを取得"""
+        if not settings.query_embedding_cache_shared:
+            return None
+        with SessionLocal() as cache_db:
+            embedding = self._get_cached_embeddings(cache_db, QUERY_TASK_TYPE, [text_hash]).get(
+                text_hash
+            )
+
+        with self._shared_query_lock:
+            if embedding is None:
+                self._shared_query_misses += 1
+            else:
+                self._shared_query_hits += 1
+        return embedding
+
+    def _store_cached_query(self, text_hash: str, embedding: list[float]) -> None:
+        """生成した検索クエリの埋め込みを共有キャッシュに保存"""
+        if not settings.query_embedding_cache_shared:
+            return
+        with SessionLocal() as cache_db:
+            self._put_cached_embeddings(cache_db, QUERY_TASK_TYPE, {text_hash: embedding})
+
+    def get_query_cache_stats(self) -> dict:
+        """検索クエリの埋め込みキャッシュのヒット率を取得"""
+        with self._shared_query_lock:
+            hits, misses = self._shared_query_hits, self._shared_query_misses
+        shared_total = hits + misses
+        return {
+            "memory": self._query_cache.get_stats(),
+            "shared": {
+                "enabled": settings.query_embedding_cache_shared,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / shared_total, 3) if shared_total > 0 else 0,
+            },
+        }
 
     async def batch_generate_embeddings(
         self,
         texts: list[str],
         batch_size: int = 100,
-    ) -> list[list[float]]:
+    ) -> list[Optional[list[float]]]:
         """
         複数テキストのベクトル埋め込みを一括生成
+
+        正規化したテキストのハッシュで埋め込みキャッシュを確認し、
+        キャッシュにないテキストのみ生成する（同じテキストは1回だけ生成）。
+        バッチは同時実行数とリクエスト間隔を制限して並列に生成し、失敗したバッチは
+        指数バックオフで再試行する
+
+        Returns:
+            textsと同じ順の埋め込み（再試行しても生成できなかったテキストはNone）
         """
+        normalized_texts = [normalize_embedding_text(text) for text in texts]
+        text_hashes = [hash_embedding_text(text) for text in normalized_texts]
+
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, self.batch_generate_embeddings_sync, texts, batch_size
+        embeddings_by_hash = await loop.run_in_executor(
+            None, self._load_cached_documents, text_hashes
+        )
+
+        pending = {
+            text_hash: text
+            for text_hash, text in zip(text_hashes, normalized_texts)
+            if text_hash not in embeddings_by_hash
+        }
+        logger.info(
+            f"Embedding cache: {len(texts) - len(pending)} hits, {len(pending)} texts to embed"
+        )
+
+        pending_hashes = list(pending)
+        batches = [
+            pending_hashes[i : i + batch_size] for i in range(0, len(pending_hashes), batch_size)
+        ]
+        semaphore = asyncio.Semaphore(settings.embedding_concurrency)
+        batch_results = await asyncio.gather(
+            *(
+                self._embed_batch(semaphore, [pending[text_hash] for text_hash in batch_hashes])
+                for batch_hashes in batches
+            )
+        )
+
+        generated = {}
+        for batch_hashes, vectors in zip(batches, batch_results):
+            if vectors is not None:
+                generated.update(zip(batch_hashes, vectors))
+
+        await loop.run_in_executor(None, self._store_cached_documents, generated)
+
+        embeddings_by_hash.update(generated)
+        return [embeddings_by_hash.get(text_hash) for text_hash in text_hashes]
+
+    async def _embed_batch(
+        self, semaphore: asyncio.Semaphore, batch: list[str]
+    ) -> Optional[list[list[float]]]:
+        """1バッチの埋め込みを生成（失敗時は再試行し、最終的に失敗した場合はNone）"""
+        loop = asyncio.get_event_loop()
+        async with semaphore:
+            try:
+                async for attempt in AsyncRetrying(
+                    stop=stop_after_attempt(settings.embedding_max_attempts),
+                    wait=wait_exponential(multiplier=1, min=2, max=30),
+                    reraise=True,
+                ):
+                    with attempt:
+                        await self._rate_limiter.acquire()
+                        return await loop.run_in_executor(None, self._embed_documents_sync, batch)
+            except Exception as e:
+                logger.error(f"Batch embedding failed ({len(batch)} texts): {e}")
+                return None
+
+    def _embed_documents_sync(self, batch: list[str]) -> list[list[float]]:
+        """1バッチの埋め込みをAPIで生成"""
+        result = genai.embed_content(
+            model=self.model,
+            content=batch,
+            task_type=DOCUMENT_TASK_TYPE,
         )
+        # 単一テキストの場合はリストでラップ
+        if isinstance(result["embedding"][0], float):
+            vectors = [result["embedding"]]
+        else:
+            vectors = result["embedding"]
+
+        if len(vectors) != len(batch):
+            raise ValueError(f"Expected {len(batch)} embeddings, got {len(vectors)}")
+        return vectors
+
+    def _load_cached_documents(self, text_hashes: list[str]) -> dict[str, list[float]]:
+        """キャッシュ済みのレビュー埋め込みを取得"""
+        if not settings.embedding_cache_enabled:
+            return {}
+        with SessionLocal() as cache_db:
+            return self._get_cached_embeddings(cache_db, DOCUMENT_TASK_TYPE, text_hashes)
+
+    def _store_cached_documents(self, embeddings: dict[str, list[float]]) -> None:
+        """生成したレビュー埋め込みをキャッシュに保存"""
+        if not settings.embedding_cache_enabled or not embeddings:
+            return
+        with SessionLocal() as cache_db:
+            self._put_cached_embeddings(cache_db, DOCUMENT_TASK_TYPE, embeddings)
+
+    def _get_cached_embeddings(
+        self, cache_db: Optional[Session], task_type: str, text_hashes: list[str]
+    ) -> dict[str, list[float]]:
+        """キャッシュ済みの埋め込みを取得（キャッシュの障害時は全件生成する）"""
+        if cache_db is None:
+            return {}
+        try:
+            return EmbeddingCacheService(cache_db).get_many(self.model, task_type, text_hashes)
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            cache_db.rollback()
+            return {}
+
+    def _put_cached_embeddings(
+        self, cache_db: Optional[Session], task_type: str, embeddings: dict[str, list[float]]
+    ) -> None:
+        """生成した埋め込みをキャッシュに保存"""
+        if cache_db is None or not embeddings:
+            return
+        try:
+            EmbeddingCacheService(cache_db).put_many(self.model, task_type, embeddings)
+        except Exception as e:
+            logger.warning(f"Embedding cache store failed: {e}")
+            cache_db.rollback()
 
 
 @dataclass
@@ -125,6 +322,8 @@ class EmbeddingBatchResult:
     skipped: int
     failed: int
     errors: list[str]
+    duration_seconds: float = 0.0
+    reviews_per_second: float = 0.0
 
 
 class ReviewEmbeddingService:
@@ -191,34 +390,67 @@ class ReviewEmbeddingService:
             return result
 
         logger.info(f"Generating embeddings for {len(texts)} reviews")
+        started = time.perf_counter()
 
         try:
-            # 埋め込みを生成
+            # 埋め込みを生成（キャッシュ済みのテキストはAPIを呼び出さない）
             embeddings = await self.embedding_service.batch_generate_embeddings(texts)
 
-            # DBに保存
+            # 生成できなかったレビューはNULLのまま残し、次回の実行で再試行する
+            rows = []
             for review, embedding in zip(valid_reviews, embeddings):
-                try:
-                    # pgvector形式で保存
-                    self.db.execute(
-                        text("UPDATE reviews SET embedding = :embedding WHERE id = :id"),
-                        {"embedding": embedding, "id": str(review.id)},
-                    )
-                    result.embedded += 1
-                except Exception as e:
+                if embedding is None:
                     result.failed += 1
-                    result.errors.append(f"Review {review.id}: {str(e)}")
+                else:
+                    rows.append((review.id, embedding))
 
-            self.db.commit()
-            logger.info(f"Embedded {result.embedded} reviews")
+            # DBに保存
+            try:
+                self.save_embeddings(rows)
+                result.embedded = len(rows)
+            except Exception as e:
+                self.db.rollback()
+                result.failed += len(rows)
+                result.errors.append(f"Saving embeddings failed: {str(e)}")
+                logger.error(f"Saving embeddings failed: {e}")
+
+            if result.failed:
+                result.errors.append(
+                    f"{result.failed} reviews failed to embed (left NULL for retry)"
+                )
 
         except Exception as e:
             result.failed = len(valid_reviews)
             result.errors.append(f"Batch embedding failed: {str(e)}")
             logger.error(f"Embedding batch failed: {e}")
 
+        result.duration_seconds = round(time.perf_counter() - started, 3)
+        if result.duration_seconds > 0:
+            result.reviews_per_second = round(result.embedded / result.duration_seconds, 1)
+        logger.info(
+            f"Embedded {result.embedded} reviews in {result.duration_seconds}s "
+            f"({result.reviews_per_second} reviews/s, failed {result.failed})"
+        )
+
         return result
 
+    def save_embeddings(self, rows: list[tuple[UUID, list[float]]]) -> None:
+        """
+        レビューの埋め込みを一括保存
+
+        SAVE_CHUNK_SIZE 件ごとに UPDATE ... FROM unnest(...) の1ステートメントで更新する
+        """
+        for i in range(0, len(rows), SAVE_CHUNK_SIZE):
+            chunk = rows[i : i + SAVE_CHUNK_SIZE]
+            self.db.execute(
+                text(BULK_UPDATE_EMBEDDINGS_SQL),
+                {
+                    "ids": [str(review_id) for review_id, _ in chunk],
+                    "embeddings": [to_vector_literal(embedding) for _, embedding in chunk],
+                },
+            )
+        self.db.commit()
+
     async def embed_shop_reviews(self, shop_id: UUID) -> EmbeddingBatchResult:
         """特定店舗のレビューを埋め込み"""
         reviews = (
@@ -7,7 +7,8 @@ import logging
 from dataclasses import dataclass
 from typing import Optional
 
-from sqlalchemy import text
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.ai.embeddings import get_embedding_service
@@ -40,9 +41,9 @@ class ChatSearchResponse:
 
 
 class RAGSearchService:
-    """RAG検索サービス"""
+    """RAG検索サービス（AsyncSessionでイベントループをブロックせずに問い合わせる）"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.embedding_service = get_embedding_service()
         self.llm_client = get_gemini_client()
@@ -89,13 +90,14 @@ class RAGSearchService:
         """
         )
 
-        results = self.db.execute(
+        result = await self.db.execute(
             sql,
             {
                 "query_embedding": embedding_str,
                 "limit": limit,
             },
-        ).fetchall()
+        )
+        results = result.fetchall()
 
         # しきい値でフィルタ
         filtered_results = [
@@ -135,6 +137,11 @@ class RAGSearchService:
         if not similar_reviews:
             return []
 
+        # 該当店舗の解析結果を一括取得
+        analytics_by_shop = await self._get_analytics_by_shop(
+            {review["shop_id"] for review in similar_reviews}
+        )
+
         # 店舗ごとにグループ化
         shop_results: dict[str, SearchResult] = {}
 
@@ -142,32 +149,12 @@ class RAGSearchService:
             shop_id = review["shop_id"]
 
             if shop_id not in shop_results:
-                # 解析結果を取得
-                analytics = (
-                    self.db.query(ShopAIAnalytics)
-                    .filter(ShopAIAnalytics.shop_id == shop_id)
-                    .first()
-                )
-
-                analytics_dict = None
-                if analytics:
-                    analytics_dict = {
-                        "risk_level": analytics.risk_level,
-                        "score_operation": analytics.score_operation,
-                        "score_accuracy": analytics.score_accuracy,
-                        "score_hygiene": analytics.score_hygiene,
-                        "score_sincerity": analytics.score_sincerity,
-                        "score_safety": analytics.score_safety,
-                        "sakura_risk": analytics.sakura_risk,
-                        "risk_summary": analytics.risk_summary,
-                    }
-
                 shop_results[shop_id] = SearchResult(
                     shop_id=shop_id,
                     shop_name=review["shop_name"],
                     relevance_score=review["similarity"],
                     matched_reviews=[],
-                    analytics=analytics_dict,
+                    analytics=analytics_by_shop.get(shop_id),
                 )
 
             # レビューを追加
@@ -192,6 +179,34 @@ class RAGSearchService:
 
         return sorted_results[:limit]
 
+    async def _get_analytics_by_shop(self, shop_ids: set[str]) -> dict[str, dict]:
+        """
+        複数店舗の解析結果を1回のクエリで取得
+
+        Returns:
+            {店舗ID: 解析結果のdict}（解析結果がない店舗は含まない）
+        """
+        if not shop_ids:
+            return {}
+
+        rows = await self.db.scalars(
+            select(ShopAIAnalytics).where(ShopAIAnalytics.shop_id.in_(shop_ids))
+        )
+
+        return {
+            str(analytics.shop_id): {
+                "risk_level": analytics.risk_level,
+                "score_operation": analytics.score_operation,
+                "score_accuracy": analytics.score_accuracy,
+                "score_hygiene": analytics.score_hygiene,
+                "score_sincerity": analytics.score_sincerity,
+                "score_safety": analytics.score_safety,
+                "sakura_risk": analytics.sakura_risk,
+                "risk_summary": analytics.risk_summary,
+            }
+            for analytics in rows
+        }
+
     async def chat_search(
         self,
         query: str,
@@ -210,6 +225,9 @@ class RAGSearchService:
         # 店舗検索
         results = await self.search_shops_by_query(query, limit=limit)
 
+        # 以降はDBを使わないため、LLMの応答待ちの間に接続を保持しないようプールへ返却する
+        await self.db.close()
+
         if not results:
             return ChatSearchResponse(
                 query=query,
@@ -321,18 +339,8 @@ class StructuredSearchService:
             query = query.filter(ShopAIAnalytics.sakura_risk <= max_sakura_risk)
 
         if min_score is not None:
-            # 平均スコアでフィルタ
-            query = query.filter(
-                (
-                    ShopAIAnalytics.score_operation
-                    + ShopAIAnalytics.score_accuracy
-                    + ShopAIAnalytics.score_hygiene
-                    + ShopAIAnalytics.score_sincerity
-                    + ShopAIAnalytics.score_safety
-                )
-                / 5
-                >= min_score
-            )
+            # 平均スコアでフィルタ（生成列のインデックスを使用）
+            query = query.filter(ShopAIAnalytics.avg_score >= min_score)
 
         return query.limit(limit).all()
 
@@ -1,8 +1,14 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.db.session import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    SessionLocal,
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -11,3 +17,23 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """読み取り専用セッション（GETエンドポイント用、レプリカに接続）"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """読み取り専用の非同期セッション（GETエンドポイント用、レプリカに接続）"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,70 @@
+"""
+条件付きGET（ETag / If-None-Match）のヘルパー
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.api.responses import json_bytes_response
+from app.services.response_cache import CachedResponse
+
+
+def make_etag(*parts) -> str:
+    """検証子の構成要素からETagを生成"""
+    raw = "|".join(str(part) for part in parts)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-MatchヘッダーがETagと一致するか（弱い比較）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def check_etag(request: Request, response: Response, *parts) -> Optional[Response]:
+    """
+    ETagを設定し、クライアントのキャッシュが有効なら304レスポンスを返す
+
+    Args:
+        request: リクエスト
+        response: 通常レスポンス（ETagヘッダーを設定する）
+        *parts: 検証子の構成要素（更新日時、件数など）
+
+    Returns:
+        304レスポンス（変更がない場合）またはNone
+    """
+    return apply_etag(request, response, make_etag(*parts))
+
+
+def apply_etag(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """生成済みのETagを設定し、クライアントのキャッシュが有効なら304レスポンスを返す"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+def respond_cached(request: Request, response: Response, cached: CachedResponse):
+    """
+    レスポンスキャッシュのエントリを返す
+
+    保存時のETagと一致すれば304、それ以外はキャッシュした本体を返す
+    （シリアライズ済みのJSONバイト列はそのままレスポンスにする）
+    """
+    if cached.etag and (not_modified := apply_etag(request, response, cached.etag)):
+        return not_modified
+    if isinstance(cached.body, bytes):
+        return json_bytes_response(cached.body, response)
+    return cached.body
@@ -0,0 +1,28 @@
+"""
+高速JSONレスポンスのヘルパー
+DBから取得した値をPydanticを経由せずにorjsonでシリアライズする
+"""
+
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+
+def dump_json(content: Any) -> bytes:
+    """dict/list（UUID・datetimeを含む）をJSONバイト列に変換"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_bytes_response(body: bytes, response: Response) -> Response:
+    """
+    シリアライズ済みのJSONをレスポンスとして返す
+
+    Responseを直接返すとFastAPIは依存関係のresponseのヘッダーを引き継がないため、
+    ETagなどのヘッダーをここで引き継ぐ
+    """
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
@@ -1,14 +1,17 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_db, get_read_db
+from app.api.etag import check_etag
 from app.models.analytics import ShopAIAnalytics
 from app.models.shop import Shop
 from app.schemas.analytics import AnalyticsResponse
+from app.services.response_cache import get_response_cache
 
 router = APIRouter()
 
@@ -35,7 +38,9 @@ class AnalyzeResponse(BaseModel):
 @router.get("/shop/{shop_id}", response_model=AnalyticsResponse)
 def get_shop_analytics(
     shop_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
 ):
     """店舗のAI解析結果を取得"""
     analytics = db.query(ShopAIAnalytics).filter(ShopAIAnalytics.shop_id == shop_id).first()
@@ -43,17 +48,28 @@ def get_shop_analytics(
     if not analytics:
         raise HTTPException(status_code=404, detail="Analytics not found for this shop")
 
+    if not_modified := check_etag(
+        request, response, "analytics", shop_id, analytics.last_analyzed_at
+    ):
+        return not_modified
+
     return analytics
 
 
 @router.get("/risk-summary")
 def get_risk_summary(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     risk_level: Optional[str] = Query(None, description="safe/gamble/mine/fake"),
 ):
     """リスクレベル別の店舗数サマリーを取得"""
     from sqlalchemy import func
 
+    cache = get_response_cache()
+    cache_key = cache.make_key("risk_summary", request.query_params.multi_items())
+    if cached := cache.get(cache_key):
+        return cached.body
+
     query = db.query(
         ShopAIAnalytics.risk_level,
         func.count(ShopAIAnalytics.shop_id).label("count"),
@@ -64,15 +80,18 @@ def get_risk_summary(
 
     results = query.all()
 
-    return {
-        "summary": [{"risk_level": r.risk_level, "count": r.count} for r in results],
-        "total": sum(r.count for r in results),
-    }
+    return cache.set(
+        cache_key,
+        {
+            "summary": [{"risk_level": r.risk_level, "count": r.count} for r in results],
+            "total": sum(r.count for r in results),
+        },
+    )
 
 
 @router.get("/unanalyzed")
 def get_unanalyzed_shops(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = Query(50, ge=1, le=200),
 ):
     """未解析の店舗一覧を取得"""
@@ -102,7 +121,7 @@ def get_unanalyzed_shops(
 async def analyze_single_shop(
     shop_id: UUID,
     force: bool = Query(False, description="既存の解析結果を上書きするか"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     単一店舗のレビューを解析
@@ -113,7 +132,7 @@ async def analyze_single_shop(
     from app.ai.analyzer import ReviewAnalyzer
 
     # 店舗存在チェック
-    shop = db.query(Shop).filter(Shop.id == shop_id).first()
+    shop = await db.get(Shop, shop_id)
     if not shop:
         raise HTTPException(status_code=404, detail="Shop not found")
 
@@ -134,7 +153,7 @@ async def analyze_single_shop(
 @router.post("/analyze/batch", response_model=AnalyzeResponse)
 async def analyze_batch(
     request: AnalyzeRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     バッチ解析を実行
@@ -154,7 +173,7 @@ async def analyze_batch(
             results = await analyzer.analyze_multiple_shops(uuids, force=request.force)
         else:
             # 未解析店舗を解析
-            unanalyzed_shops = analyzer.get_unanalyzed_shops(limit=request.limit)
+            unanalyzed_shops = await analyzer.get_unanalyzed_shops(limit=request.limit)
             shop_ids = [shop.id for shop in unanalyzed_shops]
             results = await analyzer.analyze_multiple_shops(shop_ids, force=request.force)
 
@@ -208,6 +227,27 @@ async def analyze_background(
     }
 
 
+@router.get("/cache/status")
+def get_cache_status():
+    """プロセス内キャッシュ（レスポンス・タイル・検索クエリの埋め込み）のヒット率などを取得"""
+    from app.ai.embeddings import get_embedding_service
+    from app.services.tile_service import get_tile_cache
+
+    return {
+        "response_cache": get_response_cache().get_stats(),
+        "tile_cache": get_tile_cache().get_stats(),
+        "query_embedding_cache": get_embedding_service().get_query_cache_stats(),
+    }
+
+
+@router.get("/pool/status")
+def get_pool_status():
+    """DB接続プールの状態と接続の保持時間（貸出から返却まで）を取得"""
+    from app.db.pool_metrics import get_pool_metrics
+
+    return get_pool_metrics()
+
+
 @router.get("/scheduler/status")
 def get_scheduler_status():
     """スケジューラの状態を取得"""
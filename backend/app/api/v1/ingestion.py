@@ -5,20 +5,34 @@ from uuid import UUID
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db
 from app.models.shop import Shop
 from app.services.apify_client import ApifyReviewsService
 from app.services.ingestion import PREDEFINED_AREAS, AreaDefinition, IngestionService
 from app.services.places_api import PlacesAPIClient
-from app.services.review_service import ReviewService
-from app.services.shop_service import ShopService
+from app.services.review_loader import ReviewLoader
+from app.services.review_service import REVIEW_SAVE_MODES
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MODE_DESCRIPTION = (
+    "sync=差分同期（変更のないレビューの埋め込み・翻訳を保持）, replace=全削除して再作成"
+)
+
+
+def _validate_mode(mode: str) -> str:
+    """レビュー保存モードを検証"""
+    if mode not in REVIEW_SAVE_MODES:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid mode: {mode}. Valid: {REVIEW_SAVE_MODES}"
+        )
+    return mode
+
 
 class IngestionRequest(BaseModel):
     area_key: Optional[str] = None
@@ -52,7 +66,7 @@ def get_available_areas():
 @router.post("/run", response_model=IngestionResponse)
 async def run_ingestion(
     request: IngestionRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     指定エリアのデータ取込を実行
@@ -104,7 +118,7 @@ async def run_ingestion(
 async def run_multiple_ingestion(
     area_keys: list[str] = Query(..., description="取込するエリアキーのリスト"),
     fetch_reviews: bool = Query(True),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """複数エリアのデータ取込を実行"""
     # エリアキーの検証
@@ -141,26 +155,33 @@ async def run_multiple_ingestion(
 @router.post("/refresh-reviews")
 async def refresh_reviews(
     limit: int = Query(100, description="処理する店舗数の上限"),
-    db: Session = Depends(get_db),
+    mode: str = Query("sync", description=MODE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     既存店舗のレビューを日本語で再取得
 
-    Google Places APIから日本語でレビューを再取得し、
-    既存の英語レビューを置き換えます。
+    Google Places APIから日本語でレビューを再取得します。
+
+    - sync（既定）: 既存レビューと投稿者・投稿日で突き合わせ、英語などで保存済みの
+      レビューを日本語の本文に更新します（本文が変わったレビューは埋め込み・翻訳を再生成の対象にする）。
+      Places APIは1店舗あたり最大5件しか返さないため、取得結果にないレビューは削除しません。
+    - replace: 既存レビューをすべて削除し、取得した最大5件で置き換えます。
     """
+    _validate_mode(mode)
     places_client = PlacesAPIClient()
-    shop_service = ShopService(db)
-    review_service = ReviewService(db)
+    ingestion_service = IngestionService(db)
 
     # 全店舗を取得
-    shops, total = shop_service.get_all(limit=limit)
+    shops = (await db.scalars(select(Shop).limit(limit))).all()
 
     result = {
         "total_shops": len(shops),
         "processed": 0,
         "reviews_deleted": 0,
         "reviews_created": 0,
+        "reviews_updated": 0,
+        "reviews_unchanged": 0,
         "errors": [],
     }
 
@@ -171,18 +192,14 @@ async def refresh_reviews(
                 place_id=shop.place_id, language_code="ja"
             )
 
-            # 既存レビューを削除
-            deleted_count = review_service.delete_by_shop_id(shop.id)
-            result["reviews_deleted"] += deleted_count
-
-            # 新しいレビューを保存
+            # 既存レビューと同期して保存（言語が違っても投稿者・投稿日で同じレビューを更新し、
+            # Apifyで取得したレビューを消さないよう削除はしない）
             reviews_data = places_client.parse_reviews(detail)
-            if reviews_data:
-                created_reviews = review_service.bulk_create(
-                    shop_id=shop.id,
-                    reviews_data=reviews_data,
-                )
-                result["reviews_created"] += len(created_reviews)
+            counts = await ingestion_service.save_reviews(
+                shop.id, reviews_data, mode, delete_missing=False
+            )
+            for key, count in counts.items():
+                result[f"reviews_{key}"] += count
 
             result["processed"] += 1
 
@@ -204,16 +221,20 @@ async def refresh_reviews(
 async def fetch_all_reviews(
     shop_id: UUID,
     max_reviews: int = Query(100, ge=10, le=500, description="取得する最大レビュー数"),
-    db: Session = Depends(get_db),
+    mode: str = Query("sync", description=MODE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Apifyを使用して店舗のレビュー全件を取得
 
     Google Places APIの5件制限を超えて、全レビューを取得します。
-    既存のレビューは削除され、新しいレビューに置き換えられます。
+    既存のレビューは取得結果と同期されます（mode=replaceの場合は削除して置き換え）。
+    取得件数が0件またはmax_reviewsに達した場合は、取得結果にないレビューを削除しません。
     """
+    _validate_mode(mode)
+
     # 店舗取得
-    shop = db.query(Shop).filter(Shop.id == shop_id).first()
+    shop = await db.get(Shop, shop_id)
     if not shop:
         raise HTTPException(status_code=404, detail="Shop not found")
 
@@ -226,22 +247,24 @@ async def fetch_all_reviews(
             language="ja",
         )
 
-        # 既存レビュー削除 & 新規保存
-        review_service = ReviewService(db)
-        deleted_count = review_service.delete_by_shop_id(shop_id)
-        created_reviews = review_service.bulk_create(shop_id, reviews)
+        # 既存レビューと同期して保存（取得が空、またはmax_reviewsで打ち切られた場合は削除しない）
+        counts = await IngestionService(db).save_reviews(
+            shop_id, reviews, mode, delete_missing=0 < len(reviews) < max_reviews
+        )
 
         logger.info(
-            f"Shop {shop.name}: deleted {deleted_count}, "
-            f"fetched {len(reviews)}, created {len(created_reviews)}"
+            f"Shop {shop.name}: fetched {len(reviews)}, created {counts['created']}, "
+            f"updated {counts['updated']}, deleted {counts['deleted']}"
         )
 
         return {
             "shop_id": str(shop_id),
             "shop_name": shop.name,
-            "reviews_deleted": deleted_count,
+            "reviews_deleted": counts["deleted"],
             "reviews_fetched": len(reviews),
-            "reviews_created": len(created_reviews),
+            "reviews_created": counts["created"],
+            "reviews_updated": counts["updated"],
+            "reviews_unchanged": counts["unchanged"],
         }
 
     except ValueError as e:
@@ -255,53 +278,55 @@ async def fetch_all_reviews(
 async def fetch_all_reviews_batch(
     shop_ids: Optional[list[UUID]] = Body(None, description="対象店舗ID（省略時は全店舗）"),
     max_reviews: int = Query(100, ge=10, le=500, description="店舗あたりの最大レビュー数"),
-    db: Session = Depends(get_db),
+    mode: str = Query("sync", description=MODE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     複数店舗のレビューを一括取得
 
     shop_idsを省略すると全店舗が対象になります。
     レート制限のため、店舗間に1秒の間隔を設けます。
+    取得したレビューはCOPYで一時テーブルに流し込み、一定件数ごとにまとめて既存レビューと同期します。
     """
-    # 対象店舗を取得
+    _validate_mode(mode)
+
+    # 対象店舗を取得（Apifyの取得中にトランザクションを保持しないよう、読み込んだら終了する）
+    query = select(Shop.id, Shop.place_id, Shop.name)
     if shop_ids:
-        shops = db.query(Shop).filter(Shop.id.in_(shop_ids)).all()
-    else:
-        shops = db.query(Shop).all()
+        query = query.where(Shop.id.in_(shop_ids))
+    shops = (await db.execute(query)).all()
+    await db.commit()
 
     if not shops:
         raise HTTPException(status_code=404, detail="No shops found")
 
+    loader = ReviewLoader(db, mode=mode)
     results = []
     total_fetched = 0
-    total_created = 0
 
     for i, shop in enumerate(shops):
         logger.info(f"Processing shop {i+1}/{len(shops)}: {shop.name}")
 
         try:
-            # Apifyでレビュー取得
+            # Apifyでレビュー取得（正規化しながらローダーへ）
             apify_service = ApifyReviewsService()
-            reviews = await apify_service.fetch_reviews_by_place_id(
-                place_id=shop.place_id,
-                max_reviews=max_reviews,
-                language="ja",
+            fetched_count = await loader.add(
+                shop.id,
+                apify_service.iterate_reviews(
+                    apify_service.place_url(shop.place_id),
+                    max_reviews=max_reviews,
+                    language="ja",
+                ),
+                source_limit=max_reviews,
             )
 
-            # 既存レビュー削除 & 新規保存
-            review_service = ReviewService(db)
-            review_service.delete_by_shop_id(shop.id)
-            created_reviews = review_service.bulk_create(shop.id, reviews)
-
             result = {
                 "shop_id": str(shop.id),
                 "shop_name": shop.name,
-                "reviews_fetched": len(reviews),
-                "reviews_created": len(created_reviews),
+                "reviews_fetched": fetched_count,
                 "status": "success",
             }
-            total_fetched += len(reviews)
-            total_created += len(created_reviews)
+            total_fetched += fetched_count
 
         except Exception as e:
             logger.error(f"Error fetching reviews for shop {shop.id}: {e}")
@@ -314,15 +339,30 @@ async def fetch_all_reviews_batch(
 
         results.append(result)
 
+        # 既存レビューと同期して保存（バッチ単位）
+        if loader.is_full:
+            await loader.flush()
+
         # レート制限（最後の店舗以外）
         if i < len(shops) - 1:
             await asyncio.sleep(1)
 
+    await loader.flush()
+
+    for result in results:
+        if result["status"] == "success":
+            counts = loader.get_counts(UUID(result["shop_id"]))
+            result.update({f"reviews_{kind}": count for kind, count in counts.items()})
+
+    totals = loader.get_totals()
+
     return {
         "total_shops": len(shops),
         "successful": sum(1 for r in results if r.get("status") == "success"),
         "failed": sum(1 for r in results if r.get("status") == "failed"),
         "total_reviews_fetched": total_fetched,
-        "total_reviews_created": total_created,
+        "total_reviews_created": totals["created"],
+        "total_reviews_updated": totals["updated"],
+        "total_reviews_deleted": totals["deleted"],
         "results": results,
     }
@@ -3,7 +3,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_read_db
 from app.schemas.review import ReviewResponse
 from app.services.review_service import ReviewService
 
@@ -13,7 +13,7 @@ router = APIRouter()
 @router.get("/{review_id}", response_model=ReviewResponse)
 def get_review(
     review_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """レビュー詳細を取得"""
     review_service = ReviewService(db)
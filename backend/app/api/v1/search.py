@@ -5,11 +5,13 @@ AI検索API
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_async_read_db, get_db, get_read_db
+from app.services.response_cache import get_response_cache
 
 router = APIRouter()
 
@@ -54,6 +56,8 @@ class EmbeddingResponse(BaseModel):
     skipped: int
     failed: int
     errors: list[str]
+    duration_seconds: float = 0.0
+    reviews_per_second: float = 0.0
 
 
 class TranslationRequest(BaseModel):
@@ -75,7 +79,7 @@ class TranslationResponse(BaseModel):
 @router.post("/chat", response_model=ChatSearchResponse)
 async def chat_search(
     request: ChatSearchRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     自然言語でメンズエステ店を検索
@@ -122,7 +126,7 @@ async def chat_search(
 async def vector_search(
     query: str = Query(..., min_length=2, description="検索クエリ"),
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     ベクトル類似度検索（デバッグ用）
@@ -151,6 +155,7 @@ async def vector_search(
 
 @router.get("/structured")
 def structured_search(
+    request: Request,
     min_score: Optional[int] = Query(None, ge=0, le=10, description="最低平均スコア"),
     max_sakura_risk: Optional[int] = Query(None, ge=0, le=100, description="最大サクラリスク"),
     risk_levels: Optional[str] = Query(
@@ -158,7 +163,7 @@ def structured_search(
     ),
     min_rating: Optional[float] = Query(None, ge=0, le=5, description="最低Google評価"),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     構造化条件で店舗を検索
@@ -166,6 +171,11 @@ def structured_search(
     from app.ai.rag_search import StructuredSearchService
     from app.services.shop_service import ShopService
 
+    cache = get_response_cache()
+    cache_key = cache.make_key("structured", request.query_params.multi_items())
+    if cached := cache.get(cache_key):
+        return cached.body
+
     search_service = StructuredSearchService(db)
 
     # リスクレベルをリストに変換
@@ -181,16 +191,19 @@ def structured_search(
         limit=limit,
     )
 
-    return {
-        "results": [ShopService.shop_to_response(shop) for shop in shops],
-        "total": len(shops),
-        "filters": {
-            "min_score": min_score,
-            "max_sakura_risk": max_sakura_risk,
-            "risk_levels": risk_level_list,
-            "min_rating": min_rating,
+    return cache.set(
+        cache_key,
+        {
+            "results": [ShopService.shop_to_response(shop) for shop in shops],
+            "total": len(shops),
+            "filters": {
+                "min_score": min_score,
+                "max_sakura_risk": max_sakura_risk,
+                "risk_levels": risk_level_list,
+                "min_rating": min_rating,
+            },
         },
-    }
+    )
 
 
 @router.post("/embeddings/generate", response_model=EmbeddingResponse)
@@ -216,6 +229,8 @@ async def generate_embeddings(
             skipped=result.skipped,
             failed=result.failed,
             errors=result.errors,
+            duration_seconds=result.duration_seconds,
+            reviews_per_second=result.reviews_per_second,
         )
 
     except Exception as e:
@@ -224,7 +239,7 @@ async def generate_embeddings(
 
 @router.get("/embeddings/status")
 def get_embedding_status(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     埋め込み状況を確認
@@ -306,7 +321,7 @@ async def generate_translations(
 
 @router.get("/translations/status")
 def get_translation_status(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     翻訳状況を確認
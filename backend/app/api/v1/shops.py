@@ -1,87 +1,344 @@
-from typing import Optional
+from typing import Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
+from app.api.etag import check_etag, respond_cached
+from app.api.responses import dump_json, json_bytes_response
 from app.schemas.review import ReviewListResponse
-from app.schemas.shop import ShopListResponse, ShopResponse
+from app.schemas.shop import (
+    ShopChangesResponse,
+    ShopCompactChangesResponse,
+    ShopCompactListResponse,
+    ShopCompactResponse,
+    ShopListResponse,
+    ShopResponse,
+    ViewportResponse,
+)
 from app.services.ingestion import PREDEFINED_AREAS
+from app.services.ranking_service import RANKING_RADIUS, RANKING_SORT_KEYS, RankingService
+from app.services.response_cache import get_response_cache
 from app.services.review_service import ReviewService
+from app.services.shop_change_service import ShopChangeService
 from app.services.shop_service import ShopService
+from app.services.tile_service import MAX_TILE_ZOOM, TileService
+from app.utils.cursor import decode_cursor, encode_cursor
 
 router = APIRouter()
 
+SHOP_VIEWS = ("full", "compact")
 
-@router.get("", response_model=ShopListResponse)
+# 近隣検索・ランキングの検索半径の上限（メートル）
+MAX_SEARCH_RADIUS = 50000.0
+
+
+def _validate_view(view: str) -> bool:
+    """viewパラメータを検証し、compactかどうかを返す"""
+    if view not in SHOP_VIEWS:
+        raise HTTPException(status_code=400, detail=f"Invalid view: {view}. Valid: {SHOP_VIEWS}")
+    return view == "compact"
+
+
+def _to_response(
+    shop, compact: bool, distance_m: Optional[float] = None
+) -> Union[ShopResponse, ShopCompactResponse]:
+    """店舗（またはcompact行）をレスポンスに変換"""
+    if compact:
+        return ShopService.compact_row_to_response(shop, distance_m=distance_m)
+    return ShopService.shop_to_response(shop, distance_m=distance_m)
+
+
+def _to_dicts(shops, compact: bool) -> list[dict]:
+    """店舗（またはcompact行）のリストをJSON出力用のdictに変換"""
+    to_dict = ShopService.compact_row_to_dict if compact else ShopService.shop_to_dict
+    return [to_dict(shop) for shop in shops]
+
+
+@router.get("", response_model=Union[ShopListResponse, ShopCompactListResponse])
 def get_shops(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=500),
     risk_level: Optional[str] = Query(None, description="safe/gamble/mine/fake"),
     min_rating: Optional[float] = Query(None, ge=0, le=5),
+    pagination: str = Query("offset", description="ページネーション方式: offset/cursor"),
+    cursor: Optional[str] = Query(None, description="前ページのnext_cursor（指定時はcursor方式）"),
+    sort_by: str = Query("created_at", description="cursor方式のソート基準: created_at/avg_score"),
+    include_total: bool = Query(False, description="cursor方式で正確な総件数を含めるか"),
+    view: str = Query("full", description="full=全項目, compact=地図表示用の軽量版"),
 ):
-    """店舗一覧を取得"""
-    skip = (page - 1) * per_page
+    """
+    店舗一覧を取得
+
+    - pagination=offset: page/per_pageによるページング（総件数を含む）
+    - pagination=cursor: next_cursorによるキーセットページング（深いページでも高速）
+    - view=compact: id/name/location/rating/risk_level/5スコアのみを返す
+
+    件数が多いため、Pydanticモデルを経由せずDBの値から直接JSONを生成する
+    """
+    compact = _validate_view(view)
+
+    cache = get_response_cache()
+    cache_key = cache.make_key("shops", request.query_params.multi_items())
+    if cached := cache.get(cache_key):
+        return respond_cached(request, response, cached)
+
     shop_service = ShopService(db)
+
+    if not_modified := check_etag(
+        request, response, "shops", *shop_service.get_data_version(), request.url.query
+    ):
+        return not_modified
+
+    if pagination == "cursor" or cursor is not None:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+            shops, next_after = shop_service.get_page_by_cursor(
+                limit=per_page,
+                after=after,
+                sort_by=sort_by,
+                risk_level=risk_level,
+                min_rating=min_rating,
+                compact=compact,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        total = None
+        total_is_estimate = False
+        if include_total:
+            total = shop_service.count(risk_level=risk_level, min_rating=min_rating)
+        elif not risk_level and min_rating is None:
+            total = shop_service.estimate_count()
+            total_is_estimate = total is not None
+
+        body = dump_json(
+            {
+                "shops": _to_dicts(shops, compact),
+                "total": total,
+                "page": None,
+                "per_page": per_page,
+                "next_cursor": encode_cursor(next_after) if next_after else None,
+                "total_is_estimate": total_is_estimate,
+            }
+        )
+        cache.set(cache_key, body, etag=response.headers.get("etag"))
+        return json_bytes_response(body, response)
+
+    if pagination != "offset":
+        raise HTTPException(status_code=400, detail=f"Invalid pagination: {pagination}")
+
+    skip = (page - 1) * per_page
     shops, total = shop_service.get_all(
         skip=skip,
         limit=per_page,
         risk_level=risk_level,
         min_rating=min_rating,
+        compact=compact,
     )
 
-    return ShopListResponse(
-        shops=[ShopService.shop_to_response(shop) for shop in shops],
-        total=total,
-        page=page,
-        per_page=per_page,
+    body = dump_json(
+        {
+            "shops": _to_dicts(shops, compact),
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "next_cursor": None,
+            "total_is_estimate": False,
+        }
     )
+    cache.set(cache_key, body, etag=response.headers.get("etag"))
+    return json_bytes_response(body, response)
 
 
-@router.get("/nearby", response_model=list[ShopResponse])
+@router.get("/nearby", response_model=Union[list[ShopResponse], list[ShopCompactResponse]])
 def get_nearby_shops(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     lat: float = Query(..., description="緯度"),
     lng: float = Query(..., description="経度"),
-    radius: float = Query(1000.0, description="検索半径（メートル）"),
+    radius: float = Query(1000.0, gt=0, le=MAX_SEARCH_RADIUS, description="検索半径（メートル）"),
     limit: int = Query(50, ge=1, le=100),
     risk_level: Optional[str] = Query(None, description="safe/gamble/mine/fake"),
+    view: str = Query("full", description="full=全項目, compact=地図表示用の軽量版"),
+    knn: bool = Query(False, description="距離順（近い順）に取得し、distance_mを含める"),
+    expand: bool = Query(
+        False, description="半径内がlimit件未満の場合、max_radiusまで範囲を広げて取得（knnを含む）"
+    ),
+    max_radius: float = Query(
+        20000.0, gt=0, le=MAX_SEARCH_RADIUS, description="expand時の検索半径の上限（メートル）"
+    ),
 ):
-    """指定座標の近隣店舗を取得"""
+    """
+    指定座標の近隣店舗を取得
+
+    - knn=true: GiSTインデックスを使って近い順にlimit件を取得
+    - expand=true: 半径に関係なく近い順にlimit件（max_radius以内）を取得
+    """
+    compact = _validate_view(view)
+    search_radius = max(max_radius, radius) if expand else radius
+
+    # compactは空間インデックスから返すため、DBへの問い合わせが必要なETag・キャッシュは使わない
+    # knn/expandは検索地点からの距離と距離順を返すため、座標を量子化せずにキーにする
+    cache = get_response_cache()
+    cache_key = cache.make_key(
+        "nearby",
+        request.query_params.multi_items(),
+        lat,
+        lng,
+        search_radius,
+        exact=knn or expand,
+    )
+    if not compact and (cached := cache.get(cache_key)):
+        return respond_cached(request, response, cached)
+
     shop_service = ShopService(db)
-    shops = shop_service.get_nearby(
-        latitude=lat,
-        longitude=lng,
-        radius_meters=radius,
-        limit=limit,
+
+    if not compact and (
+        not_modified := check_etag(
+            request, response, "nearby", *shop_service.get_data_version(), request.url.query
+        )
+    ):
+        return not_modified
+
+    if knn or expand:
+        results = shop_service.get_nearest(
+            latitude=lat,
+            longitude=lng,
+            limit=limit,
+            max_radius_meters=search_radius,
+            risk_level=risk_level,
+            compact=compact,
+        )
+        shops = [_to_response(shop, compact, distance_m) for shop, distance_m in results]
+    else:
+        shops = [
+            _to_response(shop, compact)
+            for shop in shop_service.get_nearby(
+                latitude=lat,
+                longitude=lng,
+                radius_meters=radius,
+                limit=limit,
+                risk_level=risk_level,
+                compact=compact,
+            )
+        ]
+
+    if compact:
+        return shops
+    return cache.set(cache_key, shops, etag=response.headers.get("etag"))
+
+
+@router.get("/viewport", response_model=ViewportResponse)
+def get_viewport_clusters(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    min_lat: float = Query(..., ge=-90, le=90, description="表示範囲の南端緯度"),
+    min_lng: float = Query(..., ge=-180, le=180, description="表示範囲の西端経度"),
+    max_lat: float = Query(..., ge=-90, le=90, description="表示範囲の北端緯度"),
+    max_lng: float = Query(..., ge=-180, le=180, description="表示範囲の東端経度"),
+    zoom: int = Query(..., ge=0, le=22, description="地図のズームレベル"),
+    risk_level: Optional[str] = Query(None, description="safe/gamble/mine/fake"),
+):
+    """
+    表示範囲内の店舗をクラスタリングして取得
+
+    店舗ごとのデータではなく、グリッド単位の件数・重心・リスクレベル内訳を返す。
+    count=1のクラスタにはshop_idが含まれる。
+    """
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+
+    shop_service = ShopService(db)
+
+    if not_modified := check_etag(
+        request, response, "viewport", *shop_service.get_data_version(), request.url.query
+    ):
+        return not_modified
+    rows, grid_size = shop_service.get_viewport_clusters(
+        min_lat=min_lat,
+        min_lng=min_lng,
+        max_lat=max_lat,
+        max_lng=max_lng,
+        zoom=zoom,
         risk_level=risk_level,
     )
 
-    return [ShopService.shop_to_response(shop) for shop in shops]
+    clusters = [ShopService.cluster_to_response(row) for row in rows]
+
+    return ViewportResponse(
+        zoom=zoom,
+        grid_size=grid_size,
+        clusters=clusters,
+        total=sum(cluster.count for cluster in clusters),
+    )
+
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+def get_shop_tile(
+    request: Request,
+    response: Response,
+    z: int = Path(..., ge=0, le=MAX_TILE_ZOOM, description="ズームレベル"),
+    x: int = Path(..., ge=0, description="タイルX座標"),
+    y: int = Path(..., ge=0, description="タイルY座標"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    店舗マーカーのベクタータイル（Mapbox Vector Tile）を取得
+
+    レイヤー名は"shops"、属性はid/name/rating/risk_level。
+    ETag付きで返し、ブラウザ・CDNには毎回再検証させる（店舗の更新が即座に反映される）。
+    """
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range")
+
+    tile_service = TileService(db)
+    version = tile_service.get_data_version()
+
+    if not_modified := check_etag(request, response, "tile", z, x, y, *version):
+        return not_modified
+
+    return Response(
+        content=tile_service.get_tile(z, x, y, version),
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={"ETag": response.headers["etag"], "Cache-Control": "no-cache"},
+    )
 
 
 @router.get("/ranking")
 def get_shop_ranking(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     area: Optional[str] = Query(
         None, description="エリアキー: shinjuku/shibuya/ikebukuro/ueno/akihabara"
     ),
     lat: Optional[float] = Query(None, description="緯度（areaが指定されない場合必須）"),
     lng: Optional[float] = Query(None, description="経度（areaが指定されない場合必須）"),
-    radius: float = Query(2000.0, description="検索半径（メートル）"),
+    radius: float = Query(
+        RANKING_RADIUS, gt=0, le=MAX_SEARCH_RADIUS, description="検索半径（メートル）"
+    ),
     limit: int = Query(20, ge=1, le=50),
     sort_by: str = Query(
         "avg_score", description="ソート基準: avg_score/score_safety/score_accuracy"
     ),
+    view: str = Query("full", description="full=全項目, compact=地図表示用の軽量版"),
 ):
     """
     エリア内店舗の評価ランキングを取得
 
-    - area: 事前定義エリア（指定するとlat/lngは不要）
+    - area: 事前定義エリア（指定するとlat/lngは不要、事前計算済みのランキングを返す）
     - sort_by: avg_score=総合スコア, score_safety=安全性, score_accuracy=正確性
+    - view: compact指定時はshopに地図表示用の軽量版を返す
     """
+    compact = _validate_view(view)
+
     # エリアキーから座標を取得
     if area:
         area_def = PREDEFINED_AREAS.get(area)
@@ -97,33 +354,113 @@ def get_shop_ranking(
     if lat is None or lng is None:
         raise HTTPException(status_code=400, detail="Either area or lat/lng must be provided")
 
+    cache = get_response_cache()
+    cache_key = cache.make_key("ranking", request.query_params.multi_items(), lat, lng, radius)
+    if cached := cache.get(cache_key):
+        return respond_cached(request, response, cached)
+
     shop_service = ShopService(db)
-    results = shop_service.get_nearby_with_ranking(
-        latitude=lat,
-        longitude=lng,
-        radius_meters=radius,
-        limit=limit,
-        sort_by=sort_by,
+
+    if not_modified := check_etag(
+        request, response, "ranking", *shop_service.get_data_version(), request.url.query
+    ):
+        return not_modified
+
+    # 事前定義エリアはスケジューラが計算したランキングを参照
+    materialized = None
+    if area and radius == RANKING_RADIUS and sort_by in RANKING_SORT_KEYS:
+        materialized = RankingService(db).get_ranking(
+            area_key=area, sort_by=sort_by, limit=limit, compact=compact
+        )
+
+    if materialized:
+        results, refreshed_at = materialized
+    else:
+        results = shop_service.get_nearby_with_ranking(
+            latitude=lat,
+            longitude=lng,
+            radius_meters=radius,
+            limit=limit,
+            sort_by=sort_by,
+            compact=compact,
+        )
+        refreshed_at = None
+
+    return cache.set(
+        cache_key,
+        {
+            "area": area,
+            "total": len(results),
+            "refreshed_at": refreshed_at,
+            "ranking": [
+                {
+                    "rank": i + 1,
+                    "shop": _to_response(shop, compact),
+                    "avg_score": round(avg_score, 1),
+                }
+                for i, (shop, avg_score) in enumerate(results)
+            ],
+        },
+        etag=response.headers.get("etag"),
     )
 
-    return {
-        "area": area,
-        "total": len(results),
-        "ranking": [
-            {
-                "rank": i + 1,
-                "shop": ShopService.shop_to_response(shop),
-                "avg_score": round(avg_score, 1),
-            }
-            for i, (shop, avg_score) in enumerate(results)
-        ],
-    }
+
+@router.get("/changes", response_model=Union[ShopChangesResponse, ShopCompactChangesResponse])
+def get_shop_changes(
+    response: Response,
+    db: Session = Depends(get_read_db),
+    since: Optional[str] = Query(None, description="前回のレスポンスのtoken（省略時は全店舗）"),
+    view: str = Query("full", description="full=全項目, compact=地図表示用の軽量版"),
+):
+    """
+    前回の取得以降に作成・更新・削除された店舗を取得（差分同期）
+
+    - since省略時: 全店舗を返す（full=true）
+    - since指定時: 変更された店舗（解析結果の更新を含む）と削除された店舗IDを返す
+    - 返されたtokenを次回のsinceに指定する
+    """
+    compact = _validate_view(view)
+    change_service = ShopChangeService(db)
+    shop_service = ShopService(db)
+
+    since_token = None
+    if since is not None:
+        if not since.isdigit():
+            raise HTTPException(status_code=400, detail=f"Invalid token: {since}")
+        since_token = int(since)
+
+    # 店舗の取得より先にトークンを確定させる
+    token = change_service.get_current_token()
+
+    if since_token is None or since_token > token:
+        # 初回、またはDBの再作成などでトークンが先行している場合は全件を返す
+        shops = shop_service.get_by_ids(compact=compact)
+        deleted = []
+        full = True
+    else:
+        shop_ids = change_service.get_changed_shop_ids(since_token)
+        shops = shop_service.get_by_ids(shop_ids, compact=compact)
+        found = {shop.id for shop in shops}
+        deleted = [shop_id for shop_id in shop_ids if shop_id not in found]
+        full = False
+
+    body = dump_json(
+        {
+            "token": str(token),
+            "full": full,
+            "shops": _to_dicts(shops, compact),
+            "deleted": deleted,
+        }
+    )
+    return json_bytes_response(body, response)
 
 
 @router.get("/{shop_id}", response_model=ShopResponse)
 def get_shop(
     shop_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
 ):
     """店舗詳細を取得"""
     shop_service = ShopService(db)
@@ -132,13 +469,18 @@ def get_shop(
     if not shop:
         raise HTTPException(status_code=404, detail="Shop not found")
 
+    if not_modified := check_etag(request, response, "shop", *ShopService.get_version(shop)):
+        return not_modified
+
     return ShopService.shop_to_response(shop)
 
 
 @router.get("/{shop_id}/reviews", response_model=ReviewListResponse)
 def get_shop_reviews(
     shop_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     limit: int = Query(50, ge=1, le=100),
     language: str | None = Query(None, description="言語コード（ja/en/null=全て）"),
 ):
@@ -150,6 +492,17 @@ def get_shop_reviews(
         raise HTTPException(status_code=404, detail="Shop not found")
 
     review_service = ReviewService(db)
+
+    if not_modified := check_etag(
+        request,
+        response,
+        "reviews",
+        shop_id,
+        *review_service.get_version_by_shop_id(shop_id),
+        request.url.query,
+    ):
+        return not_modified
+
     reviews = review_service.get_by_shop_id(shop_id, limit=limit, language=language)
 
     return ReviewListResponse(
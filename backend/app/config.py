@@ -6,6 +6,19 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Database
     database_url: str = "postgresql://esthe_user:esthe_password@db:5432/esthe_map"
+    # 読み取り専用レプリカ（未設定の場合はプライマリの接続プールを共有）
+    database_read_url: str = ""
+
+    # 接続プール（ワーカーあたりの最大接続数はpool_size + max_overflowの合計）
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_async_pool_size: int = 5
+    db_async_max_overflow: int = 5
+    # レプリカ用（database_read_url設定時のみ）
+    db_read_pool_size: int = 10
+    db_read_max_overflow: int = 20
+    db_async_read_pool_size: int = 5
+    db_async_read_max_overflow: int = 5
 
     # Google APIs
     google_places_api_key: str = ""
@@ -24,6 +37,31 @@ class Settings(BaseSettings):
     # API Settings
     api_v1_prefix: str = "/api/v1"
 
+    # 空間インデックス（近隣検索・ランキングのプロセス内キャッシュ）
+    spatial_index_enabled: bool = True
+    spatial_index_max_age_seconds: int = 300
+
+    # レスポンスキャッシュ（読み取り系APIのプロセス内キャッシュ）
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 60
+    response_cache_maxsize: int = 2048
+    response_cache_coordinate_precision: int = 3
+
+    # 埋め込みキャッシュ（同じテキストの埋め込みをDBに保存して再利用）
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_age_days: int = 90
+    embedding_cache_max_rows: int = 200000
+
+    # 埋め込みの一括生成（並列数・1分あたりのリクエスト数・バッチごとの試行回数）
+    embedding_concurrency: int = 4
+    embedding_requests_per_minute: int = 120
+    embedding_max_attempts: int = 3
+
+    # 検索クエリの埋め込みキャッシュ（プロセス内、sharedは埋め込みキャッシュのテーブルも使用）
+    query_embedding_cache_maxsize: int = 1024
+    query_embedding_cache_ttl_seconds: int = 3600
+    query_embedding_cache_shared: bool = True
+
     # Places API Settings
     places_api_base_url: str = "https://places.googleapis.com/v1"
 
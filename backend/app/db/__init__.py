@@ -1,3 +1,29 @@
-from app.db.session import SessionLocal, engine, get_db
+from app.db.session import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    SessionLocal,
+    async_engine,
+    async_read_engine,
+    engine,
+    get_async_db,
+    get_async_read_db,
+    get_db,
+    get_read_db,
+    read_engine,
+)
 
-__all__ = ["get_db", "engine", "SessionLocal"]
+__all__ = [
+    "get_db",
+    "get_read_db",
+    "get_async_db",
+    "get_async_read_db",
+    "engine",
+    "read_engine",
+    "async_engine",
+    "async_read_engine",
+    "SessionLocal",
+    "ReadSessionLocal",
+    "AsyncSessionLocal",
+    "AsyncReadSessionLocal",
+]
@@ -0,0 +1,103 @@
+"""
+接続プールのメトリクス
+接続の貸出（checkout）から返却（checkin）までの保持時間をエンジンごとに記録する
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 保持時間の統計に使う直近のサンプル数
+SAMPLE_WINDOW = 1000
+
+
+class PoolMetrics:
+    """エンジン1つ分の接続保持時間の統計"""
+
+    def __init__(self, name: str, engine: Engine, window: int = SAMPLE_WINDOW):
+        self.name = name
+        self.engine = engine
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.max_hold_ms = 0.0
+
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_at", None)
+        if started is None:
+            return
+
+        hold_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.checkins += 1
+            self._samples.append(hold_ms)
+            self.max_hold_ms = max(self.max_hold_ms, hold_ms)
+
+    def get_stats(self) -> dict:
+        """保持時間の統計と現在のプール状態を取得"""
+        with self._lock:
+            samples = sorted(self._samples)
+            checkouts = self.checkouts
+            checkins = self.checkins
+            max_hold_ms = self.max_hold_ms
+
+        pool = self.engine.pool
+        stats = {
+            "pool_size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "checkouts": checkouts,
+            "checkins": checkins,
+            "max_hold_ms": round(max_hold_ms, 1),
+        }
+
+        if samples:
+            stats.update(
+                {
+                    "avg_hold_ms": round(sum(samples) / len(samples), 1),
+                    "p50_hold_ms": round(samples[len(samples) // 2], 1),
+                    "p95_hold_ms": round(
+                        samples[min(int(len(samples) * 0.95), len(samples) - 1)], 1
+                    ),
+                }
+            )
+
+        return stats
+
+
+_pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def install_pool_metrics(name: str, engine: Engine) -> PoolMetrics:
+    """
+    エンジンに保持時間の計測を設定
+
+    非同期エンジンの場合はsync_engineを渡す
+    """
+    metrics = _pool_metrics.get(name)
+    if metrics is None:
+        metrics = PoolMetrics(name, engine)
+        _pool_metrics[name] = metrics
+    return metrics
+
+
+def get_pool_metrics(name: Optional[str] = None) -> dict:
+    """登録済みエンジンの統計を取得（name指定時はそのエンジンのみ）"""
+    return {
+        metrics_name: metrics.get_stats()
+        for metrics_name, metrics in _pool_metrics.items()
+        if name is None or metrics_name == name
+    }
@@ -1,19 +1,85 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import settings
+from app.db.pool_metrics import install_pool_metrics
 
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 読み取り専用エンジン（GETエンドポイント用）、誤って書き込んだ場合はDBがエラーにする
+# レプリカ未設定の場合はプライマリの接続プールを共有し、接続数を増やさない
+if settings.database_read_url:
+    read_engine = create_engine(
+        settings.database_read_url,
+        pool_pre_ping=True,
+        pool_size=settings.db_read_pool_size,
+        max_overflow=settings.db_read_max_overflow,
+        execution_options={"postgresql_readonly": True},
+    )
+else:
+    read_engine = engine.execution_options(postgresql_readonly=True)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+def to_async_url(database_url: str) -> URL:
+    """
+    同期用のDB URLをasyncpg用に変換
+
+    asyncpgはsslmodeを受け付けないため、sslに置き換える
+    """
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+
+    if "sslmode" in url.query:
+        query = dict(url.query)
+        query["ssl"] = query.pop("sslmode")
+        url = url.set(query=query)
+
+    return url
+
+
+# 非同期エンドポイント用のエンジン（イベントループをブロックしない）
+async_engine = create_async_engine(
+    to_async_url(settings.database_url),
+    pool_pre_ping=True,
+    pool_size=settings.db_async_pool_size,
+    max_overflow=settings.db_async_max_overflow,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+if settings.database_read_url:
+    async_read_engine = create_async_engine(
+        to_async_url(settings.database_read_url),
+        pool_pre_ping=True,
+        pool_size=settings.db_async_read_pool_size,
+        max_overflow=settings.db_async_read_max_overflow,
+        execution_options={"postgresql_readonly": True},
+    )
+else:
+    async_read_engine = async_engine.execution_options(postgresql_readonly=True)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -21,3 +87,30 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+# 接続の保持時間を計測（/analytics/pool/status で確認）
+# プライマリとプールを共有する読み取り用エンジンはプライマリ側で計測される
+install_pool_metrics("primary", engine)
+install_pool_metrics("async_primary", async_engine.sync_engine)
+if settings.database_read_url:
+    install_pool_metrics("read", read_engine)
+    install_pool_metrics("async_read", async_read_engine.sync_engine)
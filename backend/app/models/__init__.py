@@ -1,6 +1,17 @@
 from app.models.analytics import ShopAIAnalytics
 from app.models.base import Base
+from app.models.embedding_cache import EmbeddingCache
+from app.models.ranking import AreaRanking
 from app.models.review import Review
 from app.models.shop import Shop
+from app.models.shop_change import ShopChange
 
-__all__ = ["Base", "Shop", "Review", "ShopAIAnalytics"]
+__all__ = [
+    "Base",
+    "Shop",
+    "Review",
+    "ShopAIAnalytics",
+    "AreaRanking",
+    "ShopChange",
+    "EmbeddingCache",
+]
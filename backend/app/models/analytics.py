@@ -1,6 +1,17 @@
 from datetime import datetime
 
-from sqlalchemy import CheckConstraint, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 
@@ -21,6 +32,16 @@ class ShopAIAnalytics(Base):
     score_sincerity = Column(Integer)  # 施術の誠実さ
     score_safety = Column(Integer)  # 心理的安全性
 
+    # 5項目の平均（DBが計算して保存する生成列、ソート・フィルタ用にインデックスを持つ）
+    avg_score = Column(
+        Float,
+        Computed(
+            "(score_operation + score_accuracy + score_hygiene + score_sincerity + score_safety)"
+            "::double precision / 5",
+            persisted=True,
+        ),
+    )
+
     # 裏パラメータ
     variance_score = Column(Float)  # ギャンブル度（0-100）
     sakura_risk = Column(Integer)  # サクラ汚染度（0-100%）
@@ -48,6 +69,9 @@ class ShopAIAnalytics(Base):
         CheckConstraint("score_sincerity BETWEEN 0 AND 10", name="check_score_sincerity"),
         CheckConstraint("score_safety BETWEEN 0 AND 10", name="check_score_safety"),
         CheckConstraint("sakura_risk BETWEEN 0 AND 100", name="check_sakura_risk"),
+        Index("idx_shop_ai_analytics_risk_level_avg_score", "risk_level", "avg_score"),
+        Index("idx_shop_ai_analytics_avg_score_shop_id", "avg_score", "shop_id"),
+        Index("idx_shop_ai_analytics_sakura_risk", "sakura_risk"),
     )
 
     def __repr__(self):
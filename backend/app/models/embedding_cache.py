@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, DateTime, Index, String
+
+from app.models.base import Base
+
+
+class EmbeddingCache(Base):
+    """
+    ベクトル埋め込みのキャッシュ（同じテキストを再度埋め込まないため）
+
+    キーはモデル・タスク種別・正規化したテキストのSHA-256
+    """
+
+    __tablename__ = "embedding_cache"
+
+    model = Column(String(100), primary_key=True)
+    task_type = Column(String(30), primary_key=True)  # retrieval_document/retrieval_query
+    text_hash = Column(String(64), primary_key=True)
+
+    embedding = Column(Vector(768), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("idx_embedding_cache_last_used_at", "last_used_at"),)
+
+    def __repr__(self):
+        return f"<EmbeddingCache(model={self.model}, task_type={self.task_type}, text_hash={self.text_hash})>"
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class AreaRanking(Base):
+    """エリア別ランキング（定期的に再計算して保存する）"""
+
+    __tablename__ = "area_rankings"
+
+    area_key = Column(String(50), primary_key=True)  # PREDEFINED_AREASのキー
+    sort_by = Column(String(20), primary_key=True)  # avg_score/score_safety/score_accuracy
+    rank = Column(Integer, primary_key=True)
+
+    shop_id = Column(UUID(as_uuid=True), ForeignKey("shops.id", ondelete="CASCADE"), nullable=False)
+    avg_score = Column(Float)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AreaRanking(area_key={self.area_key}, sort_by={self.sort_by}, rank={self.rank})>"
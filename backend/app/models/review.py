@@ -4,10 +4,13 @@ from datetime import datetime
 from pgvector.sqlalchemy import Vector
 from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.models.base import Base
 
+# 既定で読み込まない大きな列のグループ（必要な場合は undefer_group で明示的に読み込む）
+REVIEW_PAYLOAD_GROUP = "payload"
+
 
 class Review(Base):
     __tablename__ = "reviews"
@@ -27,22 +30,29 @@ class Review(Base):
     language = Column(String(10))
     relative_time_description = Column(String(100))
     time = Column(BigInteger)  # Unix timestamp
+    # 取得元をまたいだ同一性キー（投稿者名・投稿日・本文から生成、重複取込の防止に使用）
+    identity_key = Column(String(64), nullable=False)
+    # 差分同期の突き合わせキー（投稿者名・投稿日から生成、本文の編集・翻訳で変わらない）
+    match_key = Column(String(64), nullable=False)
 
-    # ベクトル埋め込み（RAG用）
-    embedding = Column(Vector(768))
+    # ベクトル埋め込み（RAG用、768次元のため既定では読み込まない）
+    embedding = deferred(Column(Vector(768)), group=REVIEW_PAYLOAD_GROUP)
 
-    # メタデータ
-    raw_data = Column(JSONB)
+    # メタデータ（取得元の生データ、既定では読み込まない）
+    raw_data = deferred(Column(JSONB), group=REVIEW_PAYLOAD_GROUP)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
     shop = relationship("Shop", back_populates="reviews")
 
     __table_args__ = (
-        Index("idx_reviews_shop_id", shop_id),
+        Index("idx_reviews_shop_id", "shop_id"),
+        # 重複取込の防止（INSERT ... ON CONFLICT DO NOTHING の対象）
+        Index("uq_reviews_shop_identity_key", "shop_id", "identity_key", unique=True),
+        Index("idx_reviews_shop_match_key", "shop_id", "match_key"),
         Index(
             "idx_reviews_embedding",
-            embedding,
+            "embedding",
             postgresql_using="ivfflat",
             postgresql_ops={"embedding": "vector_cosine_ops"},
         ),
@@ -1,10 +1,10 @@
 import uuid
 from datetime import datetime
 
-from geoalchemy2 import Geography
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from geoalchemy2 import Geography, Geometry
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text, cast, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 
 from app.models.base import Base
 
@@ -20,6 +20,10 @@ class Shop(Base):
     # PostGIS地理データ
     location = Column(Geography(geometry_type="POINT", srid=4326), nullable=False)
 
+    # 緯度・経度（SQLのST_Y/ST_Xで取得し、Python側でWKBを解析しない）
+    latitude = column_property(func.ST_Y(cast(location, Geometry(srid=4326))))
+    longitude = column_property(func.ST_X(cast(location, Geometry(srid=4326))))
+
     # Google Places基本情報
     rating = Column(Float)
     user_ratings_total = Column(Integer)
@@ -44,6 +48,10 @@ class Shop(Base):
     )
 
     # Note: GeoAlchemy2 automatically creates a spatial index for Geography columns
+    __table_args__ = (
+        # キーセットページネーション用
+        Index("idx_shops_created_at_id", created_at, id),
+    )
 
     def __repr__(self):
         return f"<Shop(id={self.id}, name={self.name})>"
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class ShopChange(Base):
+    """
+    店舗・解析結果の変更履歴（差分同期用）
+
+    shops/shop_ai_analyticsのトリガーで記録される。txidは変更したトランザクションのID
+    """
+
+    __tablename__ = "shop_changes"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # 削除後も履歴を残すため外部キーは設定しない
+    shop_id = Column(UUID(as_uuid=True), nullable=False)
+    operation = Column(String(10), nullable=False)  # upsert/delete
+    txid = Column(BigInteger, nullable=False, server_default=text("txid_current()"))
+    changed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_shop_changes_txid", "txid"),
+        Index("idx_shop_changes_shop_id_txid", "shop_id", "txid"),
+    )
+
+    def __repr__(self):
+        return f"<ShopChange(shop_id={self.shop_id}, operation={self.operation}, txid={self.txid})>"
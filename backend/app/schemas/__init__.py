@@ -1,12 +1,25 @@
 from app.schemas.analytics import AnalyticsCreate, AnalyticsResponse
 from app.schemas.review import ReviewCreate, ReviewResponse
-from app.schemas.shop import ShopCreate, ShopListResponse, ShopResponse, ShopUpdate
+from app.schemas.shop import (
+    ShopChangesResponse,
+    ShopCompactChangesResponse,
+    ShopCompactListResponse,
+    ShopCompactResponse,
+    ShopCreate,
+    ShopListResponse,
+    ShopResponse,
+    ShopUpdate,
+)
 
 __all__ = [
     "ShopCreate",
     "ShopUpdate",
     "ShopResponse",
     "ShopListResponse",
+    "ShopCompactResponse",
+    "ShopCompactListResponse",
+    "ShopChangesResponse",
+    "ShopCompactChangesResponse",
     "ReviewCreate",
     "ReviewResponse",
     "AnalyticsCreate",
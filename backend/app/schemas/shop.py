@@ -69,6 +69,7 @@ class ShopResponse(ShopBase):
     updated_at: datetime
     last_fetched_at: Optional[datetime] = None
     analytics: Optional[AnalyticsSummary] = None
+    distance_m: Optional[float] = Field(None, description="検索地点からの距離（メートル）")
 
     class Config:
         from_attributes = True
@@ -76,6 +77,72 @@ class ShopResponse(ShopBase):
 
 class ShopListResponse(BaseModel):
     shops: list[ShopResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
+    per_page: int
+    # カーソル方式のページネーション
+    next_cursor: Optional[str] = Field(None, description="次ページのカーソル（最終ページはnull）")
+    total_is_estimate: bool = Field(False, description="totalが概算値かどうか")
+
+
+class ShopCompactResponse(BaseModel):
+    """地図表示用の軽量な店舗情報（view=compact）"""
+
+    id: UUID
+    name: str
+    location: LocationSchema
+    rating: Optional[float] = None
+    risk_level: Optional[str] = None
+    score_operation: Optional[int] = None
+    score_accuracy: Optional[int] = None
+    score_hygiene: Optional[int] = None
+    score_sincerity: Optional[int] = None
+    score_safety: Optional[int] = None
+    distance_m: Optional[float] = Field(None, description="検索地点からの距離（メートル）")
+
+
+class ShopCompactListResponse(BaseModel):
+    shops: list[ShopCompactResponse]
+    total: Optional[int] = None
+    page: Optional[int] = None
     per_page: int
+    next_cursor: Optional[str] = Field(None, description="次ページのカーソル（最終ページはnull）")
+    total_is_estimate: bool = Field(False, description="totalが概算値かどうか")
+
+
+class ShopChangesResponse(BaseModel):
+    """差分同期レスポンス（GET /shops/changes）"""
+
+    token: str = Field(..., description="次回のsinceに指定するトークン")
+    full: bool = Field(
+        ..., description="全店舗を返したかどうか（trueの場合は手元のデータを置き換える）"
+    )
+    shops: list[ShopResponse] = Field(..., description="作成・更新された店舗")
+    deleted: list[UUID] = Field(..., description="削除された店舗ID")
+
+
+class ShopCompactChangesResponse(BaseModel):
+    token: str = Field(..., description="次回のsinceに指定するトークン")
+    full: bool = Field(
+        ..., description="全店舗を返したかどうか（trueの場合は手元のデータを置き換える）"
+    )
+    shops: list[ShopCompactResponse] = Field(..., description="作成・更新された店舗")
+    deleted: list[UUID] = Field(..., description="削除された店舗ID")
+
+
+class ViewportCluster(BaseModel):
+    """地図表示用のクラスタ（グリッド単位で集約したマーカー）"""
+
+    count: int = Field(..., description="クラスタ内の店舗数")
+    center: LocationSchema = Field(..., description="クラスタの重心")
+    risk_levels: dict[str, int] = Field(
+        default_factory=dict, description="リスクレベル別の店舗数（unknown=未解析）"
+    )
+    shop_id: Optional[UUID] = Field(None, description="単一店舗のクラスタの場合の店舗ID")
+
+
+class ViewportResponse(BaseModel):
+    zoom: int
+    grid_size: float = Field(..., description="クラスタリングに使用したグリッド幅（度）")
+    clusters: list[ViewportCluster]
+    total: int
@@ -5,7 +5,7 @@ Google Places APIの5件制限を超えて全レビューを取得
 
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from apify_client import ApifyClientAsync
 
@@ -41,6 +41,23 @@ class ApifyReviewsService:
         Returns:
             正規化されたレビューデータのリスト
         """
+        reviews = [
+            review async for review in self.iterate_reviews(place_url, max_reviews, language)
+        ]
+        logger.info(f"Fetched {len(reviews)} reviews from Apify")
+        return reviews
+
+    async def iterate_reviews(
+        self,
+        place_url: str,
+        max_reviews: int = 100,
+        language: str = "ja",
+    ) -> AsyncIterator[dict]:
+        """
+        Google Maps URLのレビューを正規化しながら1件ずつ返す
+
+        一括ローダー（ReviewLoader）へリストを作らずに渡すために使用
+        """
         run_input = {
             "startUrls": [{"url": place_url}],
             "maxReviews": max_reviews,
@@ -55,14 +72,10 @@ class ApifyReviewsService:
             run = await self.client.actor(self.ACTOR_ID).call(run_input=run_input)
 
             # データセットからレビューを取得
-            reviews = []
             async for item in self.client.dataset(run["defaultDatasetId"]).iterate_items():
                 normalized = self._normalize_review(item)
                 if normalized:
-                    reviews.append(normalized)
-
-            logger.info(f"Fetched {len(reviews)} reviews from Apify")
-            return reviews
+                    yield normalized
 
         except Exception as e:
             logger.error(f"Apify fetch error: {e}")
@@ -85,9 +98,12 @@ class ApifyReviewsService:
         Returns:
             正規化されたレビューデータのリスト
         """
-        # Place IDからGoogle Maps URLを生成
-        place_url = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
-        return await self.fetch_reviews(place_url, max_reviews, language)
+        return await self.fetch_reviews(self.place_url(place_id), max_reviews, language)
+
+    @staticmethod
+    def place_url(place_id: str) -> str:
+        """Place IDからGoogle MapsのURLを生成"""
+        return f"https://www.google.com/maps/place/?q=place_id:{place_id}"
 
     def _normalize_review(self, item: dict) -> Optional[dict]:
         """
@@ -0,0 +1,130 @@
+"""
+ベクトル埋め込みのキャッシュ
+正規化したテキストのハッシュをキーに、生成済みの埋め込みを保存・再利用する
+"""
+
+import hashlib
+import logging
+import unicodedata
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_embedding_text(text: str) -> str:
+    """埋め込み用にテキストを正規化（NFKC正規化し、連続する空白を1つにまとめる）"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def hash_embedding_text(normalized_text: str) -> str:
+    """正規化済みテキストのSHA-256"""
+    return hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCacheService:
+    """ベクトル埋め込みのキャッシュサービス"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_many(
+        self, model: str, task_type: str, text_hashes: list[str]
+    ) -> dict[str, list[float]]:
+        """
+        キャッシュ済みの埋め込みを取得（ヒットした行の最終利用日時を更新）
+
+        Returns:
+            {テキストのハッシュ: 埋め込み}
+        """
+        if not text_hashes:
+            return {}
+
+        key_filter = (
+            (EmbeddingCache.model == model)
+            & (EmbeddingCache.task_type == task_type)
+            & (EmbeddingCache.text_hash.in_(set(text_hashes)))
+        )
+        rows = self.db.execute(
+            select(EmbeddingCache.text_hash, EmbeddingCache.embedding).where(key_filter)
+        ).all()
+
+        if rows:
+            self.db.execute(
+                update(EmbeddingCache)
+                .where(key_filter)
+                .values(last_used_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+
+        return {row.text_hash: row.embedding.tolist() for row in rows}
+
+    def put_many(self, model: str, task_type: str, embeddings: dict[str, list[float]]) -> None:
+        """生成した埋め込みを保存（既存のキーは最終利用日時のみ更新）"""
+        if not embeddings:
+            return
+
+        now = datetime.utcnow()
+        stmt = insert(EmbeddingCache).values(
+            [
+                {
+                    "model": model,
+                    "task_type": task_type,
+                    "text_hash": text_hash,
+                    "embedding": embedding,
+                    "created_at": now,
+                    "last_used_at": now,
+                }
+                for text_hash, embedding in embeddings.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["model", "task_type", "text_hash"],
+            set_={"last_used_at": stmt.excluded.last_used_at},
+        )
+        self.db.execute(stmt)
+        self.db.commit()
+
+    def evict(
+        self,
+        max_age_days: int = settings.embedding_cache_max_age_days,
+        max_rows: int = settings.embedding_cache_max_rows,
+    ) -> int:
+        """
+        古いキャッシュを削除
+
+        最終利用から max_age_days 日を過ぎた行と、max_rows 件を超えた分
+        （最終利用日時が古い順）を削除する
+
+        Returns:
+            削除した件数
+        """
+        cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+        expired = (
+            self.db.query(EmbeddingCache)
+            .filter(EmbeddingCache.last_used_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+
+        key = tuple_(EmbeddingCache.model, EmbeddingCache.task_type, EmbeddingCache.text_hash)
+        overflow_keys = (
+            select(EmbeddingCache.model, EmbeddingCache.task_type, EmbeddingCache.text_hash)
+            .order_by(EmbeddingCache.last_used_at.desc())
+            .offset(max_rows)
+        )
+        overflow = (
+            self.db.query(EmbeddingCache)
+            .filter(key.in_(overflow_keys))
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+
+        logger.info(f"Evicted embedding cache: {expired} expired, {overflow} over limit")
+        return expired + overflow
@@ -2,7 +2,9 @@ import asyncio
 import logging
 from dataclasses import dataclass
 from typing import Optional
+from uuid import UUID
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.schemas.shop import ShopCreate
@@ -76,13 +78,16 @@ class IngestionResult:
 
 
 class IngestionService:
-    """データ取込サービス"""
+    """
+    データ取込サービス
 
-    def __init__(self, db: Session):
+    外部APIの待ち時間中にイベントループをブロックしないよう、AsyncSessionを使用する。
+    DB操作は同期のShopService/ReviewServiceをrun_syncでAsyncSessionの接続上で実行する
+    """
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.places_client = PlacesAPIClient()
-        self.shop_service = ShopService(db)
-        self.review_service = ReviewService(db)
 
     async def ingest_area(
         self,
@@ -183,11 +188,6 @@ class IngestionService:
         Returns:
             dict: {"created": bool, "reviews_created": int}
         """
-        result = {"created": False, "reviews_created": 0}
-
-        # 既存店舗チェック
-        existing_shop = self.shop_service.get_by_place_id(place_id)
-
         # 詳細情報を取得（レビュー含む）
         if fetch_reviews:
             try:
@@ -199,27 +199,87 @@ class IngestionService:
         # 店舗データを変換
         shop_data_dict = self.places_client.parse_place_to_shop_data(place_data)
         shop_create = ShopCreate(**shop_data_dict)
+        reviews_data = self.places_client.parse_reviews(place_data) if fetch_reviews else []
+
+        return await self.db.run_sync(self._save_place, place_id, shop_create, reviews_data)
+
+    @staticmethod
+    def _save_place(
+        session: Session,
+        place_id: str,
+        shop_create: ShopCreate,
+        reviews_data: list[dict],
+    ) -> dict:
+        """店舗とレビューを保存（run_syncから同期セッションで呼び出す）"""
+        shop_service = ShopService(session)
+        result = {"created": False, "reviews_created": 0}
 
         # 店舗をUpsert
-        if existing_shop:
-            shop = self.shop_service.upsert(shop_create)
+        if shop_service.get_by_place_id(place_id):
+            shop = shop_service.upsert(shop_create)
             result["created"] = False
         else:
-            shop = self.shop_service.create(shop_create)
+            shop = shop_service.create(shop_create)
             result["created"] = True
 
         # レビューを保存
-        if fetch_reviews:
-            reviews_data = self.places_client.parse_reviews(place_data)
-            if reviews_data:
-                created_reviews = self.review_service.bulk_create(
-                    shop_id=shop.id,
-                    reviews_data=reviews_data,
-                )
-                result["reviews_created"] = len(created_reviews)
+        if reviews_data:
+            created_reviews = ReviewService(session).bulk_create(
+                shop_id=shop.id,
+                reviews_data=reviews_data,
+            )
+            result["reviews_created"] = len(created_reviews)
 
         return result
 
+    async def replace_reviews(self, shop_id: UUID, reviews_data: list[dict]) -> tuple[int, int]:
+        """
+        店舗のレビューを置き換え（既存レビューを削除して新規保存）
+
+        Returns:
+            (削除したレビュー数, 作成したレビュー数)
+        """
+
+        def replace(session: Session) -> tuple[int, int]:
+            review_service = ReviewService(session)
+            deleted_count = review_service.delete_by_shop_id(shop_id)
+            created_reviews = review_service.bulk_create(shop_id, reviews_data)
+            return deleted_count, len(created_reviews)
+
+        return await self.db.run_sync(replace)
+
+    async def save_reviews(
+        self,
+        shop_id: UUID,
+        reviews_data: list[dict],
+        mode: str = "sync",
+        delete_missing: bool = True,
+    ) -> dict[str, int]:
+        """
+        取得したレビューを保存
+
+        Args:
+            mode: sync=差分同期（埋め込み・翻訳を保持）, replace=全削除して再作成
+            delete_missing: sync時に取得結果にないレビューを削除するか
+
+        Returns:
+            {"created": 作成数, "updated": 更新数, "deleted": 削除数, "unchanged": 変更なし数}
+        """
+        if mode == "replace":
+            deleted_count, created_count = await self.replace_reviews(shop_id, reviews_data)
+            return {
+                "created": created_count,
+                "updated": 0,
+                "deleted": deleted_count,
+                "unchanged": 0,
+            }
+
+        return await self.db.run_sync(
+            lambda session: ReviewService(session).sync_reviews(
+                shop_id, reviews_data, delete_missing=delete_missing
+            )
+        )
+
     async def ingest_multiple_areas(
         self,
         area_keys: list[str],
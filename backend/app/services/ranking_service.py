@@ -0,0 +1,142 @@
+"""
+エリア別ランキングサービス
+事前定義エリア×ソート基準ごとのランキングを事前計算してarea_rankingsに保存する
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from geoalchemy2.functions import ST_DWithin
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.analytics import ShopAIAnalytics
+from app.models.ranking import AreaRanking
+from app.models.shop import Shop
+from app.services.ingestion import PREDEFINED_AREAS
+from app.services.response_cache import get_response_cache
+from app.services.shop_service import ShopService
+
+logger = logging.getLogger(__name__)
+
+# 事前計算するソート基準
+RANKING_SORT_KEYS = ("avg_score", "score_safety", "score_accuracy")
+
+# 事前計算する半径（/shops/rankingのデフォルト値）
+RANKING_RADIUS = 2000.0
+
+# 保存する順位の上限（/shops/rankingのlimit上限）
+RANKING_SIZE = 50
+
+
+class RankingService:
+    """エリア別ランキングサービス"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh_all(self) -> dict:
+        """
+        全エリア・全ソート基準のランキングを再計算
+
+        全件を1トランザクションで入れ替えるため、読み取り側は常に完全なランキングを参照する
+
+        Returns:
+            {area_key: 保存した店舗数}
+        """
+        refreshed_at = datetime.utcnow()
+        counts = {}
+
+        self.db.query(AreaRanking).delete()
+
+        for area_key, area in PREDEFINED_AREAS.items():
+            for sort_by in RANKING_SORT_KEYS:
+                rows = self._compute(area.latitude, area.longitude, sort_by)
+                self.db.add_all(
+                    [
+                        AreaRanking(
+                            area_key=area_key,
+                            sort_by=sort_by,
+                            rank=rank,
+                            shop_id=shop_id,
+                            avg_score=avg_score,
+                            refreshed_at=refreshed_at,
+                        )
+                        for rank, (shop_id, avg_score) in enumerate(rows, 1)
+                    ]
+                )
+            counts[area_key] = len(rows)
+
+        self.db.commit()
+        get_response_cache().invalidate_namespace("ranking")
+        logger.info(f"Area rankings refreshed: {counts}")
+        return counts
+
+    def _compute(self, latitude: float, longitude: float, sort_by: str) -> list[tuple]:
+        """エリアのランキングを計算（shop_id, avg_score）"""
+        avg_score = ShopAIAnalytics.avg_score
+
+        if sort_by == "avg_score":
+            sort_column = avg_score
+        else:
+            sort_column = getattr(ShopAIAnalytics, sort_by)
+
+        return (
+            self.db.query(ShopAIAnalytics.shop_id, avg_score)
+            .join(Shop, Shop.id == ShopAIAnalytics.shop_id)
+            .filter(
+                ST_DWithin(
+                    Shop.location,
+                    func.ST_GeogFromText(f"POINT({longitude} {latitude})"),
+                    RANKING_RADIUS,
+                )
+            )
+            .filter(avg_score.isnot(None))
+            .order_by(sort_column.desc(), avg_score.desc(), Shop.id)
+            .limit(RANKING_SIZE)
+            .all()
+        )
+
+    def get_ranking(
+        self,
+        area_key: str,
+        sort_by: str = "avg_score",
+        limit: int = 20,
+        compact: bool = False,
+    ) -> Optional[tuple[list[tuple], datetime]]:
+        """
+        事前計算済みのランキングを取得（順位の主キー順に読むためO(limit)）
+
+        Returns:
+            (List of (Shop, avg_score) tuples, 更新日時)
+            compact=Trueの場合は (地図表示用の行, avg_score)
+            未計算の場合はNone
+        """
+        if compact:
+            query = self.db.query(
+                *ShopService.compact_columns(), AreaRanking.avg_score, AreaRanking.refreshed_at
+            ).outerjoin(ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id)
+        else:
+            query = self.db.query(Shop, AreaRanking.avg_score, AreaRanking.refreshed_at).options(
+                joinedload(Shop.analytics)
+            )
+
+        rows = (
+            query.join(AreaRanking, AreaRanking.shop_id == Shop.id)
+            .filter(
+                AreaRanking.area_key == area_key,
+                AreaRanking.sort_by == sort_by,
+                AreaRanking.rank <= limit,
+            )
+            .order_by(AreaRanking.rank)
+            .all()
+        )
+
+        if not rows:
+            return None
+
+        refreshed_at = rows[0].refreshed_at
+        if compact:
+            return [(row, row.avg_score) for row in rows], refreshed_at
+        return [(row[0], row.avg_score) for row in rows], refreshed_at
@@ -0,0 +1,146 @@
+"""
+APIレスポンスキャッシュ
+読み取り系エンドポイントの結果をプロセス内に保持し、書き込み時に無効化する
+"""
+
+import logging
+from typing import Any, Hashable, Iterable, NamedTuple, Optional
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.geo import calculate_distance
+
+logger = logging.getLogger(__name__)
+
+# 量子化した座標1単位あたりの距離の目安（メートル）
+METERS_PER_DEGREE = 111320
+
+
+class CachedResponse(NamedTuple):
+    """キャッシュされたレスポンス"""
+
+    etag: Optional[str]
+    body: Any
+
+
+class ResponseCache:
+    """
+    TTL+LRUのレスポンスキャッシュ
+
+    キーは (名前空間, 検索範囲, クエリパラメータ)。
+    検索範囲は量子化した中心座標と半径で、座標を持たない一覧系はNone。
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 2048,
+        ttl_seconds: float = 60.0,
+        coordinate_precision: int = 3,
+        enabled: bool = True,
+    ):
+        self.cache = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.coordinate_precision = coordinate_precision
+        self.enabled = enabled
+        # 量子化による中心座標のずれを吸収する余裕（メートル）
+        self.quantize_margin = METERS_PER_DEGREE * 10**-coordinate_precision
+
+    def quantize(self, value: float) -> float:
+        """座標を量子化（近い地点のリクエストで同じキーを共有する）"""
+        return round(value, self.coordinate_precision)
+
+    def make_key(
+        self,
+        namespace: str,
+        params: Iterable[tuple[str, str]],
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_meters: Optional[float] = None,
+        exact: bool = False,
+    ) -> tuple:
+        """
+        キャッシュキーを生成
+
+        Args:
+            namespace: エンドポイントの名前空間
+            params: クエリパラメータ（lat/lngは量子化して検索範囲に含める）
+            latitude: 検索中心の緯度
+            longitude: 検索中心の経度
+            radius_meters: 検索半径（無効化の判定に使う）
+            exact: 座標を量子化しない（距離・距離順を含むレスポンス用）
+        """
+        scope = None
+        if latitude is not None and longitude is not None:
+            if not exact:
+                latitude, longitude = self.quantize(latitude), self.quantize(longitude)
+            scope = (latitude, longitude, radius_meters or 0.0)
+
+        filtered = tuple(sorted((k, v) for k, v in params if k not in ("lat", "lng")))
+        return (namespace, scope, filtered)
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """キャッシュからレスポンスを取得"""
+        if not self.enabled:
+            return None
+        return self.cache.get(key)
+
+    def set(self, key: Hashable, body: Any, etag: Optional[str] = None) -> Any:
+        """レスポンスを保存し、そのまま返す"""
+        if self.enabled:
+            self.cache.set(key, CachedResponse(etag=etag, body=body))
+        return body
+
+    def invalidate_at(self, latitude: float, longitude: float) -> int:
+        """
+        指定地点の変更で結果が変わり得るエントリを削除
+
+        座標を持たない一覧系はすべて、座標を持つものは検索範囲に地点を含む場合に削除する
+
+        Returns:
+            削除したエントリ数
+        """
+
+        def affected(key: tuple) -> bool:
+            scope = key[1]
+            if scope is None:
+                return True
+            center_lat, center_lng, radius = scope
+            distance = calculate_distance(center_lat, center_lng, latitude, longitude)
+            return distance <= radius + self.quantize_margin
+
+        deleted = self.cache.delete_where(affected)
+        if deleted:
+            logger.debug(f"Invalidated {deleted} cached responses at ({latitude}, {longitude})")
+        return deleted
+
+    def invalidate_namespace(self, namespace: str) -> int:
+        """名前空間のエントリをすべて削除"""
+        return self.cache.delete_where(lambda key: key[0] == namespace)
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        self.cache.clear()
+
+    def get_stats(self) -> dict:
+        """ヒット・ミス・追い出し件数などの統計を取得"""
+        return {
+            "enabled": self.enabled,
+            "coordinate_precision": self.coordinate_precision,
+            **self.cache.get_stats(),
+        }
+
+
+# シングルトンインスタンス
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """レスポンスキャッシュのシングルトンを取得"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            maxsize=settings.response_cache_maxsize,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+            coordinate_precision=settings.response_cache_coordinate_precision,
+            enabled=settings.response_cache_enabled,
+        )
+    return _response_cache
@@ -0,0 +1,353 @@
+"""
+レビューの一括ローダー
+正規化済みレビューをCOPYで一時テーブルに流し込み、バッチごとにまとめてreviewsへマージする
+
+全店舗のレビュー取込のように数万件を扱う場合に、ORMのadd()と長いトランザクションを避ける
+"""
+
+import json
+import logging
+from typing import AsyncIterable, Iterable, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.services.shop_events import notify_reviews_changed
+from app.utils.review_identity import review_identity_key, review_match_key
+
+logger = logging.getLogger(__name__)
+
+# マージ1回あたりのレビュー数
+BATCH_SIZE = 5000
+
+STAGING_TABLE = "review_staging"
+
+STAGING_COLUMNS = (
+    "seq",
+    "shop_id",
+    "author_name",
+    "author_url",
+    "profile_photo_url",
+    "rating",
+    "text",
+    "language",
+    "relative_time_description",
+    "time",
+    "identity_key",
+    "match_key",
+    "raw_data",
+)
+
+CREATE_STAGING_SQL = f"""
+    CREATE TEMP TABLE {STAGING_TABLE} (
+        seq integer NOT NULL,
+        shop_id uuid NOT NULL,
+        author_name text,
+        author_url text,
+        profile_photo_url text,
+        rating integer,
+        text text,
+        language text,
+        relative_time_description text,
+        time bigint,
+        identity_key text NOT NULL,
+        match_key text NOT NULL,
+        raw_data text
+    ) ON COMMIT DROP
+"""
+
+# 既存レビューと一時テーブルの行の突き合わせ条件
+MATCH_CONDITION = "r.shop_id = s.shop_id AND r.identity_key = s.identity_key"
+
+INSERT_SQL = """
+    INSERT INTO reviews (
+        id, shop_id, author_name, author_url, profile_photo_url, rating, text,
+        language, relative_time_description, time, identity_key, match_key, raw_data, created_at
+    )
+    SELECT
+        gen_random_uuid(),
+        s.shop_id,
+        s.author_name,
+        s.author_url,
+        s.profile_photo_url,
+        s.rating,
+        s.text,
+        s.language,
+        s.relative_time_description,
+        s.time,
+        s.identity_key,
+        s.match_key,
+        s.raw_data::jsonb,
+        timezone('utc', now())
+"""
+
+# replace: 初めてマージする店舗の既存レビューを削除
+REPLACE_DELETE_SQL = """
+    WITH deleted AS (
+        DELETE FROM reviews WHERE shop_id = ANY(:shop_ids) RETURNING shop_id
+    )
+    SELECT shop_id, 'deleted' AS kind, count(*) AS count FROM deleted GROUP BY shop_id
+"""
+
+# replace: 一時テーブルの行を作成（既存・入力内の重複はスキップ）
+REPLACE_INSERT_SQL = f"""
+    WITH inserted AS (
+        {INSERT_SQL}
+        FROM {STAGING_TABLE} s
+        ORDER BY s.seq
+        ON CONFLICT (shop_id, identity_key) DO NOTHING
+        RETURNING shop_id
+    )
+    SELECT shop_id, 'created' AS kind, count(*) AS count FROM inserted GROUP BY shop_id
+"""
+
+# sync: 新規は作成、内容が変わったものは更新、取得結果にないものは削除（1ステートメント）
+# 同一性キーで一致しないレビューは、本文の編集・翻訳で変わった同じレビューとして
+# 突き合わせキー（投稿者名・投稿日）が同じ既存レビューと取得順・作成順に1対1で対応させる
+# 比較はReviewService.REVIEW_SYNC_FIELDSと同じ項目のみ（相対時刻・raw_dataは取得のたびに変わる）
+# 本文が変わったレビューのみ埋め込み・翻訳をクリアする
+SYNC_SQL = f"""
+    WITH incoming AS (
+        SELECT DISTINCT ON (shop_id, identity_key) *
+        FROM {STAGING_TABLE}
+        ORDER BY shop_id, identity_key, seq
+    ),
+    identity_matched AS (
+        SELECT r.id AS review_id, s.shop_id, s.identity_key
+        FROM incoming s
+        JOIN reviews r ON {MATCH_CONDITION}
+    ),
+    unmatched_incoming AS (
+        SELECT
+            s.shop_id,
+            s.identity_key,
+            s.match_key,
+            row_number() OVER (PARTITION BY s.shop_id, s.match_key ORDER BY s.seq) AS rn
+        FROM incoming s
+        WHERE NOT EXISTS (SELECT 1 FROM reviews r WHERE {MATCH_CONDITION})
+    ),
+    unmatched_existing AS (
+        SELECT
+            r.id,
+            r.shop_id,
+            r.match_key,
+            row_number() OVER (
+                PARTITION BY r.shop_id, r.match_key ORDER BY r.created_at, r.id
+            ) AS rn
+        FROM reviews r
+        WHERE r.shop_id IN (SELECT shop_id FROM incoming)
+          AND NOT EXISTS (SELECT 1 FROM incoming s WHERE {MATCH_CONDITION})
+    ),
+    matched AS (
+        SELECT review_id, shop_id, identity_key FROM identity_matched
+        UNION ALL
+        SELECT e.id, i.shop_id, i.identity_key
+        FROM unmatched_incoming i
+        JOIN unmatched_existing e
+          ON e.shop_id = i.shop_id AND e.match_key = i.match_key AND e.rn = i.rn
+    ),
+    deleted AS (
+        DELETE FROM reviews r
+        WHERE r.shop_id = ANY(:delete_shop_ids)
+          AND NOT EXISTS (SELECT 1 FROM matched m WHERE m.review_id = r.id)
+        RETURNING r.shop_id
+    ),
+    updated AS (
+        UPDATE reviews r SET
+            identity_key = s.identity_key,
+            author_url = s.author_url,
+            profile_photo_url = s.profile_photo_url,
+            rating = s.rating,
+            text = s.text,
+            language = s.language,
+            relative_time_description = s.relative_time_description,
+            raw_data = s.raw_data::jsonb,
+            embedding = CASE WHEN r.text IS DISTINCT FROM s.text THEN NULL ELSE r.embedding END,
+            text_ja = CASE WHEN r.text IS DISTINCT FROM s.text THEN NULL ELSE r.text_ja END
+        FROM matched m
+        JOIN incoming s ON s.shop_id = m.shop_id AND s.identity_key = m.identity_key
+        WHERE r.id = m.review_id
+          AND (r.identity_key, r.author_url, r.profile_photo_url, r.rating, r.text, r.language)
+              IS DISTINCT FROM
+              (s.identity_key, s.author_url, s.profile_photo_url, s.rating, s.text, s.language)
+        RETURNING r.shop_id
+    ),
+    inserted AS (
+        {INSERT_SQL}
+        FROM incoming s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM matched m
+            WHERE m.shop_id = s.shop_id AND m.identity_key = s.identity_key
+        )
+        ON CONFLICT (shop_id, identity_key) DO NOTHING
+        RETURNING shop_id
+    )
+    SELECT shop_id, 'created' AS kind, count(*) AS count FROM inserted GROUP BY shop_id
+    UNION ALL
+    SELECT shop_id, 'updated', count(*) FROM updated GROUP BY shop_id
+    UNION ALL
+    SELECT shop_id, 'deleted', count(*) FROM deleted GROUP BY shop_id
+"""
+
+ReviewSource = Union[Iterable[dict], AsyncIterable[dict]]
+
+
+class ReviewLoader:
+    """
+    複数店舗のレビューを保存するローダー
+
+    mode:
+        sync: 既存レビューと差分同期（変更のないレビューの埋め込み・翻訳を保持）
+        replace: 既存レビューを削除して再作成
+
+    使い方:
+        loader = ReviewLoader(db)
+        for shop in shops:
+            await loader.add(shop.id, reviews)
+            if loader.is_full:
+                await loader.flush()
+        await loader.flush()
+
+    既存レビューの削除は、店舗が初めてマージされるときのみ行う
+    sync時、取得件数が0件の店舗とsource_limitに達した店舗は取得結果にないレビューを削除しない
+    （取得元の一時的な失敗や件数上限で、保存済みのレビューを消さないため）
+    """
+
+    def __init__(self, db: AsyncSession, mode: str = "sync", batch_size: int = BATCH_SIZE):
+        self.db = db
+        self.mode = mode
+        self.batch_size = batch_size
+        self._pending: list[tuple] = []
+        self._pending_shop_ids: list[UUID] = []
+        self._merged_shop_ids: set[UUID] = set()
+        self._keep_missing_shop_ids: set[UUID] = set()
+        self.counts: dict[UUID, dict[str, int]] = {}
+
+    def get_counts(self, shop_id: UUID) -> dict[str, int]:
+        """店舗ごとの作成・更新・削除数"""
+        return {"created": 0, "updated": 0, "deleted": 0, **self.counts.get(shop_id, {})}
+
+    def get_totals(self) -> dict[str, int]:
+        """全店舗の作成・更新・削除数"""
+        totals = {"created": 0, "updated": 0, "deleted": 0}
+        for counts in self.counts.values():
+            for kind, count in counts.items():
+                totals[kind] += count
+        return totals
+
+    @property
+    def is_full(self) -> bool:
+        """保留中のレビューがバッチサイズに達したか"""
+        return len(self._pending) >= self.batch_size
+
+    async def add(
+        self, shop_id: UUID, reviews: ReviewSource, source_limit: Optional[int] = None
+    ) -> int:
+        """
+        店舗のレビューを保留に追加（マージはflushで行う）
+
+        取得の途中で失敗した場合はその店舗のレビューを追加しない
+
+        Args:
+            source_limit: 取得元の取得件数の上限（達した場合は上限外のレビューを削除しない）
+
+        取得件数が0件の場合も既存レビューを削除しない
+
+        Returns:
+            追加したレビュー数
+        """
+        if hasattr(reviews, "__aiter__"):
+            reviews = [review async for review in reviews]
+
+        start = len(self._pending)
+        records = [self._to_record(start + i, shop_id, review) for i, review in enumerate(reviews)]
+
+        self._pending.extend(records)
+        self._pending_shop_ids.append(shop_id)
+        if not records or (source_limit is not None and len(records) >= source_limit):
+            self._keep_missing_shop_ids.add(shop_id)
+        return len(records)
+
+    async def flush(self) -> None:
+        """保留中のレビューをマージ"""
+        if not self._pending_shop_ids:
+            return
+
+        records, self._pending = self._pending, []
+        # 既存レビューの削除対象は初めてマージする店舗のみ
+        shop_ids = [
+            shop_id
+            for shop_id in dict.fromkeys(self._pending_shop_ids)
+            if shop_id not in self._merged_shop_ids
+        ]
+        self._pending_shop_ids = []
+
+        try:
+            await self.db.execute(text(CREATE_STAGING_SQL))
+
+            if records:
+                connection = await self.db.connection()
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    STAGING_TABLE, records=records, columns=STAGING_COLUMNS
+                )
+
+            if self.mode == "replace":
+                rows = (
+                    await self.db.execute(text(REPLACE_DELETE_SQL), {"shop_ids": shop_ids})
+                ).all()
+                rows += (await self.db.execute(text(REPLACE_INSERT_SQL))).all()
+            else:
+                delete_shop_ids = [
+                    shop_id for shop_id in shop_ids if shop_id not in self._keep_missing_shop_ids
+                ]
+                rows = (
+                    await self.db.execute(text(SYNC_SQL), {"delete_shop_ids": delete_shop_ids})
+                ).all()
+
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        self._merged_shop_ids.update(shop_ids)
+        for shop_id, kind, count in rows:
+            shop_counts = self.counts.setdefault(shop_id, {})
+            shop_counts[kind] = shop_counts.get(kind, 0) + count
+
+        changed_shop_ids = list(dict.fromkeys(row.shop_id for row in rows))
+        await self.db.run_sync(self._notify, changed_shop_ids)
+        # 通知時の店舗座標の読み込みで始まったトランザクションを次の取得前に終える
+        await self.db.commit()
+
+        logger.info(
+            f"Merged {len(records)} staged reviews ({self.mode}), "
+            f"{len(changed_shop_ids)} shops changed"
+        )
+
+    @staticmethod
+    def _notify(session: Session, shop_ids: list[UUID]) -> None:
+        for shop_id in shop_ids:
+            notify_reviews_changed(session, shop_id)
+
+    @staticmethod
+    def _to_record(seq: int, shop_id: UUID, review: dict) -> tuple:
+        """COPY用のレコードに変換（raw_dataはJSON文字列として渡し、マージ時にjsonbへ変換）"""
+        raw_data = review.get("raw_data")
+        return (
+            seq,
+            shop_id,
+            review.get("author_name"),
+            review.get("author_url"),
+            review.get("profile_photo_url"),
+            review.get("rating"),
+            review.get("text"),
+            review.get("language"),
+            review.get("relative_time_description"),
+            review.get("time"),
+            review_identity_key(review.get("author_name"), review.get("time"), review.get("text")),
+            review_match_key(review.get("author_name"), review.get("time")),
+            json.dumps(raw_data, ensure_ascii=False) if raw_data is not None else None,
+        )
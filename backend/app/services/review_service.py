@@ -1,25 +1,50 @@
+from collections import defaultdict
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, undefer_group
 
-from app.models.review import Review
+from app.models.review import REVIEW_PAYLOAD_GROUP, Review
 from app.schemas.review import ReviewCreate
+from app.services.shop_events import notify_reviews_changed
+from app.utils.review_identity import review_identity_key, review_match_key
+
+# レビュー保存モード（sync=差分同期, replace=全削除して再作成）
+REVIEW_SAVE_MODES = ("sync", "replace")
+
+# 差分同期で比較する項目（キーはshop_id, identity_key、見つからない場合はshop_id, match_key）
+# relative_time_description（"1か月前"）やraw_data（scrapedAt等）は取得のたびに変わるため比較しない
+REVIEW_SYNC_FIELDS = (
+    "author_url",
+    "profile_photo_url",
+    "rating",
+    "text",
+    "language",
+)
+
+# 差分同期で更新する項目（比較する項目に変更があった場合のみ、取得時点の値に更新）
+REVIEW_SYNC_UPDATE_FIELDS = REVIEW_SYNC_FIELDS + ("relative_time_description", "raw_data")
 
 
 class ReviewService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_by_id(self, review_id: UUID) -> Optional[Review]:
-        """IDでレビューを取得"""
-        return self.db.query(Review).filter(Review.id == review_id).first()
+    def get_by_id(self, review_id: UUID, include_payload: bool = False) -> Optional[Review]:
+        """IDでレビューを取得（include_payload=Trueでembedding・raw_dataも読み込む）"""
+        query = self.db.query(Review)
+        if include_payload:
+            query = query.options(undefer_group(REVIEW_PAYLOAD_GROUP))
+        return query.filter(Review.id == review_id).first()
 
     def get_by_shop_id(
         self,
         shop_id: UUID,
         limit: int = 50,
         language: Optional[str] = None,
+        include_payload: bool = False,
     ) -> list[Review]:
         """店舗IDでレビュー一覧を取得
 
@@ -27,14 +52,34 @@ class ReviewService:
             shop_id: 店舗ID
             limit: 取得件数上限
             language: 言語コード（"ja"=日本語のみ, None=全言語）
+            include_payload: embedding・raw_dataも読み込むか（レスポンスには含まれない）
         """
         query = self.db.query(Review).filter(Review.shop_id == shop_id)
 
+        if include_payload:
+            query = query.options(undefer_group(REVIEW_PAYLOAD_GROUP))
+
         if language:
             query = query.filter(Review.language == language)
 
         return query.order_by(Review.time.desc()).limit(limit).all()
 
+    def get_version_by_shop_id(self, shop_id: UUID) -> tuple:
+        """
+        店舗のレビューのデータバージョンを取得（ETag用）
+
+        件数・最新作成日時・翻訳済み件数を集計し、追加・削除・翻訳の反映を検出する
+        """
+        return (
+            self.db.query(
+                func.count(Review.id),
+                func.max(Review.created_at),
+                func.count(Review.text_ja),
+            )
+            .filter(Review.shop_id == shop_id)
+            .one()
+        )
+
     def update_text_ja(self, review_id: UUID, text_ja: str) -> Optional[Review]:
         """レビューの日本語翻訳テキストを更新"""
         review = self.get_by_id(review_id)
@@ -82,6 +127,10 @@ class ReviewService:
             language=review_data.language,
             relative_time_description=review_data.relative_time_description,
             time=review_data.time,
+            identity_key=review_identity_key(
+                review_data.author_name, review_data.time, review_data.text
+            ),
+            match_key=review_match_key(review_data.author_name, review_data.time),
             raw_data=review_data.raw_data,
         )
 
@@ -91,42 +140,172 @@ class ReviewService:
         return review
 
     def bulk_create(self, shop_id: UUID, reviews_data: list[dict]) -> list[Review]:
-        """レビューを一括作成（重複チェック付き）"""
-        created_reviews = []
+        """
+        レビューを一括作成（重複チェック付き）
 
-        for review_data in reviews_data:
-            # 重複チェック
-            existing = self.get_by_shop_and_author(
-                shop_id=shop_id,
-                author_name=review_data.get("author_name", ""),
-                time=review_data.get("time", 0),
-            )
+        既存レビューと入力内の重複はスキップする（_insert_reviewsを参照）
+        """
+        if not reviews_data:
+            return []
 
-            if existing:
-                continue  # 既存レビューはスキップ
-
-            review = Review(
-                shop_id=shop_id,
-                author_name=review_data.get("author_name"),
-                author_url=review_data.get("author_url"),
-                profile_photo_url=review_data.get("profile_photo_url"),
-                rating=review_data.get("rating"),
-                text=review_data.get("text"),
-                language=review_data.get("language"),
-                relative_time_description=review_data.get("relative_time_description"),
-                time=review_data.get("time"),
-                raw_data=review_data.get("raw_data"),
-            )
-            self.db.add(review)
-            created_reviews.append(review)
+        created_reviews = self._insert_reviews(shop_id, reviews_data)
 
+        self.db.commit()
         if created_reviews:
-            self.db.commit()
-            for review in created_reviews:
-                self.db.refresh(review)
+            notify_reviews_changed(self.db, shop_id)
 
         return created_reviews
 
+    def sync_reviews(
+        self, shop_id: UUID, reviews_data: list[dict], delete_missing: bool = True
+    ) -> dict[str, int]:
+        """
+        店舗のレビューを差分同期
+
+        同一性キーで既存レビューと突き合わせ、新規は作成、内容が変わったものは更新、
+        取得結果にないものは削除する。同一性キーが一致しないレビューは、投稿者の編集や
+        翻訳で本文が変わった同じレビューとして突き合わせキー（投稿者名・投稿日）で突き合わせる。
+        変更のないレビューの埋め込み・翻訳はそのまま残し、
+        本文が変わったレビューのみ埋め込み・翻訳をクリアして再生成の対象にする
+
+        Args:
+            delete_missing: 取得結果にないレビューを削除するか
+                （取得件数に上限がある取得元では、上限外のレビューを消さないようFalseにする）
+
+        Returns:
+            {"created": 作成数, "updated": 更新数, "deleted": 削除数, "unchanged": 変更なし数}
+        """
+        sync_columns = [getattr(Review, field) for field in REVIEW_SYNC_FIELDS]
+        existing_rows = (
+            self.db.query(Review.id, Review.identity_key, Review.match_key, *sync_columns)
+            .filter(Review.shop_id == shop_id)
+            .order_by(Review.created_at, Review.id)
+            .all()
+        )
+
+        # 入力内の重複は先頭を採用（bulk_createと同じ）
+        incoming: dict[str, dict] = {}
+        for review_data in reviews_data:
+            incoming.setdefault(self._identity_key(review_data), review_data)
+
+        matches, new_reviews = self._match_reviews(existing_rows, incoming)
+
+        updates = []
+        for row, key, review_data in matches:
+            if row.identity_key == key and all(
+                getattr(row, field) == review_data.get(field) for field in REVIEW_SYNC_FIELDS
+            ):
+                continue
+
+            values = {field: review_data.get(field) for field in REVIEW_SYNC_UPDATE_FIELDS}
+            values["id"] = row.id
+            values["identity_key"] = key
+            if row.text != values["text"]:
+                values["embedding"] = None
+                values["text_ja"] = None
+            updates.append(values)
+
+        matched_ids = {row.id for row, _, _ in matches}
+        removed_ids = (
+            [row.id for row in existing_rows if row.id not in matched_ids] if delete_missing else []
+        )
+
+        if removed_ids:
+            self.db.query(Review).filter(Review.id.in_(removed_ids)).delete(
+                synchronize_session=False
+            )
+        if updates:
+            self.db.execute(update(Review), updates)
+        created_reviews = self._insert_reviews(shop_id, new_reviews) if new_reviews else []
+
+        self.db.commit()
+
+        counts = {
+            "created": len(created_reviews),
+            "updated": len(updates),
+            "deleted": len(removed_ids),
+            "unchanged": len(incoming) - len(new_reviews) - len(updates),
+        }
+        if counts["created"] or counts["updated"] or counts["deleted"]:
+            notify_reviews_changed(self.db, shop_id)
+
+        return counts
+
+    @staticmethod
+    def _match_reviews(existing_rows: list, incoming: dict[str, dict]) -> tuple[list, list[dict]]:
+        """
+        取得したレビューを既存レビューと突き合わせ
+
+        同一性キーで一致しないものは、突き合わせキーが同じ既存レビューと取得順・作成順に1対1で対応させる
+
+        Returns:
+            ([(既存レビュー行, 同一性キー, 取得データ)], 新規レビューのリスト)
+        """
+        by_identity = {row.identity_key: row for row in existing_rows}
+        candidates: dict[str, list] = defaultdict(list)
+        for row in existing_rows:
+            if row.identity_key not in incoming:
+                candidates[row.match_key].append(row)
+
+        matches = []
+        new_reviews = []
+        for key, review_data in incoming.items():
+            row = by_identity.get(key)
+            if row is None:
+                rows = candidates.get(
+                    review_match_key(review_data.get("author_name"), review_data.get("time"))
+                )
+                row = rows.pop(0) if rows else None
+
+            if row is None:
+                new_reviews.append(review_data)
+            else:
+                matches.append((row, key, review_data))
+
+        return matches, new_reviews
+
+    def _insert_reviews(self, shop_id: UUID, reviews_data: list[dict]) -> list[Review]:
+        """
+        INSERT ... ON CONFLICT DO NOTHING RETURNING でレビューを作成（コミットしない）
+
+        (shop_id, identity_key) のユニークインデックスで既存レビューと入力内の重複を
+        まとめてスキップする（1000件ごとに1ステートメント）。同一性キーは投稿時刻の
+        単位（秒 / ミリ秒）を正規化するため、Places APIとApifyの同じレビューも重複とみなす
+        """
+        rows = [
+            {
+                "shop_id": shop_id,
+                "author_name": review_data.get("author_name"),
+                "author_url": review_data.get("author_url"),
+                "profile_photo_url": review_data.get("profile_photo_url"),
+                "rating": review_data.get("rating"),
+                "text": review_data.get("text"),
+                "language": review_data.get("language"),
+                "relative_time_description": review_data.get("relative_time_description"),
+                "time": review_data.get("time"),
+                "identity_key": self._identity_key(review_data),
+                "match_key": review_match_key(
+                    review_data.get("author_name"), review_data.get("time")
+                ),
+                "raw_data": review_data.get("raw_data"),
+            }
+            for review_data in reviews_data
+        ]
+
+        stmt = (
+            insert(Review)
+            .on_conflict_do_nothing(index_elements=["shop_id", "identity_key"])
+            .returning(Review)
+        )
+        return list(self.db.scalars(stmt, rows))
+
+    @staticmethod
+    def _identity_key(review_data: dict) -> str:
+        """正規化済みレビューデータの同一性キー"""
+        return review_identity_key(
+            review_data.get("author_name"), review_data.get("time"), review_data.get("text")
+        )
+
     def delete_by_shop_id(self, shop_id: UUID) -> int:
         """店舗のレビューを全削除"""
         deleted_count = self.db.query(Review).filter(Review.shop_id == shop_id).delete()
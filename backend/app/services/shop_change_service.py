@@ -0,0 +1,74 @@
+"""
+店舗の差分同期サービス
+shop_changes（トリガーで記録される変更履歴）から、トークン以降に変更された店舗を取得する
+"""
+
+import logging
+from uuid import UUID
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session, aliased
+
+from app.models.shop_change import ShopChange
+
+logger = logging.getLogger(__name__)
+
+
+class ShopChangeService:
+    """
+    店舗の差分同期サービス
+
+    トークンはトランザクションIDの境界（txid_snapshot_xmin）。
+    境界より小さいIDのトランザクションはすべて完了しているため、
+    コミット順とID順が前後しても変更を取りこぼさない。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_current_token(self) -> int:
+        """現在のトークン（実行中のトランザクションのうち最小のID）を取得"""
+        return self.db.execute(text("SELECT txid_snapshot_xmin(txid_current_snapshot())")).scalar()
+
+    def get_changed_shop_ids(self, since: int) -> list[UUID]:
+        """
+        トークン以降に変更された店舗IDを取得（最後に変更された順）
+
+        新しいトークンはこの呼び出しより先に取得しておく（境界以降の変更は次回も返る）
+
+        Args:
+            since: 前回のトークン
+        """
+        rows = self.db.execute(
+            select(ShopChange.shop_id)
+            .where(ShopChange.txid >= since)
+            .group_by(ShopChange.shop_id)
+            .order_by(func.max(ShopChange.txid))
+        ).all()
+
+        return [row.shop_id for row in rows]
+
+    def compact(self) -> int:
+        """
+        同じ店舗のより新しい変更がある履歴を削除
+
+        各店舗の最新の変更は残るため、どのトークンからの差分も変わらない
+
+        Returns:
+            削除した件数
+        """
+        newer = aliased(ShopChange)
+        superseded = (
+            select(newer.id)
+            .where(newer.shop_id == ShopChange.shop_id)
+            .where(
+                (newer.txid > ShopChange.txid)
+                | ((newer.txid == ShopChange.txid) & (newer.id > ShopChange.id))
+            )
+            .exists()
+        )
+        deleted = self.db.query(ShopChange).filter(superseded).delete(synchronize_session=False)
+        self.db.commit()
+
+        logger.info(f"Compacted shop change log: {deleted} rows deleted")
+        return deleted
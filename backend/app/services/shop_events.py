@@ -0,0 +1,41 @@
+"""
+店舗データ変更の通知
+店舗・レビュー・解析結果の書き込み後に呼び出し、派生キャッシュを無効化する
+"""
+
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.shop import Shop
+from app.services.response_cache import get_response_cache
+from app.services.spatial_index import get_spatial_index
+from app.services.tile_service import invalidate_tiles_at
+
+
+def notify_shop_changed(db: Session, shop_id: UUID, latitude: float, longitude: float) -> None:
+    """
+    店舗の作成・更新・削除を通知
+
+    Args:
+        db: 変更をコミットしたセッション
+        shop_id: 変更された店舗ID
+        latitude: 店舗の緯度
+        longitude: 店舗の経度
+    """
+    invalidate_tiles_at(latitude, longitude)
+    get_response_cache().invalidate_at(latitude, longitude)
+    get_spatial_index().refresh_shop(db, shop_id)
+
+
+def notify_reviews_changed(db: Session, shop_id: UUID) -> None:
+    """
+    店舗のレビュー追加を通知
+
+    地図表示用のタイル・空間インデックスはレビューに依存しないため、レスポンスキャッシュのみ無効化する
+    """
+    shop = db.query(Shop.latitude, Shop.longitude).filter(Shop.id == shop_id).first()
+    if shop is None or shop.latitude is None:
+        return
+
+    get_response_cache().invalidate_at(shop.latitude, shop.longitude)
@@ -2,20 +2,53 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
+from geoalchemy2 import Geography, Geometry
 from geoalchemy2.functions import ST_DWithin, ST_MakePoint
-from geoalchemy2.shape import to_shape
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Float, String, cast, func, literal, select, text, tuple_
+from sqlalchemy.orm import Session, contains_eager, joinedload
 
+from app.config import settings
 from app.models.analytics import ShopAIAnalytics
+from app.models.ranking import AreaRanking
 from app.models.shop import Shop
-from app.schemas.shop import LocationSchema, ShopCreate, ShopResponse, ShopUpdate
+from app.schemas.shop import (
+    AnalyticsSummary,
+    LocationSchema,
+    ShopCompactResponse,
+    ShopCreate,
+    ShopResponse,
+    ShopUpdate,
+    ViewportCluster,
+)
+from app.services.shop_events import notify_shop_changed
+from app.services.spatial_index import ShopSpatialIndex, get_spatial_index
+
+# 一覧レスポンスに含める解析結果の項目（AnalyticsSummaryと同じ順序）
+ANALYTICS_SUMMARY_FIELDS = tuple(AnalyticsSummary.model_fields)
+
+# クラスタリング対象のリスクレベル（未解析はunknownとして集計）
+RISK_LEVELS = ("safe", "gamble", "mine", "fake")
+
+# 1タイル（256px）あたりのグリッド分割数（約64pxごとに1クラスタ）
+CLUSTER_CELLS_PER_TILE = 4
+
+# このズーム以上ではクラスタリングせず店舗単位で返す
+CLUSTER_MAX_ZOOM = 17
 
 
 class ShopService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _get_spatial_index(self) -> Optional[ShopSpatialIndex]:
+        """compact検索に使用する空間インデックスを取得（無効の場合はNone）"""
+        if not settings.spatial_index_enabled:
+            return None
+
+        index = get_spatial_index()
+        index.ensure_loaded(self.db)
+        return index
+
     def get_by_id(self, shop_id: UUID) -> Optional[Shop]:
         """IDで店舗を取得"""
         return (
@@ -25,6 +58,26 @@ class ShopService:
             .first()
         )
 
+    def get_by_ids(self, shop_ids: Optional[list[UUID]] = None, compact: bool = False) -> list:
+        """
+        IDを指定して店舗を取得（Noneの場合は全店舗）
+
+        存在しないIDは結果に含まれない
+        """
+        if compact:
+            query = self.db.query(*self.compact_columns()).outerjoin(
+                ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id
+            )
+        else:
+            query = self.db.query(Shop).options(joinedload(Shop.analytics))
+
+        if shop_ids is not None:
+            if not shop_ids:
+                return []
+            query = query.filter(Shop.id.in_(shop_ids))
+
+        return query.all()
+
     def get_by_place_id(self, place_id: str) -> Optional[Shop]:
         """Google Place IDで店舗を取得"""
         return self.db.query(Shop).filter(Shop.place_id == place_id).first()
@@ -35,13 +88,25 @@ class ShopService:
         limit: int = 100,
         risk_level: Optional[str] = None,
         min_rating: Optional[float] = None,
-    ) -> tuple[list[Shop], int]:
-        """店舗一覧を取得"""
-        query = self.db.query(Shop).options(joinedload(Shop.analytics))
+        compact: bool = False,
+    ) -> tuple[list, int]:
+        """
+        店舗一覧を取得
+
+        compact=Trueの場合はShopモデルではなく地図表示用の列のみを取得する
+        """
+        if compact:
+            query = self.db.query(*self.compact_columns()).outerjoin(
+                ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id
+            )
+        else:
+            query = self.db.query(Shop).options(joinedload(Shop.analytics))
 
         # フィルター適用
         if risk_level:
-            query = query.join(Shop.analytics).filter(ShopAIAnalytics.risk_level == risk_level)
+            if not compact:
+                query = query.join(Shop.analytics)
+            query = query.filter(ShopAIAnalytics.risk_level == risk_level)
 
         if min_rating is not None:
             query = query.filter(Shop.rating >= min_rating)
@@ -51,6 +116,172 @@ class ShopService:
 
         return shops, total
 
+    def get_page_by_cursor(
+        self,
+        limit: int = 50,
+        after: Optional[list] = None,
+        sort_by: str = "created_at",
+        risk_level: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        compact: bool = False,
+    ) -> tuple[list, Optional[list]]:
+        """
+        キーセット（カーソル）方式で店舗一覧を取得
+
+        OFFSETとCOUNT(*)を使わないため、深いページでも先頭ページと同じコストで取得できる。
+
+        Args:
+            limit: 取得件数
+            after: 前ページ最終行のソートキー（decode_cursorの戻り値）
+            sort_by: created_at=登録順（昇順）, avg_score=平均スコア順（降順）
+            risk_level: リスクレベルフィルタ
+            min_rating: 最低Google評価
+            compact: 地図表示用の列のみを取得するか
+
+        Returns:
+            (店舗リスト, 次ページのソートキー（最終ページの場合None）)
+
+        Raises:
+            ValueError: ソートキーがカーソルと一致しない場合
+        """
+        if sort_by not in ("avg_score", "created_at"):
+            raise ValueError(f"Invalid sort_by: {sort_by}")
+
+        if compact:
+            query = self.db.query(*self.compact_columns())
+        else:
+            query = self.db.query(Shop).options(contains_eager(Shop.analytics))
+        query = query.outerjoin(ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id)
+
+        if risk_level:
+            query = query.filter(ShopAIAnalytics.risk_level == risk_level)
+
+        if min_rating is not None:
+            query = query.filter(Shop.rating >= min_rating)
+
+        after_value = after_id = None
+        if after is not None:
+            if len(after) != 2:
+                raise ValueError("Cursor does not match sort_by")
+            try:
+                if sort_by == "avg_score":
+                    after_value = float(after[0])
+                else:
+                    after_value = datetime.fromisoformat(after[0])
+                after_id = UUID(after[1])
+            except (TypeError, ValueError) as e:
+                raise ValueError("Cursor does not match sort_by") from e
+
+        # 次ページの有無を判定するため1件多く取得
+        if sort_by == "avg_score":
+            rows = self._get_avg_score_page(query, limit + 1, after_value, after_id)
+        else:
+            if after is not None:
+                query = query.filter(tuple_(Shop.created_at, Shop.id) > (after_value, after_id))
+            rows = (
+                query.add_columns(Shop.created_at.label("sort_key"))
+                .order_by(Shop.created_at.asc(), Shop.id.asc())
+                .limit(limit + 1)
+                .all()
+            )
+
+        shops = [row if compact else row[0] for row in rows[:limit]]
+        next_after = None
+        if len(rows) > limit:
+            last_row = rows[limit - 1]
+            last_id = last_row.id if compact else last_row[0].id
+            if sort_by == "avg_score":
+                next_after = [float(last_row.sort_key), str(last_id)]
+            else:
+                next_after = [last_row.sort_key.isoformat(), str(last_id)]
+
+        return shops, next_after
+
+    @staticmethod
+    def _get_avg_score_page(
+        query, limit: int, after_value: Optional[float], after_id: Optional[UUID]
+    ) -> list:
+        """
+        平均スコア順（降順）のページを取得（未解析店舗はソートキー-1として末尾に並べる）
+
+        解析済み店舗は(avg_score, shop_id)のインデックス、未解析店舗は主キーを降順にたどるよう
+        2つのクエリに分け、いずれもページの行数だけ読んで止まるようにする
+        """
+        rows = []
+        if after_value is None or after_value >= 0:
+            scored = query.filter(ShopAIAnalytics.avg_score.isnot(None))
+            if after_value is not None:
+                scored = scored.filter(
+                    tuple_(ShopAIAnalytics.avg_score, ShopAIAnalytics.shop_id)
+                    < (after_value, after_id)
+                )
+            rows = (
+                scored.add_columns(ShopAIAnalytics.avg_score.label("sort_key"))
+                .order_by(ShopAIAnalytics.avg_score.desc(), ShopAIAnalytics.shop_id.desc())
+                .limit(limit)
+                .all()
+            )
+
+        if len(rows) < limit:
+            unscored = query.filter(ShopAIAnalytics.avg_score.is_(None))
+            if after_value is not None and after_value < 0:
+                unscored = unscored.filter(Shop.id < after_id)
+            rows += (
+                unscored.add_columns(literal(-1.0, Float).label("sort_key"))
+                .order_by(Shop.id.desc())
+                .limit(limit - len(rows))
+                .all()
+            )
+
+        return rows
+
+    def count(
+        self,
+        risk_level: Optional[str] = None,
+        min_rating: Optional[float] = None,
+    ) -> int:
+        """条件に一致する店舗数をカウント"""
+        query = self.db.query(func.count(Shop.id))
+
+        if risk_level:
+            query = query.join(Shop.analytics).filter(ShopAIAnalytics.risk_level == risk_level)
+
+        if min_rating is not None:
+            query = query.filter(Shop.rating >= min_rating)
+
+        return query.scalar()
+
+    def get_data_version(self) -> tuple:
+        """
+        店舗・解析結果・ランキングのデータバージョンを取得（一覧系のETag用）
+
+        最終更新日時と件数（削除の検出用）を1クエリで集計する
+        """
+        return self.db.execute(
+            select(
+                select(func.max(Shop.updated_at)).scalar_subquery(),
+                select(func.count(Shop.id)).scalar_subquery(),
+                select(func.max(ShopAIAnalytics.last_analyzed_at)).scalar_subquery(),
+                select(func.count(ShopAIAnalytics.shop_id)).scalar_subquery(),
+                select(func.max(AreaRanking.refreshed_at)).scalar_subquery(),
+            )
+        ).one()
+
+    def estimate_count(self) -> Optional[int]:
+        """
+        店舗数の概算を取得（pg_classの統計情報を使用）
+
+        Returns:
+            概算件数（統計情報がない場合はNone）
+        """
+        reltuples = self.db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = 'shops'::regclass")
+        ).scalar()
+
+        if reltuples is None or reltuples < 0:
+            return None
+        return int(reltuples)
+
     def get_nearby(
         self,
         latitude: float,
@@ -58,25 +289,93 @@ class ShopService:
         radius_meters: float = 1000.0,
         limit: int = 50,
         risk_level: Optional[str] = None,
-    ) -> list[Shop]:
-        """指定座標の近隣店舗を取得"""
-        query = (
-            self.db.query(Shop)
-            .options(joinedload(Shop.analytics))
-            .filter(
-                ST_DWithin(
-                    Shop.location,
-                    func.ST_GeogFromText(f"POINT({longitude} {latitude})"),
-                    radius_meters,
-                )
+        compact: bool = False,
+    ) -> list:
+        """
+        指定座標の近隣店舗を取得
+
+        compact=Trueの場合は空間インデックスから取得する（DBへの問い合わせなし）
+        """
+        if compact and (index := self._get_spatial_index()):
+            results = index.nearby(latitude, longitude, radius_meters, limit, risk_level)
+            return [shop for shop, _ in results]
+
+        if compact:
+            query = self.db.query(*self.compact_columns()).outerjoin(
+                ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id
+            )
+        else:
+            query = self.db.query(Shop).options(joinedload(Shop.analytics))
+
+        query = query.filter(
+            ST_DWithin(
+                Shop.location,
+                func.ST_GeogFromText(f"POINT({longitude} {latitude})"),
+                radius_meters,
             )
         )
 
         if risk_level:
-            query = query.join(Shop.analytics).filter(ShopAIAnalytics.risk_level == risk_level)
+            if not compact:
+                query = query.join(Shop.analytics)
+            query = query.filter(ShopAIAnalytics.risk_level == risk_level)
 
         return query.limit(limit).all()
 
+    def get_nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        limit: int = 50,
+        max_radius_meters: Optional[float] = None,
+        risk_level: Optional[str] = None,
+        compact: bool = False,
+    ) -> list[tuple]:
+        """
+        指定座標から近い順に店舗を取得（KNN検索）
+
+        GiSTインデックスの<->演算子で距離順に走査するため、
+        半径内の件数が少なくても1回のクエリでlimit件まで取得できる。
+
+        Args:
+            latitude: 中心緯度
+            longitude: 中心経度
+            limit: 取得件数
+            max_radius_meters: 検索範囲の上限（Noneの場合は無制限）
+            risk_level: リスクレベルフィルタ
+            compact: 地図表示用の列のみを取得するか
+
+        Returns:
+            List of (Shop, distance_m) tuples
+            （compact=Trueの場合は (地図表示用の行, distance_m)）
+        """
+        if compact and (index := self._get_spatial_index()):
+            return index.nearby(latitude, longitude, max_radius_meters, limit, risk_level)
+
+        point = func.ST_GeogFromText(f"POINT({longitude} {latitude})")
+        distance = func.ST_Distance(Shop.location, point).label("distance_m")
+
+        if compact:
+            query = self.db.query(*self.compact_columns(), distance).outerjoin(
+                ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id
+            )
+        else:
+            query = self.db.query(Shop, distance).options(joinedload(Shop.analytics))
+
+        if max_radius_meters is not None:
+            query = query.filter(ST_DWithin(Shop.location, point, max_radius_meters))
+
+        if risk_level:
+            if not compact:
+                query = query.join(Shop.analytics)
+            query = query.filter(ShopAIAnalytics.risk_level == risk_level)
+
+        rows = query.order_by(Shop.location.op("<->")(point)).limit(limit).all()
+
+        if compact:
+            return [(row, row.distance_m) for row in rows]
+        return rows
+
     def get_nearby_with_ranking(
         self,
         latitude: float,
@@ -84,25 +383,28 @@ class ShopService:
         radius_meters: float = 2000.0,
         limit: int = 20,
         sort_by: str = "avg_score",
-    ) -> list[tuple[Shop, float]]:
+        compact: bool = False,
+    ) -> list[tuple]:
         """
         近隣店舗をスコア順で取得（ランキング用）
 
         Returns:
             List of (Shop, avg_score) tuples
+            （compact=Trueの場合は (地図表示用の行, avg_score)、空間インデックスから取得）
         """
-        # 平均スコア計算
-        avg_score = (
-            ShopAIAnalytics.score_operation
-            + ShopAIAnalytics.score_accuracy
-            + ShopAIAnalytics.score_hygiene
-            + ShopAIAnalytics.score_sincerity
-            + ShopAIAnalytics.score_safety
-        ) / 5.0
+        if compact and (index := self._get_spatial_index()):
+            return index.ranking(latitude, longitude, radius_meters, limit, sort_by)
+
+        # 平均スコア（shop_ai_analyticsの生成列）
+        avg_score = ShopAIAnalytics.avg_score
+
+        if compact:
+            query = self.db.query(*self.compact_columns(), avg_score)
+        else:
+            query = self.db.query(Shop, avg_score)
 
         query = (
-            self.db.query(Shop, avg_score.label("avg_score"))
-            .join(ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id)
+            query.join(ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id)
             .filter(
                 ST_DWithin(
                     Shop.location,
@@ -110,6 +412,7 @@ class ShopService:
                     radius_meters,
                 )
             )
+            .filter(avg_score.isnot(None))
         )
 
         # ソート条件
@@ -120,8 +423,62 @@ class ShopService:
         else:
             query = query.order_by(avg_score.desc())
 
+        if compact:
+            return [(row, row.avg_score) for row in query.limit(limit).all()]
+
         return query.limit(limit).all()
 
+    def get_viewport_clusters(
+        self,
+        min_lat: float,
+        min_lng: float,
+        max_lat: float,
+        max_lng: float,
+        zoom: int,
+        risk_level: Optional[str] = None,
+    ) -> tuple[list, float]:
+        """
+        表示範囲内の店舗をグリッド単位でクラスタリング
+
+        PostGISのST_SnapToGridで店舗をグリッドに割り当て、
+        グリッドごとに件数・重心・リスクレベル別件数を集計する。
+
+        Returns:
+            (クラスタ行のリスト, グリッド幅（度）)
+        """
+        if zoom >= CLUSTER_MAX_ZOOM:
+            # 最大ズームでは同一地点の店舗のみ集約
+            grid_size = 1e-6
+        else:
+            grid_size = 360.0 / (2**zoom * CLUSTER_CELLS_PER_TILE)
+
+        geom = cast(Shop.location, Geometry(srid=4326))
+        envelope = func.ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)
+        cell = func.ST_SnapToGrid(geom, grid_size)
+
+        risk_counts = [
+            func.count(Shop.id).filter(ShopAIAnalytics.risk_level == level).label(level)
+            for level in RISK_LEVELS
+        ]
+
+        query = (
+            self.db.query(
+                func.count(Shop.id).label("count"),
+                func.avg(func.ST_Y(geom)).label("lat"),
+                func.avg(func.ST_X(geom)).label("lng"),
+                func.min(cast(Shop.id, String)).label("shop_id"),
+                func.count(Shop.id).filter(ShopAIAnalytics.shop_id.is_(None)).label("unknown"),
+                *risk_counts,
+            )
+            .outerjoin(ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id)
+            .filter(func.ST_Intersects(Shop.location, cast(envelope, Geography(srid=4326))))
+        )
+
+        if risk_level:
+            query = query.filter(ShopAIAnalytics.risk_level == risk_level)
+
+        return query.group_by(cell).all(), grid_size
+
     def create(self, shop_data: ShopCreate) -> Shop:
         """新規店舗を作成"""
         # PostGIS POINTを作成
@@ -146,6 +503,8 @@ class ShopService:
         self.db.add(shop)
         self.db.commit()
         self.db.refresh(shop)
+
+        notify_shop_changed(self.db, shop.id, shop_data.latitude, shop_data.longitude)
         return shop
 
     def upsert(self, shop_data: ShopCreate) -> Shop:
@@ -186,6 +545,8 @@ class ShopService:
 
         self.db.commit()
         self.db.refresh(shop)
+
+        notify_shop_changed(self.db, shop.id, *self.get_coordinates(shop))
         return shop
 
     def delete(self, shop_id: UUID) -> bool:
@@ -194,18 +555,107 @@ class ShopService:
         if not shop:
             return False
 
+        latitude, longitude = self.get_coordinates(shop)
+
         self.db.delete(shop)
         self.db.commit()
+
+        notify_shop_changed(self.db, shop_id, latitude, longitude)
         return True
 
     @staticmethod
-    def shop_to_response(shop: Shop) -> ShopResponse:
+    def get_version(shop: Shop) -> tuple:
+        """店舗詳細のデータバージョンを取得（ETag用）"""
+        last_analyzed_at = shop.analytics.last_analyzed_at if shop.analytics else None
+        return shop.id, shop.updated_at, last_analyzed_at
+
+    @staticmethod
+    def compact_columns() -> list:
+        """
+        地図表示用の軽量な列リスト
+
+        raw_data/opening_hours等の大きなJSONBを読み込まないよう、必要な列のみを指定する
+        """
+        return [
+            Shop.id,
+            Shop.name,
+            Shop.latitude.label("lat"),
+            Shop.longitude.label("lng"),
+            Shop.rating,
+            ShopAIAnalytics.risk_level,
+            ShopAIAnalytics.score_operation,
+            ShopAIAnalytics.score_accuracy,
+            ShopAIAnalytics.score_hygiene,
+            ShopAIAnalytics.score_sincerity,
+            ShopAIAnalytics.score_safety,
+        ]
+
+    @staticmethod
+    def compact_row_to_response(row, distance_m: Optional[float] = None) -> ShopCompactResponse:
+        """compact_columnsの行をShopCompactResponseに変換"""
+        return ShopCompactResponse(
+            id=row.id,
+            name=row.name,
+            location=LocationSchema(lat=row.lat, lng=row.lng),
+            rating=row.rating,
+            risk_level=row.risk_level,
+            score_operation=row.score_operation,
+            score_accuracy=row.score_accuracy,
+            score_hygiene=row.score_hygiene,
+            score_sincerity=row.score_sincerity,
+            score_safety=row.score_safety,
+            distance_m=distance_m,
+        )
+
+    @staticmethod
+    def compact_row_to_dict(row, distance_m: Optional[float] = None) -> dict:
+        """
+        compact_columnsの行をJSON出力用のdictに変換
+
+        ShopCompactResponseと同じ構造。DBの値をそのまま使い、Pydanticの検証は行わない
+        """
+        return {
+            "id": row.id,
+            "name": row.name,
+            "location": {"lat": row.lat, "lng": row.lng},
+            "rating": row.rating,
+            "risk_level": row.risk_level,
+            "score_operation": row.score_operation,
+            "score_accuracy": row.score_accuracy,
+            "score_hygiene": row.score_hygiene,
+            "score_sincerity": row.score_sincerity,
+            "score_safety": row.score_safety,
+            "distance_m": distance_m,
+        }
+
+    @staticmethod
+    def get_coordinates(shop: Shop) -> tuple[float, float]:
+        """
+        店舗の緯度・経度を取得
+
+        クエリ時にSQLで計算済みのlatitude/longitudeを使用する（WKBの解析は不要）
+        """
+        return shop.latitude, shop.longitude
+
+    @staticmethod
+    def cluster_to_response(row) -> ViewportCluster:
+        """クラスタ行をViewportClusterに変換"""
+        risk_levels = {level: getattr(row, level) for level in (*RISK_LEVELS, "unknown")}
+
+        return ViewportCluster(
+            count=row.count,
+            center=LocationSchema(lat=row.lat, lng=row.lng),
+            risk_levels={level: count for level, count in risk_levels.items() if count},
+            shop_id=row.shop_id if row.count == 1 else None,
+        )
+
+    @staticmethod
+    def shop_to_response(shop: Shop, distance_m: Optional[float] = None) -> ShopResponse:
         """ShopモデルをShopResponseに変換"""
         # PostGIS Geographyから緯度・経度を抽出
-        if shop.location:
-            # GeoAlchemy2のto_shapeを使用
-            point = to_shape(shop.location)
-            location = LocationSchema(lat=point.y, lng=point.x)
+        if shop.latitude is not None:
+            latitude, longitude = ShopService.get_coordinates(shop)
+            location = LocationSchema(lat=latitude, lng=longitude)
         else:
             location = LocationSchema(lat=0, lng=0)
 
@@ -226,4 +676,41 @@ class ShopService:
             updated_at=shop.updated_at,
             last_fetched_at=shop.last_fetched_at,
             analytics=shop.analytics,
+            distance_m=distance_m,
         )
+
+    @staticmethod
+    def shop_to_dict(shop: Shop, distance_m: Optional[float] = None) -> dict:
+        """
+        ShopモデルをJSON出力用のdictに変換
+
+        ShopResponseと同じ構造・項目順。DBの値をそのまま使い、Pydanticの検証は行わない
+        """
+        if shop.latitude is not None:
+            latitude, longitude = ShopService.get_coordinates(shop)
+        else:
+            latitude, longitude = 0, 0
+
+        analytics = shop.analytics
+        if analytics is not None:
+            analytics = {field: getattr(analytics, field) for field in ANALYTICS_SUMMARY_FIELDS}
+
+        return {
+            "place_id": shop.place_id,
+            "name": shop.name,
+            "formatted_address": shop.formatted_address,
+            "rating": shop.rating,
+            "user_ratings_total": shop.user_ratings_total,
+            "price_level": shop.price_level,
+            "business_status": shop.business_status,
+            "opening_hours": shop.opening_hours,
+            "phone_number": shop.phone_number,
+            "website": shop.website,
+            "id": shop.id,
+            "location": {"lat": latitude, "lng": longitude},
+            "created_at": shop.created_at,
+            "updated_at": shop.updated_at,
+            "last_fetched_at": shop.last_fetched_at,
+            "analytics": analytics,
+            "distance_m": distance_m,
+        }
@@ -0,0 +1,357 @@
+"""
+店舗の空間インデックス（プロセス内スナップショット）
+全店舗の座標・リスクレベル・スコアをNumPy配列とグリッドで保持し、
+近隣検索・ランキングをPostgreSQLへの問い合わせなしで処理する
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.analytics import ShopAIAnalytics
+from app.models.shop import Shop
+
+logger = logging.getLogger(__name__)
+
+# グリッドの1セルの大きさ（度）：約1km
+GRID_SIZE_DEG = 0.01
+
+# 地球の半径（メートル）
+EARTH_RADIUS = 6371000
+
+SCORE_FIELDS = (
+    "score_operation",
+    "score_accuracy",
+    "score_hygiene",
+    "score_sincerity",
+    "score_safety",
+)
+
+
+# スナップショット（再構築時に差し替える）の属性
+SNAPSHOT_FIELDS = (
+    "_capacity",
+    "_lat",
+    "_lng",
+    "_scores",
+    "_active",
+    "_rows",
+    "_slots",
+    "_free",
+    "_grid",
+)
+
+
+class IndexedShop(NamedTuple):
+    """インデックス内の店舗（ShopService.compact_columnsの行と同じ属性を持つ）"""
+
+    id: UUID
+    name: str
+    lat: float
+    lng: float
+    rating: Optional[float]
+    risk_level: Optional[str]
+    score_operation: Optional[int]
+    score_accuracy: Optional[int]
+    score_hygiene: Optional[int]
+    score_sincerity: Optional[int]
+    score_safety: Optional[int]
+
+
+def _grid_cell(latitude: float, longitude: float) -> tuple[int, int]:
+    return int(math.floor(latitude / GRID_SIZE_DEG)), int(math.floor(longitude / GRID_SIZE_DEG))
+
+
+class ShopSpatialIndex:
+    """店舗の空間インデックス"""
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._lock = threading.RLock()
+        # 再構築は1スレッドのみ（検索は再構築中も旧スナップショットで処理）
+        self._load_lock = threading.RLock()
+        # 再構築中に変更が通知された店舗ID（再構築中以外はNone）
+        self._dirty_shop_ids: Optional[set[UUID]] = None
+        self._reset(initial_capacity)
+        self.loaded_at: Optional[float] = None
+
+    def _reset(self, capacity: int):
+        self._capacity = capacity
+        self._lat = np.zeros(capacity)
+        self._lng = np.zeros(capacity)
+        # スコア（未解析はNaN）: [score_*, avg_score]
+        self._scores = np.full((capacity, len(SCORE_FIELDS) + 1), np.nan)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._rows: list[Optional[IndexedShop]] = [None] * capacity
+        self._slots: dict[UUID, int] = {}
+        self._free: list[int] = list(range(capacity - 1, -1, -1))
+        self._grid: dict[tuple[int, int], set[int]] = defaultdict(set)
+
+    @property
+    def is_ready(self) -> bool:
+        """インデックスが構築済みかつ有効期限内か"""
+        if self.loaded_at is None:
+            return False
+        return time.monotonic() - self.loaded_at < settings.spatial_index_max_age_seconds
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # ============================================
+    # 構築・更新
+    # ============================================
+
+    @staticmethod
+    def _query(db: Session):
+        return db.query(
+            Shop.id,
+            Shop.name,
+            Shop.latitude.label("lat"),
+            Shop.longitude.label("lng"),
+            Shop.rating,
+            ShopAIAnalytics.risk_level,
+            *(getattr(ShopAIAnalytics, field) for field in SCORE_FIELDS),
+        ).outerjoin(ShopAIAnalytics, Shop.id == ShopAIAnalytics.shop_id)
+
+    def load(self, db: Session) -> int:
+        """
+        全店舗を読み込んでインデックスを再構築
+
+        新しいスナップショットは別に構築してロック中に差し替える。
+        構築中に通知された店舗の変更は、差し替え後にDBから読み直して反映する
+
+        Returns:
+            読み込んだ店舗数
+        """
+        with self._load_lock:
+            with self._lock:
+                self._dirty_shop_ids = set()
+
+            try:
+                rows = self._query(db).all()
+                snapshot = ShopSpatialIndex(max(len(rows) * 2, 1024))
+                for row in rows:
+                    snapshot._put(IndexedShop(*row))
+            except Exception:
+                with self._lock:
+                    self._dirty_shop_ids = None
+                raise
+
+            with self._lock:
+                for field in SNAPSHOT_FIELDS:
+                    setattr(self, field, getattr(snapshot, field))
+                self.loaded_at = time.monotonic()
+                dirty_shop_ids, self._dirty_shop_ids = self._dirty_shop_ids, None
+
+            for shop_id in dirty_shop_ids:
+                self.refresh_shop(db, shop_id)
+
+        logger.info(f"Spatial index loaded: {len(rows)} shops")
+        return len(rows)
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        未構築または期限切れの場合にインデックスを再構築
+
+        他のスレッドが再構築中の場合、構築済みであれば旧スナップショットをそのまま使い、
+        未構築であれば再構築の完了を待つ
+        """
+        if self.is_ready:
+            return
+        if not self._load_lock.acquire(blocking=self.loaded_at is None):
+            return
+        try:
+            if not self.is_ready:
+                self.load(db)
+        finally:
+            self._load_lock.release()
+
+    def refresh_shop(self, db: Session, shop_id: UUID) -> None:
+        """店舗1件をDBから再読み込み（削除済みの場合はインデックスから除外）"""
+        with self._lock:
+            if self._dirty_shop_ids is not None:
+                self._dirty_shop_ids.add(shop_id)
+            if self.loaded_at is None:
+                return
+
+        row = self._query(db).filter(Shop.id == shop_id).first()
+
+        with self._lock:
+            if row is None:
+                self._remove(shop_id)
+            else:
+                self._put(IndexedShop(*row))
+
+    def _put(self, shop: IndexedShop) -> None:
+        slot = self._slots.get(shop.id)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self._slots[shop.id] = slot
+        else:
+            old = self._rows[slot]
+            self._grid[_grid_cell(old.lat, old.lng)].discard(slot)
+
+        scores = [getattr(shop, field) for field in SCORE_FIELDS]
+        values = [np.nan if score is None else score for score in scores]
+        avg_score = np.nan if None in scores else sum(scores) / len(scores)
+
+        self._lat[slot] = shop.lat
+        self._lng[slot] = shop.lng
+        self._scores[slot] = [*values, avg_score]
+        self._active[slot] = True
+        self._rows[slot] = shop
+        self._grid[_grid_cell(shop.lat, shop.lng)].add(slot)
+
+    def _remove(self, shop_id: UUID) -> None:
+        slot = self._slots.pop(shop_id, None)
+        if slot is None:
+            return
+
+        old = self._rows[slot]
+        self._grid[_grid_cell(old.lat, old.lng)].discard(slot)
+        self._active[slot] = False
+        self._rows[slot] = None
+        self._free.append(slot)
+
+    def _grow(self) -> None:
+        old_capacity = self._capacity
+        new_capacity = old_capacity * 2
+
+        self._lat = np.concatenate([self._lat, np.zeros(old_capacity)])
+        self._lng = np.concatenate([self._lng, np.zeros(old_capacity)])
+        self._scores = np.concatenate(
+            [self._scores, np.full((old_capacity, self._scores.shape[1]), np.nan)]
+        )
+        self._active = np.concatenate([self._active, np.zeros(old_capacity, dtype=bool)])
+        self._rows.extend([None] * old_capacity)
+        self._free.extend(range(new_capacity - 1, old_capacity - 1, -1))
+        self._capacity = new_capacity
+
+    # ============================================
+    # 検索
+    # ============================================
+
+    def _candidates(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_meters: Optional[float],
+        risk_level: Optional[str],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        半径内の店舗スロットと距離を取得
+
+        Returns:
+            (スロット配列, 距離配列（メートル）)
+        """
+        if radius_meters is None:
+            slots = np.flatnonzero(self._active)
+        else:
+            # 半径を含むグリッドセルから候補を収集
+            lat_offset = radius_meters / 111320
+            lng_offset = radius_meters / (111320 * max(math.cos(math.radians(latitude)), 1e-6))
+            min_cell = _grid_cell(latitude - lat_offset, longitude - lng_offset)
+            max_cell = _grid_cell(latitude + lat_offset, longitude + lng_offset)
+            cell_count = (max_cell[0] - min_cell[0] + 1) * (max_cell[1] - min_cell[1] + 1)
+
+            if cell_count > len(self._slots):
+                # セル数が店舗数より多い場合は全店舗を直接走査する方が速い
+                slots = np.flatnonzero(self._active)
+            else:
+                candidates: list[int] = []
+                for i in range(min_cell[0], max_cell[0] + 1):
+                    for j in range(min_cell[1], max_cell[1] + 1):
+                        candidates.extend(self._grid.get((i, j), ()))
+                slots = np.array(candidates, dtype=np.int64)
+
+        if slots.size == 0:
+            return slots, np.zeros(0)
+
+        # Haversine距離（ベクトル演算）
+        phi1 = math.radians(latitude)
+        phi2 = np.radians(self._lat[slots])
+        delta_phi = phi2 - phi1
+        delta_lambda = np.radians(self._lng[slots] - longitude)
+        a = (
+            np.sin(delta_phi / 2) ** 2
+            + math.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+        )
+        distances = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+        mask = np.ones(slots.size, dtype=bool)
+        if radius_meters is not None:
+            mask &= distances <= radius_meters
+        if risk_level:
+            mask &= np.array([self._rows[slot].risk_level == risk_level for slot in slots])
+
+        return slots[mask], distances[mask]
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_meters: Optional[float] = 1000.0,
+        limit: int = 50,
+        risk_level: Optional[str] = None,
+    ) -> list[tuple[IndexedShop, float]]:
+        """
+        近い順に店舗を取得
+
+        Returns:
+            List of (IndexedShop, distance_m) tuples
+        """
+        with self._lock:
+            slots, distances = self._candidates(latitude, longitude, radius_meters, risk_level)
+            order = np.argsort(distances, kind="stable")[:limit]
+            return [(self._rows[slots[i]], float(distances[i])) for i in order]
+
+    def ranking(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_meters: float = 2000.0,
+        limit: int = 20,
+        sort_by: str = "avg_score",
+    ) -> list[tuple[IndexedShop, float]]:
+        """
+        半径内の解析済み店舗をスコア順に取得
+
+        Returns:
+            List of (IndexedShop, avg_score) tuples
+        """
+        if sort_by in SCORE_FIELDS:
+            column = SCORE_FIELDS.index(sort_by)
+        else:
+            column = len(SCORE_FIELDS)
+
+        with self._lock:
+            slots, _ = self._candidates(latitude, longitude, radius_meters, None)
+            scores = self._scores[slots]
+
+            # 解析済み（スコアが揃っている）店舗のみ
+            analyzed = ~np.isnan(scores[:, len(SCORE_FIELDS)])
+            slots, scores = slots[analyzed], scores[analyzed]
+
+            order = np.argsort(-scores[:, column], kind="stable")[:limit]
+            return [(self._rows[slots[i]], float(scores[i, len(SCORE_FIELDS)])) for i in order]
+
+
+# シングルトンインスタンス
+_spatial_index: Optional[ShopSpatialIndex] = None
+
+
+def get_spatial_index() -> ShopSpatialIndex:
+    """空間インデックスのシングルトンを取得"""
+    global _spatial_index
+    if _spatial_index is None:
+        _spatial_index = ShopSpatialIndex()
+    return _spatial_index
@@ -0,0 +1,156 @@
+"""
+ベクタータイル（MVT）生成サービス
+店舗マーカーをPostGISのST_AsMVTでタイル化し、プロセス内にキャッシュする
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.analytics import ShopAIAnalytics
+from app.models.shop import Shop
+from app.utils.cache import TTLCache
+from app.utils.geo import tiles_covering_point
+
+logger = logging.getLogger(__name__)
+
+# MVTの座標範囲とバッファ（タイル座標単位）
+TILE_EXTENT = 4096
+TILE_BUFFER = 256
+
+# 対応するズームレベルの上限
+MAX_TILE_ZOOM = 22
+
+# Webメルカトル（EPSG:3857）の全幅（メートル）
+WEB_MERCATOR_WIDTH = 40075016.685578488
+
+TILE_SQL = text(
+    """
+    WITH bounds AS (
+        SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+    ),
+    mvtgeom AS (
+        SELECT
+            ST_AsMVTGeom(
+                ST_Transform(s.location::geometry, 3857),
+                bounds.geom,
+                :extent,
+                :buffer
+            ) AS geom,
+            s.id::text AS id,
+            s.name,
+            s.rating,
+            COALESCE(a.risk_level, 'unknown') AS risk_level
+        FROM shops s
+        LEFT JOIN shop_ai_analytics a ON a.shop_id = s.id
+        CROSS JOIN bounds
+        WHERE ST_Intersects(
+            s.location,
+            ST_Transform(ST_Expand(bounds.geom, :margin), 4326)::geography
+        )
+    )
+    SELECT ST_AsMVT(mvtgeom.*, 'shops', :extent, 'geom')
+    FROM mvtgeom
+    WHERE geom IS NOT NULL
+"""
+)
+
+
+class TileService:
+    """ベクタータイルサービス"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.cache = get_tile_cache()
+
+    def get_data_version(self) -> tuple:
+        """
+        タイルに含まれるデータ（店舗・解析結果）のバージョンを取得（ETag・キャッシュの検証用）
+
+        最終更新日時と件数（削除の検出用）を1クエリで集計する
+        """
+        return self.db.execute(
+            select(
+                select(func.max(Shop.updated_at)).scalar_subquery(),
+                select(func.count(Shop.id)).scalar_subquery(),
+                select(func.max(ShopAIAnalytics.last_analyzed_at)).scalar_subquery(),
+                select(func.count(ShopAIAnalytics.shop_id)).scalar_subquery(),
+            )
+        ).one()
+
+    def get_tile(self, z: int, x: int, y: int, version: Optional[tuple] = None) -> bytes:
+        """
+        店舗マーカーのベクタータイルを取得
+
+        キャッシュは生成時のデータバージョンと一致する場合のみ使う
+        （他のワーカーでの書き込みでinvalidate_tiles_atが呼ばれなかった場合も古いタイルを返さない）
+
+        Args:
+            z: ズームレベル
+            x: タイルX座標
+            y: タイルY座標
+            version: get_data_versionの戻り値
+
+        Returns:
+            MVTバイナリ（店舗がない場合は空）
+        """
+        key = (z, x, y)
+        version = tuple(version) if version is not None else None
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        # バッファ分だけ検索範囲を広げる（メートル）
+        tile_width = WEB_MERCATOR_WIDTH / (2**z)
+        margin = tile_width * TILE_BUFFER / TILE_EXTENT
+
+        result = self.db.execute(
+            TILE_SQL,
+            {
+                "z": z,
+                "x": x,
+                "y": y,
+                "extent": TILE_EXTENT,
+                "buffer": TILE_BUFFER,
+                "margin": margin,
+            },
+        ).scalar()
+
+        tile = bytes(result) if result else b""
+        self.cache.set(key, (version, tile))
+        return tile
+
+
+def invalidate_tiles_at(latitude: float, longitude: float) -> int:
+    """
+    指定地点を含むタイルのキャッシュを全ズームレベルで削除
+
+    Returns:
+        削除したタイル数
+    """
+    cache = get_tile_cache()
+    deleted = 0
+
+    for z in range(MAX_TILE_ZOOM + 1):
+        for x, y in tiles_covering_point(latitude, longitude, z, TILE_BUFFER / TILE_EXTENT):
+            if cache.delete((z, x, y)):
+                deleted += 1
+
+    if deleted:
+        logger.debug(f"Invalidated {deleted} tiles at ({latitude}, {longitude})")
+
+    return deleted
+
+
+# シングルトンインスタンス
+_tile_cache: Optional[TTLCache] = None
+
+
+def get_tile_cache() -> TTLCache:
+    """タイルキャッシュのシングルトンを取得（値は (データバージョン, MVTバイナリ)）"""
+    global _tile_cache
+    if _tile_cache is None:
+        _tile_cache = TTLCache(maxsize=4096, ttl_seconds=3600)
+    return _tile_cache
@@ -1,9 +1,15 @@
 from app.tasks.analysis_task import AnalysisTask, run_analysis_batch
+from app.tasks.embedding_cache_task import run_embedding_cache_eviction
+from app.tasks.ranking_task import run_ranking_refresh
 from app.tasks.scheduler import TaskScheduler, get_scheduler, setup_default_jobs
+from app.tasks.shop_change_task import run_shop_change_compaction
 
 __all__ = [
     "AnalysisTask",
     "run_analysis_batch",
+    "run_embedding_cache_eviction",
+    "run_ranking_refresh",
+    "run_shop_change_compaction",
     "TaskScheduler",
     "get_scheduler",
     "setup_default_jobs",
@@ -7,10 +7,10 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai.analyzer import ReviewAnalyzer
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +31,8 @@ class AnalysisTaskResult:
 class AnalysisTask:
     """解析バッチタスク"""
 
-    def __init__(self, db: Optional[Session] = None):
-        self.db = db or SessionLocal()
+    def __init__(self, db: Optional[AsyncSession] = None):
+        self.db = db or AsyncSessionLocal()
         self.analyzer = ReviewAnalyzer(self.db)
 
     async def run_unanalyzed(
@@ -54,7 +54,7 @@ class AnalysisTask:
         logger.info(f"Starting analysis task for unanalyzed shops (limit={limit})")
 
         # 未解析店舗を取得
-        unanalyzed_shops = self.analyzer.get_unanalyzed_shops(limit=limit)
+        unanalyzed_shops = await self.analyzer.get_unanalyzed_shops(limit=limit)
         shop_ids = [shop.id for shop in unanalyzed_shops]
 
         logger.info(f"Found {len(shop_ids)} unanalyzed shops")
@@ -96,7 +96,7 @@ class AnalysisTask:
         )
 
         # 古い解析結果を持つ店舗を取得
-        outdated_shops = self.analyzer.get_outdated_shops(
+        outdated_shops = await self.analyzer.get_outdated_shops(
             days_threshold=days_threshold,
             limit=limit,
         )
@@ -157,10 +157,26 @@ class AnalysisTask:
             errors=results["errors"],
         )
 
-    def close(self):
+    async def close(self):
         """DBセッションを閉じる"""
         if self.db:
-            self.db.close()
+            await self.db.close()
+
+
+async def _refresh_rankings():
+    """ランキング更新ジョブを実行（スケジューラ未登録の場合は直接実行）"""
+    from app.tasks.ranking_task import RANKING_JOB_NAME, run_ranking_refresh
+    from app.tasks.scheduler import get_scheduler
+
+    scheduler = get_scheduler()
+
+    try:
+        if RANKING_JOB_NAME in scheduler.jobs:
+            await scheduler.run_job(RANKING_JOB_NAME)
+        else:
+            await run_ranking_refresh()
+    except Exception as e:
+        logger.error(f"Ranking refresh after analysis failed: {e}")
 
 
 async def run_analysis_batch(
@@ -193,6 +209,10 @@ async def run_analysis_batch(
         else:
             raise ValueError(f"Unknown task type: {task_type}")
 
+        # 解析結果が変わった場合はランキングを更新
+        if result.analyzed > 0:
+            await _refresh_rankings()
+
         return {
             "status": "completed",
             "started_at": result.started_at.isoformat(),
@@ -206,4 +226,4 @@ async def run_analysis_batch(
         }
 
     finally:
-        task.close()
+        await task.close()
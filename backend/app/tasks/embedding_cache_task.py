@@ -0,0 +1,37 @@
+"""
+埋め込みキャッシュの削除タスク
+"""
+
+import logging
+from datetime import datetime
+
+from app.db.session import AsyncSessionLocal
+from app.services.embedding_cache_service import EmbeddingCacheService
+
+logger = logging.getLogger(__name__)
+
+# スケジューラに登録するジョブ名
+EMBEDDING_CACHE_JOB_NAME = "evict_embedding_cache"
+
+
+async def run_embedding_cache_eviction() -> dict:
+    """
+    埋め込みキャッシュから古い行を削除するヘルパー関数
+
+    Returns:
+        タスク結果の辞書
+    """
+    started_at = datetime.utcnow()
+    # 同期のサービスをAsyncSessionの接続上で実行し、イベントループをブロックしない
+    async with AsyncSessionLocal() as db:
+        deleted = await db.run_sync(lambda session: EmbeddingCacheService(session).evict())
+
+    completed_at = datetime.utcnow()
+
+    return {
+        "status": "completed",
+        "started_at": started_at.isoformat(),
+        "completed_at": completed_at.isoformat(),
+        "duration_seconds": (completed_at - started_at).total_seconds(),
+        "deleted": deleted,
+    }
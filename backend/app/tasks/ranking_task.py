@@ -0,0 +1,37 @@
+"""
+エリア別ランキング更新タスク
+"""
+
+import logging
+from datetime import datetime
+
+from app.db.session import AsyncSessionLocal
+from app.services.ranking_service import RankingService
+
+logger = logging.getLogger(__name__)
+
+# スケジューラに登録するジョブ名
+RANKING_JOB_NAME = "refresh_rankings"
+
+
+async def run_ranking_refresh() -> dict:
+    """
+    エリア別ランキングを再計算するヘルパー関数
+
+    Returns:
+        タスク結果の辞書
+    """
+    started_at = datetime.utcnow()
+    # 同期のサービスをAsyncSessionの接続上で実行し、イベントループをブロックしない
+    async with AsyncSessionLocal() as db:
+        counts = await db.run_sync(lambda session: RankingService(session).refresh_all())
+
+    completed_at = datetime.utcnow()
+
+    return {
+        "status": "completed",
+        "started_at": started_at.isoformat(),
+        "completed_at": completed_at.isoformat(),
+        "duration_seconds": (completed_at - started_at).total_seconds(),
+        "areas": counts,
+    }
@@ -181,6 +181,12 @@ def get_scheduler() -> TaskScheduler:
 def setup_default_jobs(scheduler: TaskScheduler):
     """デフォルトのジョブを設定"""
     from app.tasks.analysis_task import run_analysis_batch
+    from app.tasks.embedding_cache_task import (
+        EMBEDDING_CACHE_JOB_NAME,
+        run_embedding_cache_eviction,
+    )
+    from app.tasks.ranking_task import RANKING_JOB_NAME, run_ranking_refresh
+    from app.tasks.shop_change_task import SHOP_CHANGES_JOB_NAME, run_shop_change_compaction
 
     # 未解析店舗の解析（1時間ごと）
     scheduler.add_job(
@@ -200,3 +206,24 @@ def setup_default_jobs(scheduler: TaskScheduler):
         limit=10,
         days_threshold=30,
     )
+
+    # エリア別ランキングの再計算（1時間ごと、解析バッチ完了時にも実行）
+    scheduler.add_job(
+        name=RANKING_JOB_NAME,
+        func=run_ranking_refresh,
+        interval_minutes=60,
+    )
+
+    # 差分同期用の変更履歴の圧縮（1日ごと）
+    scheduler.add_job(
+        name=SHOP_CHANGES_JOB_NAME,
+        func=run_shop_change_compaction,
+        interval_minutes=1440,
+    )
+
+    # 埋め込みキャッシュの古い行の削除（1日ごと）
+    scheduler.add_job(
+        name=EMBEDDING_CACHE_JOB_NAME,
+        func=run_embedding_cache_eviction,
+        interval_minutes=1440,
+    )
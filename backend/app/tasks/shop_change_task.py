@@ -0,0 +1,37 @@
+"""
+店舗変更履歴の圧縮タスク
+"""
+
+import logging
+from datetime import datetime
+
+from app.db.session import AsyncSessionLocal
+from app.services.shop_change_service import ShopChangeService
+
+logger = logging.getLogger(__name__)
+
+# スケジューラに登録するジョブ名
+SHOP_CHANGES_JOB_NAME = "compact_shop_changes"
+
+
+async def run_shop_change_compaction() -> dict:
+    """
+    店舗変更履歴から古い変更を削除するヘルパー関数
+
+    Returns:
+        タスク結果の辞書
+    """
+    started_at = datetime.utcnow()
+    # 同期のサービスをAsyncSessionの接続上で実行し、イベントループをブロックしない
+    async with AsyncSessionLocal() as db:
+        deleted = await db.run_sync(lambda session: ShopChangeService(session).compact())
+
+    completed_at = datetime.utcnow()
+
+    return {
+        "status": "completed",
+        "started_at": started_at.isoformat(),
+        "completed_at": completed_at.isoformat(),
+        "duration_seconds": (completed_at - started_at).total_seconds(),
+        "deleted": deleted,
+    }
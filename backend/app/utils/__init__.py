@@ -1,3 +1,10 @@
-from app.utils.geo import calculate_distance, create_point_wkt
+from app.utils.geo import calculate_distance, create_point_wkt, tiles_covering_point
+from app.utils.review_identity import review_identity_key, review_match_key
 
-__all__ = ["calculate_distance", "create_point_wkt"]
+__all__ = [
+    "calculate_distance",
+    "create_point_wkt",
+    "tiles_covering_point",
+    "review_identity_key",
+    "review_match_key",
+]
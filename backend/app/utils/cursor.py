@@ -0,0 +1,35 @@
+import base64
+import json
+
+
+def encode_cursor(values: list) -> str:
+    """
+    キーセットページネーション用のカーソルを生成
+
+    Args:
+        values: 最終行のソートキー（JSONシリアライズ可能な値のリスト）
+
+    Returns:
+        URLセーフなBase64文字列
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    カーソル文字列をソートキーに復元
+
+    Raises:
+        ValueError: カーソルが不正な場合
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    return values
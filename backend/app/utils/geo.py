@@ -81,3 +81,33 @@ def get_bounding_box(
         latitude + lat_offset,
         longitude + lng_offset,
     )
+
+
+def tiles_covering_point(
+    latitude: float,
+    longitude: float,
+    zoom: int,
+    buffer: float = 0.0,
+) -> list[Tuple[int, int]]:
+    """
+    指定地点を含むWebメルカトルタイル座標を計算
+
+    Args:
+        latitude: 緯度
+        longitude: 経度
+        zoom: ズームレベル
+        buffer: タイル外周のバッファ（タイル幅に対する割合）
+
+    Returns:
+        (x, y) タイル座標のリスト（バッファにより隣接タイルを含む場合がある）
+    """
+    n = 2**zoom
+    lat_rad = math.radians(max(min(latitude, 85.0511), -85.0511))
+
+    fx = (longitude + 180.0) / 360.0 * n
+    fy = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+
+    xs = range(max(int(math.floor(fx - buffer)), 0), min(int(math.floor(fx + buffer)), n - 1) + 1)
+    ys = range(max(int(math.floor(fy - buffer)), 0), min(int(math.floor(fy + buffer)), n - 1) + 1)
+
+    return [(x, y) for x in xs for y in ys]
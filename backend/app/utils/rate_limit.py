@@ -0,0 +1,31 @@
+"""
+レートリミッタ
+外部APIへのリクエストの開始間隔を一定以上に保つ（asyncio用）
+"""
+
+import asyncio
+import threading
+import time
+
+
+class AsyncRateLimiter:
+    """
+    リクエストの開始間隔を 60 / requests_per_minute 秒以上に保つ
+
+    待ち時間の枠は呼び出し順に割り当てるため、並列に呼び出しても上限を超えない
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        """次のリクエストを開始できるまで待機"""
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.interval
+
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
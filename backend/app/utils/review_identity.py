@@ -0,0 +1,55 @@
+"""
+レビューの同一性キー
+取得元（Places API / Apify）によって投稿時刻の単位（秒 / ミリ秒）や表記が異なっても、
+同じレビューが同じキーになるように正規化してハッシュ化する
+
+- 同一性キー: 投稿者名・投稿日・本文から生成（取得元をまたいだ重複取込の防止）
+- 突き合わせキー: 投稿者名・投稿日から生成（本文の編集・翻訳をまたいだ差分同期）
+"""
+
+import hashlib
+import unicodedata
+from datetime import datetime, timezone
+from typing import Optional
+
+# これより大きい値はミリ秒とみなす（秒では西暦5000年以降に相当）
+MILLISECONDS_THRESHOLD = 100_000_000_000
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """NFKC正規化・小文字化し、連続する空白を1つにまとめる"""
+    if not value:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", value).lower().split())
+
+
+def normalize_review_day(time: Optional[int]) -> str:
+    """投稿時刻（秒またはミリ秒）をUTCの日付（YYYY-MM-DD）に変換"""
+    if time is None:
+        return ""
+    seconds = time / 1000 if time > MILLISECONDS_THRESHOLD else time
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def review_identity_key(
+    author_name: Optional[str], time: Optional[int], text: Optional[str]
+) -> str:
+    """
+    レビューの同一性キー（SHA-256の16進文字列）
+
+    正規化した投稿者名・投稿日（UTC）・本文のハッシュから生成する
+    """
+    text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    source = "\x1f".join((normalize_text(author_name), normalize_review_day(time), text_hash))
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def review_match_key(author_name: Optional[str], time: Optional[int]) -> str:
+    """
+    レビューの突き合わせキー（SHA-256の16進文字列）
+
+    正規化した投稿者名・投稿日（UTC）から生成する。本文を含まないため、
+    投稿者による編集や翻訳で本文が変わっても同じキーになる
+    """
+    source = "\x1f".join((normalize_text(author_name), normalize_review_day(time)))
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
@@ -0,0 +1,104 @@
+"""
+レビュー埋め込みの保存（ReviewEmbeddingService.save_embeddings）のベンチマーク
+
+1,000件・10,000件のレビューに768次元の埋め込みを書き込み、時間とSQL発行回数を比較する
+- before: レビューごとに UPDATE reviews SET embedding = :embedding WHERE id = :id
+- after: 1000件ごとに UPDATE ... FROM unnest(ids, embeddings) の1ステートメント
+
+ベンチマーク用の店舗とレビューを作成し、終了時に削除する
+
+実行: cd backend && python -m benchmarks.bench_embedding_write
+"""
+
+import random
+import time
+import uuid
+
+from sqlalchemy import event, text
+
+from app.ai.embeddings import ReviewEmbeddingService
+from app.db.session import SessionLocal, engine
+from app.models.review import Review
+from app.models.shop import Shop
+from app.schemas.shop import ShopCreate
+from app.services.review_service import ReviewService
+from app.services.shop_service import ShopService
+
+ROW_COUNTS = (1000, 10000)
+DIMENSION = 768
+
+
+def legacy_save_embeddings(db, rows: list[tuple]) -> None:
+    """変更前の保存（1件ずつUPDATE）"""
+    for review_id, embedding in rows:
+        db.execute(
+            text("UPDATE reviews SET embedding = :embedding WHERE id = :id"),
+            {"embedding": embedding, "id": str(review_id)},
+        )
+    db.commit()
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def main():
+    counter = StatementCounter()
+    db = SessionLocal()
+    shop = ShopService(db).create(
+        ShopCreate(
+            place_id=f"bench-embedding-write-{uuid.uuid4()}",
+            name="ベンチマーク用店舗",
+            latitude=35.69,
+            longitude=139.70,
+        )
+    )
+    shop_id = shop.id
+
+    try:
+        for n in ROW_COUNTS:
+            db.query(Review).filter(Review.shop_id == shop_id).delete()
+            db.commit()
+            ReviewService(db).bulk_create(
+                shop_id,
+                [
+                    {"author_name": f"ユーザー{i}", "time": 1_700_000_000 + i, "text": f"口コミ{i}"}
+                    for i in range(n)
+                ],
+            )
+            review_ids = [row.id for row in db.query(Review.id).filter(Review.shop_id == shop_id)]
+            rows = [
+                (review_id, [random.random() for _ in range(DIMENSION)]) for review_id in review_ids
+            ]
+            print(f"rows={n}")
+
+            for name, func in [
+                ("per-row (before)", lambda: legacy_save_embeddings(db, rows)),
+                ("unnest (after)", lambda: ReviewEmbeddingService(db).save_embeddings(rows)),
+            ]:
+                db.execute(
+                    text("UPDATE reviews SET embedding = NULL WHERE shop_id = :id"), {"id": shop_id}
+                )
+                db.commit()
+
+                counter.count = 0
+                started = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {name:18s} statements={counter.count:6d} "
+                    f"time={elapsed * 1000:9.1f} ms  {n / elapsed:9.0f} rows/s"
+                )
+    finally:
+        db.query(Shop).filter(Shop.id == shop_id).delete()
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
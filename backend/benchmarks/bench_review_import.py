@@ -0,0 +1,141 @@
+"""
+レビュー一括取込（ReviewService.bulk_create）のベンチマーク
+
+1店舗あたり100/500/5000件のレビューを取り込み、スループットとSQL発行回数を比較する
+- before: レビューごとに重複チェックのSELECT、作成した行ごとにrefresh
+- after: INSERT ... ON CONFLICT DO NOTHING RETURNING（1000件ごとに1ステートメント）
+
+新規取込と、同じデータの再取込（全件重複）の両方を計測する
+ベンチマーク用の店舗を作成し、終了時に削除する
+
+実行: cd backend && python -m benchmarks.bench_review_import
+"""
+
+import random
+import time
+import uuid
+
+from sqlalchemy import event
+
+from app.db.session import SessionLocal, engine
+from app.models.review import Review
+from app.models.shop import Shop
+from app.schemas.shop import ShopCreate
+from app.services.review_service import ReviewService
+from app.services.shop_service import ShopService
+from app.utils.review_identity import review_identity_key, review_match_key
+
+REVIEW_COUNTS = (100, 500, 5000)
+
+
+def make_reviews(n: int) -> list[dict]:
+    """Apifyから取得したレビューを模したデータを生成"""
+    base_time = 1_700_000_000_000
+    return [
+        {
+            "author_name": f"ユーザー{i}",
+            "author_url": f"https://www.google.com/maps/contrib/{i}",
+            "profile_photo_url": None,
+            "rating": random.randint(1, 5),
+            "text": "施術は丁寧で、部屋も清潔でした。" * random.randint(1, 5),
+            "language": "ja",
+            "relative_time_description": "1か月前",
+            "time": base_time + i * 60_000,
+            "raw_data": {"reviewId": str(uuid.uuid4()), "stars": 5},
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_bulk_create(db, shop_id, reviews_data: list[dict]) -> list[Review]:
+    """変更前のbulk_create（1件ずつ重複チェックとrefresh）"""
+    service = ReviewService(db)
+    created_reviews = []
+    for review_data in reviews_data:
+        existing = service.get_by_shop_and_author(
+            shop_id=shop_id,
+            author_name=review_data.get("author_name", ""),
+            time=review_data.get("time", 0),
+        )
+        if existing:
+            continue
+        review = Review(
+            shop_id=shop_id,
+            identity_key=review_identity_key(
+                review_data["author_name"], review_data["time"], review_data["text"]
+            ),
+            match_key=review_match_key(review_data["author_name"], review_data["time"]),
+            **review_data,
+        )
+        db.add(review)
+        created_reviews.append(review)
+
+    if created_reviews:
+        db.commit()
+        for review in created_reviews:
+            db.refresh(review)
+    return created_reviews
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def measure(label: str, func, reviews: list[dict], counter: StatementCounter):
+    counter.count = 0
+    started = time.perf_counter()
+    created = func(reviews)
+    elapsed = time.perf_counter() - started
+    print(
+        f"  {label:22s} created={len(created):5d} statements={counter.count:6d} "
+        f"time={elapsed * 1000:9.1f} ms  {len(reviews) / elapsed:9.0f} reviews/s"
+    )
+
+
+def main():
+    counter = StatementCounter()
+    db = SessionLocal()
+    shop = ShopService(db).create(
+        ShopCreate(
+            place_id=f"bench-review-import-{uuid.uuid4()}",
+            name="ベンチマーク用店舗",
+            latitude=35.69,
+            longitude=139.70,
+        )
+    )
+    shop_id = shop.id
+
+    def clear():
+        db.query(Review).filter(Review.shop_id == shop_id).delete()
+        db.commit()
+
+    try:
+        for n in REVIEW_COUNTS:
+            reviews = make_reviews(n)
+            print(f"reviews={n}")
+
+            clear()
+            measure("before (new)", lambda r: legacy_bulk_create(db, shop_id, r), reviews, counter)
+            measure(
+                "before (re-import)", lambda r: legacy_bulk_create(db, shop_id, r), reviews, counter
+            )
+
+            clear()
+            service = ReviewService(db)
+            measure("after (new)", lambda r: service.bulk_create(shop_id, r), reviews, counter)
+            measure(
+                "after (re-import)", lambda r: service.bulk_create(shop_id, r), reviews, counter
+            )
+    finally:
+        db.query(Shop).filter(Shop.id == shop_id).delete()
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+レビュー一覧取得（GET /shops/{id}/reviews）のembedding・raw_data遅延読み込みのベンチマーク
+
+レビュー数が最も多い店舗について、ReviewService.get_by_shop_id（limit=100）を比較する
+- before: include_payload=True（embedding・raw_dataも読み込む、変更前と同じSELECT）
+- after: 既定（embedding・raw_dataは読み込まない）
+
+転送量はテキストプロトコル（psycopg2）で受け取る列の文字列長の合計で概算する
+
+実行: cd backend && python -m benchmarks.bench_review_payload
+"""
+
+import statistics
+import time
+
+from sqlalchemy import func, text
+
+from app.db.session import SessionLocal
+from app.models.review import Review
+from app.services.review_service import ReviewService
+
+LIMIT = 100
+REPEAT = 50
+
+BYTES_SQL = """
+    SELECT
+        coalesce(sum(octet_length(ROW(
+            id, shop_id, author_name, author_url, profile_photo_url, rating, text, text_ja,
+            language, relative_time_description, time, identity_key, created_at
+        )::text)), 0) AS base_bytes,
+        coalesce(sum(coalesce(octet_length(embedding::text), 0)), 0) AS embedding_bytes,
+        coalesce(sum(coalesce(octet_length(raw_data::text), 0)), 0) AS raw_data_bytes
+    FROM (
+        SELECT * FROM reviews WHERE shop_id = :shop_id ORDER BY time DESC LIMIT :limit
+    ) r
+"""
+
+
+def measure(db, shop_id, include_payload: bool) -> list[float]:
+    service = ReviewService(db)
+    latencies = []
+    for _ in range(REPEAT):
+        db.expunge_all()
+        started = time.perf_counter()
+        service.get_by_shop_id(shop_id, limit=LIMIT, include_payload=include_payload)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def main():
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(Review.shop_id, func.count(Review.id).label("count"))
+            .group_by(Review.shop_id)
+            .order_by(func.count(Review.id).desc())
+            .first()
+        )
+        if row is None:
+            print("No reviews found")
+            return
+
+        sizes = db.execute(text(BYTES_SQL), {"shop_id": row.shop_id, "limit": LIMIT}).one()
+        payload_bytes = sizes.embedding_bytes + sizes.raw_data_bytes
+        rows = min(row.count, LIMIT)
+        print(f"shop_id={row.shop_id} rows={rows} repeat={REPEAT}")
+        print(
+            f"embedding={sizes.embedding_bytes / 1024:8.1f} KiB  "
+            f"raw_data={sizes.raw_data_bytes / 1024:8.1f} KiB  "
+            f"other columns={sizes.base_bytes / 1024:8.1f} KiB"
+        )
+
+        for name, include_payload, size in [
+            ("payload (before)", True, sizes.base_bytes + payload_bytes),
+            ("deferred (after)", False, sizes.base_bytes),
+        ]:
+            latencies = measure(db, row.shop_id, include_payload)
+            print(
+                f"{name:18s} bytes/request={size / 1024:8.1f} KiB  "
+                f"p50={statistics.median(latencies) * 1000:7.2f} ms  "
+                f"min={min(latencies) * 1000:7.2f} ms"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
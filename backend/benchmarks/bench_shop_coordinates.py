@@ -0,0 +1,58 @@
+"""
+店舗座標抽出のマイクロベンチマーク
+
+500件のレスポンス生成を想定し、1行あたりのコストを比較する
+- before: WKBをto_shapeでshapelyオブジェクトに変換して緯度・経度を取得
+- after: SQLのST_Y/ST_Xで取得済みの緯度・経度（float）を使用
+
+実行: cd backend && python -m benchmarks.bench_shop_coordinates
+"""
+
+import random
+import timeit
+
+from geoalchemy2.elements import WKBElement
+from geoalchemy2.shape import from_shape, to_shape
+from shapely.geometry import Point
+
+from app.schemas.shop import LocationSchema
+
+ROWS = 500
+REPEAT = 20
+
+
+def make_rows(n: int) -> list[tuple[WKBElement, float, float]]:
+    """DBから取得した行を模したデータ（WKB, 緯度, 経度）を生成"""
+    rows = []
+    for _ in range(n):
+        lat = 35.6 + random.random() * 0.2
+        lng = 139.6 + random.random() * 0.2
+        # DBから返るEWKBと同じ形式
+        element = from_shape(Point(lng, lat), srid=4326, extended=True)
+        rows.append((WKBElement(bytes(element.data), srid=4326, extended=True), lat, lng))
+    return rows
+
+
+def before(rows: list) -> list[LocationSchema]:
+    locations = []
+    for location, _, _ in rows:
+        point = to_shape(location)
+        locations.append(LocationSchema(lat=point.y, lng=point.x))
+    return locations
+
+
+def after(rows: list) -> list[LocationSchema]:
+    return [LocationSchema(lat=lat, lng=lng) for _, lat, lng in rows]
+
+
+def main():
+    rows = make_rows(ROWS)
+
+    print(f"rows={ROWS}, repeat={REPEAT}")
+    for name, func in [("to_shape (before)", before), ("ST_Y/ST_X (after)", after)]:
+        best = min(timeit.repeat(lambda: func(rows), number=1, repeat=REPEAT))
+        print(f"{name:20s} total={best * 1000:8.2f} ms  per_row={best / ROWS * 1e6:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
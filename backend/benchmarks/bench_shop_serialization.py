@@ -0,0 +1,120 @@
+"""
+店舗一覧レスポンスのシリアライズのマイクロベンチマーク
+
+GET /shops（view=full）のレスポンス生成を50/500/5000件で比較する
+- before: shop_to_responseでShopResponseを生成し、FastAPIがresponse_modelで
+  再検証・json.dumpsでシリアライズ（serialize_response + JSONResponse）
+- after: shop_to_dictでdictを生成し、orjsonで直接バイト列に変換
+
+両者の出力が同じJSONになることも確認する
+
+実行: cd backend && python -m benchmarks.bench_shop_serialization
+"""
+
+import asyncio
+import json
+import random
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.responses import dump_json
+from app.schemas.shop import ShopListResponse
+from app.services.shop_service import ShopService
+
+ROW_COUNTS = (50, 500, 5000)
+REPEAT = 5
+
+RESPONSE_FIELD = create_response_field(name="Response_get_shops", type_=ShopListResponse)
+
+
+def make_shops(n: int) -> list[SimpleNamespace]:
+    """DBから取得したShop（解析結果付き）を模したデータを生成"""
+    now = datetime.utcnow()
+    shops = []
+    for i in range(n):
+        analytics = SimpleNamespace(
+            risk_level=random.choice(["safe", "gamble", "mine", "fake"]),
+            score_operation=random.randint(0, 10),
+            score_accuracy=random.randint(0, 10),
+            score_hygiene=random.randint(0, 10),
+            score_sincerity=random.randint(0, 10),
+            score_safety=random.randint(0, 10),
+            variance_score=random.random() * 100,
+            sakura_risk=random.randint(0, 100),
+            risk_summary="口コミの評価は安定しており、大きなリスクは見られない。",
+            positive_points=["清潔な店内", "丁寧な接客"],
+            negative_points=["予約が取りにくい"],
+        )
+        shops.append(
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                place_id=f"ChIJ{i:020d}",
+                name=f"メンズエステ {i}",
+                formatted_address="東京都新宿区西新宿1-1-1",
+                latitude=35.6 + random.random() * 0.2,
+                longitude=139.6 + random.random() * 0.2,
+                rating=round(1 + random.random() * 4, 1),
+                user_ratings_total=random.randint(0, 500),
+                price_level=None,
+                business_status="OPERATIONAL",
+                opening_hours={"weekday_text": ["月曜日: 12時00分～5時00分"]},
+                phone_number="03-0000-0000",
+                website="https://example.com",
+                created_at=now - timedelta(days=i),
+                updated_at=now,
+                last_fetched_at=now,
+                analytics=analytics if i % 4 else None,
+            )
+        )
+    return shops
+
+
+def before(shops: list) -> bytes:
+    content = ShopListResponse(
+        shops=[ShopService.shop_to_response(shop) for shop in shops],
+        total=len(shops),
+        page=1,
+        per_page=len(shops),
+    )
+    encoded = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=content))
+    return JSONResponse(content=encoded).body
+
+
+def after(shops: list) -> bytes:
+    return dump_json(
+        {
+            "shops": [ShopService.shop_to_dict(shop) for shop in shops],
+            "total": len(shops),
+            "page": 1,
+            "per_page": len(shops),
+            "next_cursor": None,
+            "total_is_estimate": False,
+        }
+    )
+
+
+def main():
+    print(f"repeat={REPEAT}")
+    for rows in ROW_COUNTS:
+        shops = make_shops(rows)
+        assert json.loads(before(shops)) == json.loads(after(shops))
+
+        results = {}
+        for name, func in [("pydantic (before)", before), ("orjson (after)", after)]:
+            results[name] = min(timeit.repeat(lambda: func(shops), number=1, repeat=REPEAT))
+            print(
+                f"rows={rows:5d} {name:18s} total={results[name] * 1000:8.2f} ms"
+                f"  per_row={results[name] / rows * 1e6:7.2f} us"
+            )
+        speedup = results["pydantic (before)"] / results["orjson (after)"]
+        print(f"rows={rows:5d} speedup={speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
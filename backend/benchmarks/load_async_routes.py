@@ -0,0 +1,102 @@
+"""
+非同期エンドポイントの負荷テスト
+
+起動中のAPIサーバーに対して、DBを使う非同期エンドポイント（ベクトル検索）と
+軽量なエンドポイント（/health）を同時に叩き、スループットとレイテンシを計測する。
+
+同期Sessionを使っていた場合はDB問い合わせ中にイベントループが止まるため、
+並列度を上げてもスループットが伸びず、/healthのレイテンシも悪化する。
+AsyncSession（asyncpg）では問い合わせ中も他のリクエストを処理できる。
+
+実行:
+  cd backend && uvicorn app.main:app --workers 1 &
+  python -m benchmarks.load_async_routes --base-url http://localhost:8000 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import quote
+
+import httpx
+
+DEFAULT_QUERY = "静かで、あまり話しかけてこない店"
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    path: str,
+    deadline: float,
+    latencies: list[float],
+    errors: list[int],
+):
+    """期限までリクエストを繰り返し、レイテンシを記録"""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url: str, path: str, concurrency: int, duration: float) -> dict:
+    """指定した並列度で負荷をかける（/healthへの1並列のプローブを含む）"""
+    deadline = time.perf_counter() + duration
+    latencies: list[float] = []
+    errors: list[int] = []
+    health_latencies: list[float] = []
+    health_errors: list[int] = []
+
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        await asyncio.gather(
+            *(worker(client, path, deadline, latencies, errors) for _ in range(concurrency)),
+            worker(client, "/health", deadline, health_latencies, health_errors),
+        )
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "health_p95_ms": _percentile(health_latencies, 0.95) * 1000,
+    }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument(
+        "--path",
+        default=f"/api/v1/search/vector?query={quote(DEFAULT_QUERY)}&limit=10",
+        help="負荷をかけるパス",
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="並列度ごとの計測時間（秒）")
+    args = parser.parse_args()
+
+    print(f"target={args.base_url}{args.path}, duration={args.duration}s")
+    for concurrency in args.concurrency:
+        result = asyncio.run(run(args.base_url, args.path, concurrency, args.duration))
+        print(
+            f"concurrency={concurrency:3d} requests={result['requests']:6d} "
+            f"errors={result['errors']:4d} rps={result['rps']:8.1f} "
+            f"p50={result['p50_ms']:7.1f} ms p95={result['p95_ms']:7.1f} ms "
+            f"health_p95={result['health_p95_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""カーソル（キーセットページネーション）のテスト"""
+
+import uuid
+
+import pytest
+
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    values = [7.4, str(uuid.uuid4())]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == values
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor({"a": 1}), "e30"])
+def test_decode_cursor_rejects_invalid(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,101 @@
+"""レビューの同一性キー・突き合わせキーのテスト"""
+
+from types import SimpleNamespace
+
+from app.services.review_service import ReviewService
+from app.utils.review_identity import (
+    normalize_review_day,
+    normalize_text,
+    review_identity_key,
+    review_match_key,
+)
+
+# 2023-11-14 22:13:20 UTC
+TIME_SECONDS = 1_700_000_000
+
+
+def test_normalize_text_applies_nfkc_case_and_whitespace():
+    assert normalize_text("  Ｔａｒｏ　 Yamada\n") == "taro yamada"
+    assert normalize_text(None) == ""
+
+
+def test_normalize_review_day_accepts_seconds_and_milliseconds():
+    assert normalize_review_day(TIME_SECONDS) == "2023-11-14"
+    assert normalize_review_day(TIME_SECONDS * 1000 + 999) == "2023-11-14"
+    assert normalize_review_day(None) == ""
+
+
+def test_identity_key_matches_across_sources():
+    """Places API（秒）とApify（ミリ秒・全角・空白違い）の同じレビューは同じキー"""
+    places = review_identity_key("Taro Yamada", TIME_SECONDS, "とても 良かった")
+    apify = review_identity_key("ＴＡＲＯ  Yamada", TIME_SECONDS * 1000, "とても　良かった ")
+    assert places == apify
+
+
+def test_identity_key_differs_by_text_and_day():
+    key = review_identity_key("Taro", TIME_SECONDS, "良かった")
+    assert key != review_identity_key("Taro", TIME_SECONDS, "普通でした")
+    assert key != review_identity_key("Taro", TIME_SECONDS + 86400, "良かった")
+
+
+def test_match_key_ignores_text():
+    assert review_match_key("Taro", TIME_SECONDS) == review_match_key(
+        "ｔａｒｏ", TIME_SECONDS * 1000
+    )
+    assert review_match_key("Taro", TIME_SECONDS) != review_match_key("Hanako", TIME_SECONDS)
+
+
+def _existing(review_id, author_name, time, text):
+    return SimpleNamespace(
+        id=review_id,
+        identity_key=review_identity_key(author_name, time, text),
+        match_key=review_match_key(author_name, time),
+    )
+
+
+def _incoming(*reviews):
+    return {
+        review_identity_key(review["author_name"], review["time"], review["text"]): review
+        for review in reviews
+    }
+
+
+def test_match_reviews_pairs_edited_and_translated_reviews():
+    """本文の編集・翻訳で同一性キーが変わっても既存レビューと突き合わせ、新規にしない"""
+    existing = [
+        _existing(1, "Taro", TIME_SECONDS, "Great service"),
+        _existing(2, "Hanako", TIME_SECONDS, "Clean room"),
+        _existing(3, "Jiro", TIME_SECONDS, "OK"),
+    ]
+    incoming = _incoming(
+        {"author_name": "Taro", "time": TIME_SECONDS * 1000, "text": "素晴らしいサービス"},
+        {"author_name": "Hanako", "time": TIME_SECONDS, "text": "Clean room"},
+        {"author_name": "Saburo", "time": TIME_SECONDS, "text": "New"},
+    )
+
+    matches, new_reviews = ReviewService._match_reviews(existing, incoming)
+
+    matched = {row.id: review_data["text"] for row, _, review_data in matches}
+    assert matched == {1: "素晴らしいサービス", 2: "Clean room"}
+    assert [review["author_name"] for review in new_reviews] == ["Saburo"]
+
+
+def test_match_reviews_pairs_same_author_day_one_to_one():
+    """同じ投稿者・投稿日のレビューが複数ある場合は1対1で対応させる"""
+    existing = [
+        _existing(1, "Taro", TIME_SECONDS, "first"),
+        _existing(2, "Taro", TIME_SECONDS, "second"),
+    ]
+    incoming = _incoming(
+        {"author_name": "Taro", "time": TIME_SECONDS, "text": "first (edited)"},
+        {"author_name": "Taro", "time": TIME_SECONDS, "text": "second (edited)"},
+        {"author_name": "Taro", "time": TIME_SECONDS, "text": "third"},
+    )
+
+    matches, new_reviews = ReviewService._match_reviews(existing, incoming)
+
+    assert [(row.id, review_data["text"]) for row, _, review_data in matches] == [
+        (1, "first (edited)"),
+        (2, "second (edited)"),
+    ]
+    assert [review["text"] for review in new_reviews] == ["third"]
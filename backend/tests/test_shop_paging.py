@@ -0,0 +1,132 @@
+"""平均スコア順のキーセットページネーションのテスト（DBを使わずにクエリを模擬する）"""
+
+import uuid
+from collections import namedtuple
+
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, Null, Tuple
+
+from app.services.shop_service import ShopService
+
+Row = namedtuple("Row", ["id", "sort_key"])
+
+
+class FakeQuery:
+    """
+    get_page_by_cursorが組み立てるクエリを店舗のリストに対して評価する
+
+    店舗は (id, avg_score) のタプル（未解析はavg_score=None）
+    """
+
+    def __init__(self, shops, predicates=(), sort_key=None, limit=None):
+        self.shops = shops
+        self.predicates = list(predicates)
+        self.sort_key = sort_key
+        self._limit = limit
+
+    def _copy(self, **kwargs):
+        values = {
+            "predicates": self.predicates,
+            "sort_key": self.sort_key,
+            "limit": self._limit,
+            **kwargs,
+        }
+        return FakeQuery(self.shops, **values)
+
+    def outerjoin(self, *args):
+        return self
+
+    def filter(self, expression):
+        return self._copy(predicates=[*self.predicates, self._to_predicate(expression)])
+
+    def add_columns(self, column):
+        return self._copy(sort_key=column)
+
+    def order_by(self, *args):
+        return self
+
+    def limit(self, limit):
+        return self._copy(limit=limit)
+
+    def all(self):
+        shops = [shop for shop in self.shops if all(p(shop) for p in self.predicates)]
+        # 未解析店舗のクエリはソートキーに定数（-1）を使う
+        if not isinstance(self.sort_key.element, BindParameter):
+            shops.sort(key=lambda shop: (shop[1], shop[0]), reverse=True)
+            rows = [Row(shop_id, avg_score) for shop_id, avg_score in shops]
+        else:
+            shops.sort(key=lambda shop: shop[0], reverse=True)
+            rows = [Row(shop_id, -1.0) for shop_id, _ in shops]
+        return rows[: self._limit]
+
+    @staticmethod
+    def _to_predicate(expression: BinaryExpression):
+        operator = expression.operator.__name__
+        if isinstance(expression.right, Null):
+            if operator == "is_":
+                return lambda shop: shop[1] is None
+            return lambda shop: shop[1] is not None
+
+        if isinstance(expression.left, Tuple):
+            after = tuple(clause.value for clause in expression.right.clauses)
+            return lambda shop: (shop[1], shop[0]) < after
+
+        after_id = expression.right.value
+        return lambda shop: shop[0] < after_id
+
+
+def _make_service(shops):
+    service = ShopService.__new__(ShopService)
+    service.db = type("FakeSession", (), {"query": lambda self, *args: FakeQuery(shops)})()
+    return service
+
+
+def test_avg_score_pages_cover_scored_then_unscored_shops_in_order():
+    ids = sorted(uuid.uuid4() for _ in range(9))
+    shops = [
+        (ids[0], 8.0),
+        (ids[1], 6.5),
+        (ids[2], 8.0),
+        (ids[3], None),
+        (ids[4], 3.0),
+        (ids[5], None),
+        (ids[6], 6.5),
+        (ids[7], None),
+        (ids[8], 0.0),
+    ]
+    service = _make_service(shops)
+
+    pages = []
+    after = None
+    while True:
+        rows, after = service.get_page_by_cursor(
+            limit=2, after=after, sort_by="avg_score", compact=True
+        )
+        pages.append([row.id for row in rows])
+        if after is None:
+            break
+
+    expected = [
+        ids[2],
+        ids[0],
+        ids[6],
+        ids[1],
+        ids[4],
+        ids[8],
+        ids[7],
+        ids[5],
+        ids[3],
+    ]
+    assert [shop_id for page in pages for shop_id in page] == expected
+    assert all(len(page) == 2 for page in pages[:-1])
+
+
+def test_avg_score_cursor_from_unscored_page_skips_scored_shops():
+    ids = sorted(uuid.uuid4() for _ in range(3))
+    service = _make_service([(ids[0], 5.0), (ids[1], None), (ids[2], None)])
+
+    rows, after = service.get_page_by_cursor(
+        limit=2, after=[-1.0, str(ids[2])], sort_by="avg_score", compact=True
+    )
+
+    assert [row.id for row in rows] == [ids[1]]
+    assert after is None
@@ -0,0 +1,134 @@
+"""店舗の空間インデックスのテスト（DBの代わりに行のリストから読み込む）"""
+
+import uuid
+from unittest import mock
+
+import pytest
+
+from app.services.spatial_index import IndexedShop, ShopSpatialIndex
+
+# 新宿駅付近
+ORIGIN = (35.6896, 139.7006)
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return list(self.rows)
+
+    def filter(self, expression):
+        shop_id = expression.right.value
+        return FakeQuery([row for row in self.rows if row[0] == shop_id])
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+def make_row(name, lat_offset, scores=(5, 5, 5, 5, 5), risk_level="safe"):
+    return (
+        uuid.uuid4(),
+        name,
+        ORIGIN[0] + lat_offset,
+        ORIGIN[1],
+        4.0,
+        risk_level,
+        *scores,
+    )
+
+
+@pytest.fixture
+def table():
+    """DB上の店舗（テスト中に書き換えて変更を模擬する）"""
+    rows = [
+        make_row("near", 0.001),
+        make_row("middle", 0.005, scores=(9, 9, 9, 9, 9)),
+        make_row("far", 0.02, risk_level="mine"),
+        make_row("unanalyzed", 0.002, scores=(None,) * 5, risk_level=None),
+    ]
+    with mock.patch.object(ShopSpatialIndex, "_query", staticmethod(lambda db: FakeQuery(rows))):
+        yield rows
+
+
+def names(results):
+    return [shop.name for shop, _ in results]
+
+
+def test_nearby_returns_shops_in_distance_order(table):
+    index = ShopSpatialIndex()
+    index.load(db=None)
+
+    results = index.nearby(*ORIGIN, radius_meters=1000, limit=10)
+
+    assert names(results) == ["near", "unanalyzed", "middle"]
+    distances = [distance for _, distance in results]
+    assert distances == sorted(distances)
+    assert 100 < distances[0] < 120
+
+
+def test_nearby_filters_risk_level_and_large_radius(table):
+    index = ShopSpatialIndex()
+    index.load(db=None)
+
+    # セル数が店舗数を超える半径では全店舗を走査する
+    assert names(index.nearby(*ORIGIN, radius_meters=1e7, limit=10, risk_level="mine")) == ["far"]
+
+
+def test_ranking_orders_analyzed_shops_by_score(table):
+    index = ShopSpatialIndex()
+    index.load(db=None)
+
+    assert names(index.ranking(*ORIGIN, radius_meters=5000)) == ["middle", "near", "far"]
+
+
+def test_refresh_shop_moves_and_removes_shops(table):
+    index = ShopSpatialIndex()
+    index.load(db=None)
+    far_id = table[2][0]
+    near_id = table[0][0]
+
+    # farを原点のすぐ近くへ移動、nearを削除
+    table[2] = (far_id, "far", ORIGIN[0], ORIGIN[1], *table[2][4:])
+    index.refresh_shop(db=None, shop_id=far_id)
+    del table[0]
+    index.refresh_shop(db=None, shop_id=near_id)
+
+    assert names(index.nearby(*ORIGIN, radius_meters=1000, limit=10)) == [
+        "far",
+        "unanalyzed",
+        "middle",
+    ]
+    assert len(index) == 3
+
+
+def test_refresh_during_load_is_replayed(table):
+    """再構築中に通知された変更は差し替え後に反映される"""
+    index = ShopSpatialIndex()
+    index.load(db=None)
+    added = make_row("added", 0.0005)
+    loaded_rows = list(table)
+
+    def query(db):
+        if query.first_call:
+            # 全件読み込みの後に店舗が追加・通知された場合
+            query.first_call = False
+            table.append(added)
+            index.refresh_shop(db=None, shop_id=added[0])
+            return FakeQuery(loaded_rows)
+        return FakeQuery(table)
+
+    query.first_call = True
+    with mock.patch.object(ShopSpatialIndex, "_query", staticmethod(query)):
+        index.load(db=None)
+
+    assert names(index.nearby(*ORIGIN, radius_meters=300, limit=10))[0] == "added"
+
+
+def test_indexed_shop_matches_query_columns(table):
+    index = ShopSpatialIndex()
+    index.load(db=None)
+
+    shop, _ = index.nearby(*ORIGIN, radius_meters=200, limit=1)[0]
+    assert isinstance(shop, IndexedShop)
+    assert shop.score_safety == 5